@@ -0,0 +1,80 @@
+import threading
+
+import pandas as pd
+
+# Resumo do Dashboard: soma e contagem por mês de vencimento × status × fornecedor.
+# Cada aba tem o seu resumo parcial em memória; uma escrita descarta apenas o
+# resumo da aba alterada, e o Dashboard combina os parciais (poucas linhas)
+# em vez de concatenar todos os lançamentos.
+GRUPOS = ["mes_ano", "status", "fornecedor"]
+COLUNAS = GRUPOS + ["total", "contagem", "lancamentos"]
+
+# (planilha, aba) -> (chave de validade, resumo da aba)
+_resumos: dict[tuple[str, str], tuple[object, pd.DataFrame]] = {}
+_lock = threading.Lock()
+
+
+def agregar_aba(df: pd.DataFrame) -> pd.DataFrame:
+    # total = soma dos valores, contagem = valores preenchidos, lancamentos = linhas
+    if df.empty:
+        return pd.DataFrame(columns=COLUNAS)
+
+    base = pd.DataFrame({
+        "mes_ano": pd.to_datetime(df["vencimento"], errors="coerce").dt.to_period("M"),
+        "status": df["status_pagamento"],
+        "fornecedor": df["fornecedor"],
+        "valor": pd.to_numeric(df["valor"], errors="coerce"),
+    })
+    return (
+        base.groupby(GRUPOS, dropna=False, sort=False)["valor"]
+        .agg(total="sum", contagem="count", lancamentos="size")
+        .reset_index()
+    )
+
+
+def resumo_aba(excel_path: str, sheet_name: str, chave, carregar) -> pd.DataFrame:
+    # Devolve o resumo da aba; carregar() só é chamado quando a chave mudou
+    with _lock:
+        em_cache = _resumos.get((excel_path, sheet_name))
+        if em_cache and em_cache[0] == chave:
+            return em_cache[1]
+
+    resumo = agregar_aba(carregar())
+    with _lock:
+        _resumos[(excel_path, sheet_name)] = (chave, resumo)
+    return resumo
+
+
+def descartar(excel_path: str, sheet_name: str) -> None:
+    # Chamada pelas rotinas de gravação após alterar uma aba
+    with _lock:
+        _resumos.pop((excel_path, sheet_name), None)
+
+
+def combinar(resumos: list[pd.DataFrame]) -> pd.DataFrame:
+    partes = [r for r in resumos if not r.empty]
+    if not partes:
+        return pd.DataFrame(columns=COLUNAS)
+    return (
+        pd.concat(partes, ignore_index=True)
+        .groupby(GRUPOS, dropna=False, sort=False)[["total", "contagem", "lancamentos"]]
+        .sum()
+        .reset_index()
+    )
+
+
+def evolucao_mensal(
+    df: pd.DataFrame, status_quitado: str, coluna_quitados: str,
+    valor: str = "total", status: str = "status"
+) -> pd.DataFrame:
+    # Total, quitados e pendentes por mês (soma mascarada, sem lambda por grupo).
+    # Serve tanto para o resumo do Dashboard quanto para lançamentos brutos
+    # (valor="valor", status="status_pagamento"), desde que haja a coluna mes_ano.
+    quitado = df[status].eq(status_quitado)
+    base = pd.DataFrame({
+        "mes_ano": df["mes_ano"],
+        "total_mes": df[valor],
+        coluna_quitados: df[valor].where(quitado, 0),
+        "pendentes_mes": df[valor].where(~quitado, 0),
+    })
+    return base.groupby("mes_ano").sum().reset_index()
@@ -0,0 +1,230 @@
+import hashlib
+import os
+import sqlite3
+import tempfile
+from contextlib import closing
+from datetime import datetime
+
+import pandas as pd
+
+from planilhas import chave_aba
+
+# Anexos dos lançamentos (boletos e comprovantes). Cada arquivo é guardado uma
+# única vez pelo SHA-256 do conteúdo (objetos/ab/abcdef...), e um índice SQLite
+# liga os lançamentos aos arquivos. O lançamento é identificado pelo seu endereço
+# persistente: o id do banco no backend SQLite e, no Excel, a linha no arquivo
+# gravado (as remoções feitas pelo app renumeram os vínculos, ver remover_linha;
+# linhas inseridas ou apagadas fora do app não são acompanhadas). Editar um
+# lançamento não muda o endereço. As miniaturas são geradas na primeira vez que
+# são pedidas e ficam em disco pelo mesmo endereço do arquivo.
+CAMPOS = {"boleto": "Boleto", "comprovante": "Comprovante"}
+TIPOS = ["pdf", "png", "jpg", "jpeg"]
+MIME = {"pdf": "application/pdf", "png": "image/png", "jpg": "image/jpeg", "jpeg": "image/jpeg"}
+BLOCO = 1024 * 1024  # bytes por leitura/gravação
+MINIATURA = (240, 240)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS objetos (
+    sha256   TEXT PRIMARY KEY,
+    tamanho  INTEGER NOT NULL,
+    mime     TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS vinculos (
+    id         INTEGER PRIMARY KEY AUTOINCREMENT,
+    planilha   TEXT NOT NULL,
+    mes        TEXT NOT NULL,
+    lancamento TEXT NOT NULL,
+    campo      TEXT NOT NULL,
+    nome       TEXT NOT NULL,
+    sha256     TEXT NOT NULL REFERENCES objetos (sha256),
+    criado_em  TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_vinculos_lancamento ON vinculos (planilha, mes, lancamento);
+CREATE INDEX IF NOT EXISTS idx_vinculos_objeto     ON vinculos (sha256);
+"""
+
+
+def conectar(pasta: str) -> sqlite3.Connection:
+    os.makedirs(pasta, exist_ok=True)
+    conn = sqlite3.connect(os.path.join(pasta, "indice.db"), timeout=30)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def caminho_objeto(pasta: str, sha: str) -> str:
+    return os.path.join(pasta, "objetos", sha[:2], sha)
+
+
+def caminho_miniatura(pasta: str, sha: str) -> str:
+    return os.path.join(pasta, "miniaturas", sha[:2], f"{sha}.png")
+
+
+def _texto(val) -> str:
+    if val is None or (not isinstance(val, str) and pd.isna(val)):
+        return ""
+    if isinstance(val, float) and val.is_integer():
+        val = int(val)
+    return str(val).strip()
+
+
+def chave(registro, campo: str = "linha") -> str | None:
+    # Endereço do lançamento no índice (registro: dict ou linha do DataFrame):
+    # "id:N" ou "linha:N", conforme o campo persistente do backend. None para
+    # lançamentos ainda sem endereço (incluídos e ainda na fila de gravação).
+    val = registro.get(campo)
+    if val is None or pd.isna(val):
+        return None
+    return f"{campo}:{int(val)}"
+
+
+def chaves(df: pd.DataFrame, campo: str = "linha") -> pd.Series:
+    # Chave de cada linha (usada só nas linhas da página exibida)
+    if campo not in df.columns:
+        return pd.Series(None, index=df.index, dtype=object)
+    return pd.Series([chave({campo: v}, campo) for v in df[campo]], index=df.index, dtype=object)
+
+
+def guardar(pasta: str, arquivo, extensao: str) -> tuple[str, int]:
+    # Copia o arquivo (file-like) em blocos para o endereço do seu SHA-256;
+    # um conteúdo já guardado não é gravado de novo. Devolve (sha, tamanho).
+    temporarios = os.path.join(pasta, "objetos")
+    os.makedirs(temporarios, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=temporarios, suffix=".tmp")
+    sha, tamanho = hashlib.sha256(), 0
+    try:
+        with os.fdopen(fd, "wb") as destino:
+            while bloco := arquivo.read(BLOCO):
+                sha.update(bloco)
+                tamanho += len(bloco)
+                destino.write(bloco)
+        sha = sha.hexdigest()
+        final = caminho_objeto(pasta, sha)
+        if os.path.exists(final):
+            os.remove(tmp)
+        else:
+            os.makedirs(os.path.dirname(final), exist_ok=True)
+            os.replace(tmp, final)
+    except BaseException:
+        if os.path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+    with closing(conectar(pasta)) as conn, conn:
+        conn.execute(
+            "INSERT OR IGNORE INTO objetos (sha256, tamanho, mime) VALUES (?, ?, ?)",
+            (sha, tamanho, MIME.get(extensao.lower().lstrip("."), "application/octet-stream"))
+        )
+    return sha, tamanho
+
+
+def anexar(pasta: str, excel_path: str, sheet_name: str, lancamento: str, campo: str, nome: str, arquivo) -> str:
+    # Guarda o arquivo e o liga ao lançamento; devolve o SHA-256
+    sha, _ = guardar(pasta, arquivo, os.path.splitext(nome)[1])
+    with closing(conectar(pasta)) as conn, conn:
+        conn.execute(
+            "INSERT INTO vinculos (planilha, mes, lancamento, campo, nome, sha256, criado_em) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)",
+            (os.path.basename(excel_path), chave_aba(sheet_name), lancamento, campo, nome, sha,
+             datetime.now().isoformat(timespec="seconds"))
+        )
+    return sha
+
+
+def listar(pasta: str, excel_path: str, sheet_name: str, lancamento: str) -> list[dict]:
+    with closing(conectar(pasta)) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            "SELECT v.id, v.campo, v.nome, v.sha256, v.criado_em, o.tamanho, o.mime "
+            "FROM vinculos v JOIN objetos o ON o.sha256 = v.sha256 "
+            "WHERE v.planilha = ? AND v.mes = ? AND v.lancamento = ? ORDER BY v.id",
+            (os.path.basename(excel_path), chave_aba(sheet_name), lancamento)
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def contagens(pasta: str, excel_path: str, sheet_name: str) -> dict[str, int]:
+    # Nº de anexos por lançamento da aba (uma consulta pelo índice, sem abrir arquivos)
+    with closing(conectar(pasta)) as conn:
+        return dict(conn.execute(
+            "SELECT lancamento, COUNT(*) FROM vinculos WHERE planilha = ? AND mes = ? GROUP BY lancamento",
+            (os.path.basename(excel_path), chave_aba(sheet_name))
+        ).fetchall())
+
+
+def remover_lancamento(pasta: str, excel_path: str, sheet_name: str, lancamento: str | None) -> None:
+    # Chamada depois que o lançamento é apagado: desfaz os seus vínculos
+    if lancamento is None:
+        return
+    with closing(conectar(pasta)) as conn:
+        ids = conn.execute(
+            "SELECT id FROM vinculos WHERE planilha = ? AND mes = ? AND lancamento = ?",
+            (os.path.basename(excel_path), chave_aba(sheet_name), lancamento)
+        ).fetchall()
+    for (vinculo_id,) in ids:
+        remover(pasta, vinculo_id)
+
+
+def remover_linha(pasta: str, excel_path: str, sheet_name: str, linha: int) -> None:
+    # Chamada depois que a linha é apagada do Excel: desfaz os vínculos dela e
+    # sobe os das linhas de baixo, como o Excel sobe as próprias linhas
+    remover_lancamento(pasta, excel_path, sheet_name, chave({"linha": linha}))
+    with closing(conectar(pasta)) as conn, conn:
+        conn.execute(
+            "UPDATE vinculos SET lancamento = 'linha:' || (CAST(substr(lancamento, 7) AS INTEGER) - 1) "
+            "WHERE planilha = ? AND mes = ? AND lancamento LIKE 'linha:%' "
+            "AND CAST(substr(lancamento, 7) AS INTEGER) > ?",
+            (os.path.basename(excel_path), chave_aba(sheet_name), int(linha))
+        )
+
+
+def remover(pasta: str, vinculo_id: int) -> None:
+    # Desfaz o vínculo; o arquivo só é apagado quando nenhum outro lançamento o usa
+    with closing(conectar(pasta)) as conn, conn:
+        row = conn.execute("SELECT sha256 FROM vinculos WHERE id = ?", (int(vinculo_id),)).fetchone()
+        if row is None:
+            return
+        conn.execute("DELETE FROM vinculos WHERE id = ?", (int(vinculo_id),))
+        if conn.execute("SELECT 1 FROM vinculos WHERE sha256 = ? LIMIT 1", row).fetchone():
+            return
+        conn.execute("DELETE FROM objetos WHERE sha256 = ?", row)
+    for caminho in (caminho_objeto(pasta, row[0]), caminho_miniatura(pasta, row[0])):
+        if os.path.exists(caminho):
+            os.remove(caminho)
+
+
+def ler(pasta: str, sha: str) -> bytes:
+    # Conteúdo para download, lido só quando o botão é usado. O Streamlit guarda
+    # o arquivo inteiro na memória antes de enviá-lo (não há envio em blocos).
+    with open(caminho_objeto(pasta, sha), "rb") as arquivo:
+        return arquivo.read()
+
+
+def miniatura(pasta: str, sha: str, mime: str) -> str | None:
+    # Caminho da miniatura PNG, gerada na primeira vez; None se não houver
+    # como gerar (PDF sem o PyMuPDF instalado, arquivo inválido)
+    destino = caminho_miniatura(pasta, sha)
+    if os.path.exists(destino):
+        return destino
+
+    try:
+        from PIL import Image
+
+        if mime == "application/pdf":
+            import fitz  # PyMuPDF, opcional
+
+            with fitz.open(caminho_objeto(pasta, sha)) as pdf:
+                pix = pdf[0].get_pixmap(dpi=50)
+                imagem = Image.frombytes("RGB", (pix.width, pix.height), pix.samples)
+        else:
+            imagem = Image.open(caminho_objeto(pasta, sha))
+        imagem.thumbnail(MINIATURA)
+
+        os.makedirs(os.path.dirname(destino), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(destino), suffix=".tmp")
+        with os.fdopen(fd, "wb") as saida:
+            imagem.convert("RGB").save(saida, format="PNG")
+        os.replace(tmp, destino)
+        return destino
+    except Exception:
+        return None
@@ -0,0 +1,370 @@
+import json
+import os
+import sqlite3
+import sys
+import threading
+from contextlib import closing
+from datetime import date
+from io import BytesIO
+
+import numpy as np
+import pandas as pd
+from openpyxl import Workbook, load_workbook
+from openpyxl.cell.cell import MergedCell
+
+import esquema
+import leitura
+from planilhas import (
+    DATA_COLS, HEADER_ROW, mapear_abas, normalizar_aba
+)
+
+# Banco local com os lançamentos de todas as planilhas. Cada linha guarda a
+# planilha de origem (nome do .xlsx) e o mês (aba "01".."12"), de modo que o
+# Excel continua servindo como formato de importação/exportação. As colunas da
+# planilha que não são campos do app (ex.: "Data do Pedido" e "Qtda. Parcelas"
+# no Contas a Receber) ficam em `extras`, em JSON por título, para voltarem na
+# exportação.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS lancamentos (
+    id              INTEGER PRIMARY KEY AUTOINCREMENT,
+    planilha        TEXT NOT NULL,
+    mes             TEXT NOT NULL,
+    data_nf,
+    forma_pagamento TEXT,
+    fornecedor      TEXT,
+    os,
+    vencimento      TEXT,
+    valor           REAL,
+    estado          TEXT,
+    situacao        TEXT,
+    boleto,
+    comprovante,
+    extras          TEXT
+);
+-- Planilhas já importadas: a importação automática acontece uma única vez
+CREATE TABLE IF NOT EXISTS importacoes (
+    planilha     TEXT PRIMARY KEY,
+    importado_em TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_lancamentos_mes        ON lancamentos (planilha, mes);
+CREATE INDEX IF NOT EXISTS idx_lancamentos_vencimento ON lancamentos (planilha, vencimento);
+CREATE INDEX IF NOT EXISTS idx_lancamentos_fornecedor ON lancamentos (planilha, fornecedor);
+CREATE INDEX IF NOT EXISTS idx_lancamentos_estado     ON lancamentos (planilha, estado);
+"""
+
+# Cabeçalho usado quando a exportação não tem uma planilha modelo
+CABECALHO_PADRAO = [
+    "Data NF", "Forma de Pagamento", "Fornecedor", "OS", "Vencimento",
+    "Valor", "Estado", "Situação", "Boleto", "Comprovante"
+]
+
+_INSERT = (
+    f"INSERT INTO lancamentos (planilha, mes, {', '.join(DATA_COLS)}, extras) "
+    f"VALUES (?, ?, {', '.join('?' for _ in DATA_COLS)}, ?)"
+)
+
+# Planilhas já conferidas por preparar_base neste processo
+_preparadas: set[tuple[str, str]] = set()
+_preparadas_lock = threading.Lock()
+
+
+def planilha_de(excel_path: str) -> str:
+    return os.path.basename(excel_path)
+
+
+def conectar(db_path: str) -> sqlite3.Connection:
+    conn = sqlite3.connect(db_path, timeout=30)
+    # WAL permite leituras enquanto outro usuário grava
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    # Bancos criados antes da coluna de extras
+    if "extras" not in {r[1] for r in conn.execute("PRAGMA table_info(lancamentos)")}:
+        conn.execute("ALTER TABLE lancamentos ADD COLUMN extras TEXT")
+    return conn
+
+
+def _para_sql(campo: str, val):
+    if isinstance(val, str) and not val.strip():
+        return None
+    try:
+        if val is None or pd.isna(val):
+            return None
+    except (TypeError, ValueError):
+        pass
+
+    if campo in ("data_nf", "vencimento"):
+        if isinstance(val, (date, np.datetime64)):
+            return pd.Timestamp(val).strftime("%Y-%m-%d")
+        dt = pd.to_datetime(val, errors="coerce", dayfirst=True) if isinstance(val, str) else pd.NaT
+        if pd.notna(dt):
+            return dt.strftime("%Y-%m-%d")
+        return str(val) if campo == "data_nf" else None
+    elif campo == "valor":
+        try:
+            return float(val)
+        except (TypeError, ValueError):
+            return None
+
+    return val.item() if isinstance(val, np.generic) else val
+
+
+def _para_excel(campo: str, val):
+    try:
+        if val is None or pd.isna(val):
+            return None
+    except (TypeError, ValueError):
+        pass
+
+    if campo in ("data_nf", "vencimento"):
+        dt = pd.to_datetime(val, errors="coerce")
+        return dt.to_pydatetime() if pd.notna(dt) else val
+    return val
+
+
+def _linha_sql(planilha: str, mes: str, record: dict) -> tuple:
+    return (planilha, mes, *(_para_sql(c, record.get(c)) for c in DATA_COLS), record.get("extras"))
+
+
+def _extras_sql(valores: dict) -> str | None:
+    # {título: valor} das colunas fora do FIELD_MAP em JSON (datas como {"data": ISO})
+    extras = {}
+    for titulo, val in valores.items():
+        if isinstance(val, (date, np.datetime64)):
+            val = None if pd.isna(val) else {"data": pd.Timestamp(val).isoformat()}
+        else:
+            val = _para_sql("", val)
+            if val is not None and not isinstance(val, (str, int, float, bool)):
+                val = str(val)
+        if val is not None:
+            extras[str(titulo)] = val
+    return json.dumps(extras, ensure_ascii=False) if extras else None
+
+
+def _extras_excel(texto) -> dict:
+    if not isinstance(texto, str) or not texto:
+        return {}
+    return {
+        titulo: pd.Timestamp(val["data"]).to_pydatetime() if isinstance(val, dict) else val
+        for titulo, val in json.loads(texto).items()
+    }
+
+
+def _titulos_unicos(titulos) -> list[str | None]:
+    # Títulos do cabeçalho como o pandas os lê: repetidos ganham ".1", ".2"...
+    # (as chaves dos extras); colunas sem título ficam com None
+    unicos, vistos = [], {}
+    for titulo in titulos:
+        if titulo is None or not str(titulo).strip():
+            unicos.append(None)
+            continue
+        n = vistos.get(str(titulo), 0)
+        vistos[str(titulo)] = n + 1
+        unicos.append(f"{titulo}.{n}" if n else str(titulo))
+    return unicos
+
+
+def _extras_aba(bruto: pd.DataFrame, df: pd.DataFrame) -> list[str | None]:
+    # Extras de cada lançamento de normalizar_aba(bruto): colunas com título que
+    # não viraram campo (as sem título aparecem como "Unnamed: N")
+    usadas = set(esquema.compilar(bruto.columns).values())
+    colunas = [
+        j for j, titulo in enumerate(bruto.columns)
+        if j not in usadas and not str(titulo).startswith("Unnamed:")
+    ]
+    if not colunas or df.empty:
+        return [None] * len(df)
+    valores = bruto.iloc[df["linha"].to_numpy() - HEADER_ROW - 1, colunas]
+    return [_extras_sql(rec) for rec in valores.to_dict("records")]
+
+
+def contar_lancamentos(db_path: str, excel_path: str) -> int:
+    with closing(conectar(db_path)) as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM lancamentos WHERE planilha = ?", (planilha_de(excel_path),)
+        ).fetchone()[0]
+
+
+def listar_meses(db_path: str, excel_path: str) -> list[str]:
+    with closing(conectar(db_path)) as conn:
+        rows = conn.execute(
+            "SELECT DISTINCT mes FROM lancamentos WHERE planilha = ? ORDER BY mes",
+            (planilha_de(excel_path),)
+        ).fetchall()
+    return [r[0] for r in rows]
+
+
+def listar_planilhas(db_path: str) -> list[str]:
+    # Livros já importados para o banco (um por tipo e ano)
+    with closing(conectar(db_path)) as conn:
+        rows = conn.execute("SELECT DISTINCT planilha FROM lancamentos ORDER BY planilha").fetchall()
+    return [r[0] for r in rows]
+
+
+def carregar_aba(db_path: str, excel_path: str, mes: str) -> pd.DataFrame:
+    with closing(conectar(db_path)) as conn:
+        df = pd.read_sql_query(
+            f"SELECT id, {', '.join(DATA_COLS)} FROM lancamentos "
+            "WHERE planilha = ? AND mes = ? ORDER BY id",
+            conn, params=(planilha_de(excel_path), mes)
+        )
+    df["vencimento"] = pd.to_datetime(df["vencimento"], errors="coerce")
+    df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
+    return df
+
+
+def inserir_em_lote(db_path: str, excel_path: str, entradas: list[tuple[str, dict]]) -> int:
+    # Várias abas numa única transação
+    planilha = planilha_de(excel_path)
+    with closing(conectar(db_path)) as conn, conn:
+        conn.executemany(_INSERT, [_linha_sql(planilha, mes, r) for mes, r in entradas])
+    return len(entradas)
+
+
+def atualizar_campos(db_path: str, lancamento_id: int, campos: dict) -> bool:
+    campos = {c: v for c, v in campos.items() if c in DATA_COLS}
+    if not campos:
+        return False
+    sql = f"UPDATE lancamentos SET {', '.join(f'{c} = ?' for c in campos)} WHERE id = ?"
+    with closing(conectar(db_path)) as conn, conn:
+        cur = conn.execute(sql, (*(_para_sql(c, v) for c, v in campos.items()), int(lancamento_id)))
+    return cur.rowcount > 0
+
+
+def remover_lancamento(db_path: str, lancamento_id: int) -> bool:
+    with closing(conectar(db_path)) as conn, conn:
+        cur = conn.execute("DELETE FROM lancamentos WHERE id = ?", (int(lancamento_id),))
+    return cur.rowcount > 0
+
+
+def importar_excel(db_path: str, excel_path: str) -> int:
+    # Substitui os lançamentos da planilha pelo conteúdo atual do .xlsx
+    # (uma aba por vez em memória, sem passar pelo cache do app)
+    planilha = planilha_de(excel_path)
+    abas = mapear_abas(leitura.nomes_abas(excel_path))
+    meses = {real: mes for mes, real in abas.items()}
+    total = 0
+    with closing(conectar(db_path)) as conn, conn:
+        conn.execute("DELETE FROM lancamentos WHERE planilha = ?", (planilha,))
+        for real, bruto in leitura.ler_abas(excel_path, [abas[mes] for mes in sorted(abas)], HEADER_ROW):
+            df = normalizar_aba(bruto)
+            df["extras"] = _extras_aba(bruto, df)
+            conn.executemany(_INSERT, (_linha_sql(planilha, meses[real], rec) for rec in df.to_dict("records")))
+            total += len(df)
+        _marcar_importada(conn, planilha)
+    return total
+
+
+def _marcar_importada(conn: sqlite3.Connection, planilha: str) -> None:
+    conn.execute(
+        "INSERT OR REPLACE INTO importacoes (planilha, importado_em) VALUES (?, ?)",
+        (planilha, pd.Timestamp.now().isoformat(timespec="seconds"))
+    )
+
+
+def preparar_base(db_path: str, excel_path: str) -> None:
+    # Primeira execução com o backend SQLite: importa a planilha existente uma
+    # única vez (marcada em `importacoes`; apagar todos os lançamentos de um
+    # livro não o traz de volta). A marca é conferida uma vez por processo.
+    with _preparadas_lock:
+        if (db_path, excel_path) in _preparadas:
+            return
+        planilha = planilha_de(excel_path)
+        with closing(conectar(db_path)) as conn:
+            importada = conn.execute("SELECT 1 FROM importacoes WHERE planilha = ?", (planilha,)).fetchone()
+        if not importada and os.path.isfile(excel_path):
+            if contar_lancamentos(db_path, excel_path):
+                # Banco de uma versão anterior, importado antes da marca
+                with closing(conectar(db_path)) as conn, conn:
+                    _marcar_importada(conn, planilha)
+            else:
+                importar_excel(db_path, excel_path)
+        _preparadas.add((db_path, excel_path))
+
+
+def _nova_aba(wb: Workbook, mes: str):
+    numeric = [s for s in wb.sheetnames if s.strip().isdigit()]
+    if numeric:
+        ws = wb.copy_worksheet(wb[numeric[0]])
+    else:
+        ws = wb.create_sheet()
+        for i, titulo in enumerate(CABECALHO_PADRAO, start=2):
+            ws.cell(row=HEADER_ROW, column=i, value=titulo)
+    ws.title = mes
+    return ws
+
+
+def exportar_excel(db_path: str, excel_path: str) -> bytes:
+    # Gera o .xlsx no layout original (cabeçalho na linha 8, uma aba por mês),
+    # usando a planilha existente como modelo quando ela estiver disponível.
+    if os.path.isfile(excel_path):
+        wb = load_workbook(excel_path)
+    else:
+        wb = Workbook()
+        wb.remove(wb.active)
+
+    with closing(conectar(db_path)) as conn:
+        df = pd.read_sql_query(
+            f"SELECT mes, {', '.join(DATA_COLS)}, extras FROM lancamentos WHERE planilha = ? ORDER BY mes, id",
+            conn, params=(planilha_de(excel_path),)
+        )
+
+    sheet_lookup = mapear_abas(wb.sheetnames)
+    for mes in sorted(set(sheet_lookup) | set(df["mes"])):
+        ws = wb[sheet_lookup[mes]] if mes in sheet_lookup else _nova_aba(wb, mes)
+        registros = df[df["mes"] == mes].to_dict("records")
+        extras = [_extras_excel(rec["extras"]) for rec in registros]
+
+        titulos = next(ws.iter_rows(min_row=HEADER_ROW, max_row=HEADER_ROW, min_col=2, values_only=True), ())
+        mapa = esquema.compilar(titulos)
+        col_pos = {campo: pos + 2 for campo, pos in mapa.items()}
+        # "Situação" é fórmula na planilha: não é limpa nem sobrescrita
+        col_pos.pop("situacao", None)
+        # Demais colunas com título: recebem os extras guardados na importação
+        col_extras = {
+            titulo: pos + 2 for pos, titulo in enumerate(_titulos_unicos(titulos))
+            if titulo is not None and pos not in mapa.values()
+        }
+        for titulo in dict.fromkeys(t for e in extras for t in e):
+            if titulo not in col_extras:
+                col_extras[titulo] = max([len(titulos) + 1, *col_extras.values()]) + 1
+                ws.cell(row=HEADER_ROW, column=col_extras[titulo], value=titulo)
+
+        # Limpa só as colunas reescritas, nas linhas de lançamentos (com
+        # fornecedor ou valor) e nas que vão recebê-los; o resto da aba
+        # (colunas sem título, legendas abaixo da tabela) fica como está
+        colunas = {*col_pos.values(), *col_extras.values()}
+        chaves = [col_pos[c] for c in ("fornecedor", "valor") if c in col_pos]
+        linhas = set(range(HEADER_ROW + 1, HEADER_ROW + 1 + len(registros)))
+        for numero, valores in enumerate(ws.iter_rows(min_row=HEADER_ROW + 1, values_only=True), start=HEADER_ROW + 1):
+            if any(col <= len(valores) and valores[col - 1] not in (None, "") for col in chaves):
+                linhas.add(numero)
+        for numero in linhas:
+            for col in colunas:
+                cell = ws.cell(row=numero, column=col)
+                if isinstance(cell, MergedCell) or (isinstance(cell.value, str) and cell.value.startswith("=")):
+                    continue
+                cell.value = None
+
+        for i, (rec, extra) in enumerate(zip(registros, extras)):
+            for campo, col in col_pos.items():
+                ws.cell(row=HEADER_ROW + 1 + i, column=col, value=_para_excel(campo, rec.get(campo)))
+            for titulo, val in extra.items():
+                ws.cell(row=HEADER_ROW + 1 + i, column=col_extras[titulo], value=val)
+
+    buffer = BytesIO()
+    wb.save(buffer)
+    return buffer.getvalue()
+
+
+if __name__ == "__main__":
+    # python armazenamento.py importar|exportar <banco.db> <planilha.xlsx> [saida.xlsx]
+    if len(sys.argv) < 4 or sys.argv[1] not in ("importar", "exportar"):
+        sys.exit("uso: python armazenamento.py importar|exportar <banco.db> <planilha.xlsx> [saida.xlsx]")
+    acao, db, excel = sys.argv[1:4]
+    if acao == "importar":
+        print(f"{importar_excel(db, excel)} lançamentos importados de '{excel}'")
+    else:
+        saida = sys.argv[4] if len(sys.argv) > 4 else excel
+        with open(saida, "wb") as f:
+            f.write(exportar_excel(db, excel))
+        print(f"Planilha exportada para '{saida}'")
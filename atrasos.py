@@ -0,0 +1,163 @@
+import threading
+from collections import OrderedDict
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Relatório de atrasos por faixa de dias (1–30, 31–60, 61–90, 90+) e por
+# fornecedor/cliente. Cada aba guarda em memória os lançamentos não quitados
+# somados por (vencimento, fornecedor), o que não depende da data de hoje: só é
+# refeito quando a aba muda. O relatório junta essas partes e, quando o dia
+# vira, só reclassifica as linhas cujo atraso cruzou o limite de uma faixa.
+LIMITES = [0, 30, 60, 90, np.inf]  # faixas de pd.cut: (0, 30], (30, 60], ...; vencer hoje não é atraso
+FAIXAS = ["1–30", "31–60", "61–90", "90+"]
+QUITADOS = ("Pago", "Recebido", "Sem Data")
+MAX_RELATORIOS = 8
+
+# (planilha, aba) -> (chave de validade, parte da aba)
+_partes: dict[tuple[str, str], tuple[object, pd.DataFrame]] = {}
+# livros -> (chaves das partes, relatório)
+_relatorios: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def parte_aba(df: pd.DataFrame) -> pd.DataFrame:
+    # Em aberto por (dia de vencimento, fornecedor): total e nº de lançamentos
+    colunas = ["vencimento", "fornecedor", "total", "contagem"]
+    if df.empty:
+        return pd.DataFrame(columns=colunas)
+    aberto = ~df["status_pagamento"].isin(QUITADOS)
+    base = pd.DataFrame({
+        "vencimento": pd.to_datetime(df["vencimento"], errors="coerce").dt.normalize(),
+        "fornecedor": df["fornecedor"].astype(object).where(df["fornecedor"].notna(), "").astype(str),
+        "valor": pd.to_numeric(df["valor"], errors="coerce"),
+    })[aberto.to_numpy()].dropna(subset=["vencimento"])
+    return (
+        base.groupby(["vencimento", "fornecedor"], sort=False)["valor"]
+        .agg(total="sum", contagem="size")
+        .reset_index()
+    )
+
+
+def parte(excel_path: str, sheet_name: str, chave, carregar) -> pd.DataFrame:
+    # Devolve a parte da aba; carregar() só é chamado quando a chave mudou
+    with _lock:
+        em_cache = _partes.get((excel_path, sheet_name))
+        if em_cache and em_cache[0] == chave:
+            return em_cache[1]
+
+    resultado = parte_aba(carregar())
+    with _lock:
+        _partes[(excel_path, sheet_name)] = (chave, resultado)
+    return resultado
+
+
+def descartar(excel_path: str, sheet_name: str) -> None:
+    # Chamada pelas rotinas de gravação após alterar uma aba
+    with _lock:
+        _partes.pop((excel_path, sheet_name), None)
+        for livros in [k for k in _relatorios if excel_path in k]:
+            _relatorios.pop(livros, None)
+
+
+def _dia(valor) -> int:
+    return int(np.datetime64(pd.Timestamp(valor).date(), "D").astype(np.int64))
+
+
+def _faixas(dias: np.ndarray) -> np.ndarray:
+    # Código da faixa (0 a 3) de cada atraso em dias; -1 para não vencidos
+    if not len(dias):
+        return np.array([], dtype=np.int64)
+    codigos = pd.cut(dias, LIMITES, labels=False)
+    return np.where(np.isnan(codigos), -1, codigos).astype(np.int64)
+
+
+class Relatorio:
+    def __init__(self, partes: list[pd.DataFrame], hoje: date):
+        partes = [p for p in partes if not p.empty]
+        base = pd.concat(partes, ignore_index=True) if partes else parte_aba(pd.DataFrame())
+        dias = pd.to_datetime(base["vencimento"]).to_numpy().astype("datetime64[D]").astype(np.int64)
+        ordem = np.argsort(dias, kind="stable")
+        # Linhas ordenadas por vencimento: as que mudam de faixa num dia são fatias contíguas
+        self.vencimentos = dias[ordem]
+        codigos, self.fornecedores = pd.factorize(base["fornecedor"].to_numpy()[ordem])
+        self.codigos_fornecedor = codigos
+        self.valores = base["total"].to_numpy(dtype=float)[ordem]
+        self.quantidades = base["contagem"].to_numpy(dtype=np.int64)[ordem]
+        self.hoje = _dia(hoje)
+        self.faixas = _faixas(self.hoje - self.vencimentos)
+        self.totais = np.zeros((len(self.fornecedores), len(FAIXAS)))
+        self.contagens = np.zeros((len(self.fornecedores), len(FAIXAS)), dtype=np.int64)
+        self._somar(np.arange(len(self.valores)), self.faixas, 1)
+
+    def _somar(self, linhas: np.ndarray, faixas: np.ndarray, sinal: int) -> None:
+        vencidas = faixas >= 0
+        linhas, faixas = linhas[vencidas], faixas[vencidas]
+        np.add.at(self.totais, (self.codigos_fornecedor[linhas], faixas), sinal * self.valores[linhas])
+        np.add.at(self.contagens, (self.codigos_fornecedor[linhas], faixas), sinal * self.quantidades[linhas])
+
+    def rolar(self, hoje: date) -> int:
+        # Avança o relatório para `hoje`; devolve quantas linhas mudaram de faixa
+        novo = _dia(hoje)
+        passo = novo - self.hoje
+        if passo == 0:
+            return 0
+        if passo < 0 or passo > LIMITES[1]:
+            # Data para trás ou salto longo: reclassifica tudo
+            linhas = np.arange(len(self.valores))
+        else:
+            # Com `passo` dias a mais, o atraso de uma linha cruza o limite L
+            # quando hoje - vencimento estava em (L - passo, L]
+            limites = np.array(LIMITES[:-1])
+            inicio = np.searchsorted(self.vencimentos, self.hoje - limites, side="left")
+            fim = np.searchsorted(self.vencimentos, self.hoje - limites + passo, side="left")
+            linhas = np.concatenate([np.arange(i, f) for i, f in zip(inicio, fim)]).astype(np.int64)
+
+        antigas = self.faixas[linhas]
+        novas = _faixas(novo - self.vencimentos[linhas])
+        mudaram = antigas != novas
+        linhas, antigas, novas = linhas[mudaram], antigas[mudaram], novas[mudaram]
+        self._somar(linhas, antigas, -1)
+        self._somar(linhas, novas, 1)
+        self.faixas[linhas] = novas
+        self.hoje = novo
+        return len(linhas)
+
+    def por_faixa(self) -> pd.DataFrame:
+        return pd.DataFrame({
+            "faixa": FAIXAS, "total": self.totais.sum(axis=0), "contagem": self.contagens.sum(axis=0)
+        })
+
+    def por_fornecedor(self) -> pd.DataFrame:
+        # Uma linha por fornecedor com atraso, do maior para o menor total
+        tabela = pd.DataFrame(self.totais, columns=FAIXAS)
+        tabela.insert(0, "fornecedor", self.fornecedores)
+        tabela["total"] = self.totais.sum(axis=1)
+        tabela["contagem"] = self.contagens.sum(axis=1)
+        return (
+            tabela[tabela["contagem"] > 0]
+            .sort_values("total", ascending=False, kind="stable")
+            .reset_index(drop=True)
+        )
+
+
+def relatorio(livros: tuple, chaves: tuple, carregar, hoje: date | None = None) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Totais por faixa e por fornecedor dos livros na data `hoje`. Enquanto as
+    # partes não mudam (mesmas chaves) o relatório em memória só é rolado para
+    # a data nova; carregar() devolve as partes e só é chamado quando alguma
+    # aba mudou.
+    hoje = hoje or date.today()
+    with _lock:
+        em_cache = _relatorios.get(livros)
+        if em_cache and em_cache[0] == chaves:
+            _relatorios.move_to_end(livros)
+            em_cache[1].rolar(hoje)
+            return em_cache[1].por_faixa(), em_cache[1].por_fornecedor()
+
+    novo = Relatorio(carregar(), hoje)
+    with _lock:
+        _relatorios[livros] = (chaves, novo)
+        while len(_relatorios) > MAX_RELATORIOS:
+            _relatorios.popitem(last=False)
+        return novo.por_faixa(), novo.por_fornecedor()
@@ -0,0 +1,486 @@
+# Suíte de desempenho do caminho de dados (pytest-benchmark). Gera livros
+# sintéticos no layout real (cabeçalho na linha 8, abas "01".."12", cabeçalhos
+# de Contas a Pagar e de Contas a Receber) com 1k, 10k e 100k lançamentos e
+# mede as funções do app (dados.py) que as telas chamam: abas do arquivo
+# (get_existing_sheets), leitura de uma aba e do ano inteiro sem cache
+# (load_data), edição de um lançamento (update_record), inclusão (add_record) e
+# remoção (delete_record) até o fim da gravação pela fila, Dashboard
+# (dashboard_summary, aging_report, cash_flow), índices e consultas da busca,
+# formatação da página, anexos da aba e a virada do dia no relatório de atrasos.
+#
+# Fora dos tamanhos: as versões vetorizadas contra as implementações antigas
+# (tests/referencias.py; os testes conferem que o resultado é o mesmo), busca
+# no conteúdo dos anexos, gravações concorrentes de vários processos no mesmo
+# workbook (o resultado é conferido) e a primeira execução de cada página num
+# processo novo.
+#
+# --benchmark-autosave grava cada execução em .benchmarks/ com o commit, e
+# --benchmark-compare compara com a última gravada, falhando a partir da
+# piora indicada:
+#
+#   python -m pytest benchmarks/suite.py --benchmark-autosave --benchmark-compare --benchmark-compare-fail=min:20%
+#   SUITE_TAMANHOS=1000,10000 SUITE_REPETICOES=5 python -m pytest benchmarks/suite.py -k "load_data or busca"
+import hashlib
+import io
+import multiprocessing
+import os
+import random
+import subprocess
+import sys
+from contextlib import closing
+from datetime import date, timedelta
+
+import numpy as np
+import pandas as pd
+import pytest
+from openpyxl import Workbook, load_workbook
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+sys.path.insert(0, os.path.join(RAIZ, "tests"))
+import agregados  # noqa: E402
+import anexos  # noqa: E402
+import atrasos  # noqa: E402
+import busca  # noqa: E402
+import conteudo  # noqa: E402
+import dados  # noqa: E402
+import fila  # noqa: E402
+import fluxo  # noqa: E402
+import formatacao  # noqa: E402
+import gravacao  # noqa: E402
+import planilhas  # noqa: E402
+from planilhas import HEADER_ROW, classificar_status  # noqa: E402
+from referencias import aba_sintetica, evolucao_lambda, status_iterrows  # noqa: E402
+
+TAMANHOS = [int(t) for t in os.environ.get("SUITE_TAMANHOS", "1000,10000,100000").split(",")]
+REPETICOES = int(os.environ.get("SUITE_REPETICOES", "3"))
+ABAS = [f"{mes:02d}" for mes in range(1, 13)]
+ABA = "06"
+ANO = 2025
+TIPOS = ["pagar", "receber"]
+# Acima disso as etapas que leem ou gravam o arquivo são medidas uma vez só
+LIMITE_REPETIR = 10_000
+PAGINA = 50  # linhas da página da tabela de lançamentos
+LINHAS_STATUS = 100_000  # aba sintética da classificação de status
+LINHAS_EVOLUCAO = 50_000  # lançamentos de vários anos da evolução mensal
+DOCUMENTOS = 20_000  # anexos com texto no índice de conteúdo
+PROCESSOS, GRAVACOES = 6, 15  # gravações concorrentes
+PAGINAS = ["Login", "Contas a Pagar", "Contas a Receber", "Buscar Lançamentos", "Dashboard"]
+SEM_GRAFICOS = ("Login", "Contas a Pagar", "Contas a Receber")  # não devem importar plotly
+
+# A suíte mede a gravação, não a espera da fila para juntar comandos seguidos
+fila.AGRUPAR = 0
+
+# Cabeçalhos das planilhas reais (a coluna A fica vazia)
+CABECALHOS = {
+    "pagar": [
+        "Data da Nota Fiscal", "Forma de Pagamento", "Fornecedor", "OS Interna",
+        "Vencimento", "Valor", "Estado", "Situação",
+    ],
+    "receber": [
+        "Data do Pedido", "Descrição Serviços/Produto", "Nº Nota Fiscal", "OS: Cliente",
+        "Qtda. Parcelas", "Vencimento", "Valor", "Estado", "Situação",
+    ],
+}
+ESTADOS = {"pagar": ["Em Aberto", "Pago"], "receber": ["A Receber", "Recebido"]}
+CONSULTAS = {
+    "contém": busca.Consulta(texto="fornecedor 01"),
+    "prefixo": busca.Consulta(texto="forn", prefixo=True),
+    "faixa de valor": busca.Consulta(valor_min=1000, valor_max=2000),
+}
+PALAVRAS = ["boleto", "bancário", "pagamento", "pix", "aluguel", "energia", "serviços", "nota", "fiscal", "cobrança"]
+
+# Primeira execução do app num interpretador novo, como o primeiro acesso ao servidor
+PARTIDA = """
+import sys
+from streamlit.testing.v1 import AppTest
+pagina = sys.argv[1]
+at = AppTest.from_file("contasapagar.py", default_timeout=300)
+if pagina != "Login":
+    at.session_state["logged_in"] = True
+    at.session_state["username"] = "Vinicius"
+    at.session_state["pagina"] = pagina
+at.run()
+assert not at.exception, [e.value for e in at.exception]
+print("plotly.express" in sys.modules)
+"""
+
+
+def criar_livro(caminho: str, tipo: str, linhas: int, seed: int = 42) -> None:
+    # Livro do ano com `linhas` lançamentos divididos entre as 12 abas
+    rng = np.random.default_rng(seed)
+    wb = Workbook(write_only=True)
+    por_aba = np.array_split(np.arange(linhas), len(ABAS))
+    fornecedores = np.array([f"FORNECEDOR {i:03d}" for i in range(200)], dtype=object)
+    for mes, indices in zip(ABAS, por_aba):
+        ws = wb.create_sheet(mes)
+        ws.append([None, f"Contas a {tipo} {ANO}"])
+        for _ in range(HEADER_ROW - 2):
+            ws.append([])
+        ws.append([None] + CABECALHOS[tipo])
+        n = len(indices)
+        base = pd.Timestamp(ANO, int(mes), 1)
+        emissao = base + pd.to_timedelta(rng.integers(0, 28, n), unit="D")
+        vencimento = emissao + pd.to_timedelta(rng.integers(0, 60, n), unit="D")
+        valores = rng.uniform(10, 5000, n).round(2)
+        estados = rng.choice(ESTADOS[tipo], n)
+        nomes = rng.choice(fornecedores, n)
+        for i in range(n):
+            emitida, vence = emissao[i].to_pydatetime(), vencimento[i].to_pydatetime()
+            if tipo == "pagar":
+                ws.append([None, emitida, "Boleto", nomes[i], int(indices[i]), vence, valores[i], estados[i], estados[i]])
+            else:
+                ws.append([
+                    None, emitida, "Serviço", int(indices[i]), nomes[i], 1, vence, valores[i], estados[i], estados[i]
+                ])
+    wb.save(caminho)
+
+
+@pytest.fixture(scope="module", params=TAMANHOS, ids=lambda linhas: f"{linhas}")
+def livros(request, tmp_path_factory) -> dict:
+    # Livros de Pagar e de Receber com o mesmo número de lançamentos; os
+    # anexos ficam na pasta temporária
+    pasta = tmp_path_factory.mktemp(f"livros{request.param}")
+    livros = {"linhas": request.param}
+    for tipo in TIPOS:
+        livros[tipo] = str(pasta / f"Contas a {tipo} {ANO}.xlsx")
+        criar_livro(livros[tipo], tipo, request.param)
+    anexos_dir, dados.ANEXOS_DIR = dados.ANEXOS_DIR, str(pasta / "anexos")
+    yield livros
+    dados.ANEXOS_DIR = anexos_dir
+
+
+def rodadas(livros: dict, arquivo: bool = False) -> int:
+    return 1 if arquivo and livros["linhas"] > LIMITE_REPETIR else REPETICOES
+
+
+def frio(caminho: str) -> None:
+    # Nem o arquivo em memória nem as cópias normalizadas do cache do Streamlit
+    planilhas.descartar_arquivo(caminho)
+    dados._load_data_cached.clear()
+
+
+def sem_derivados(*caminhos: str) -> None:
+    # Resumos, índices e partes por aba refeitos a partir das abas em cache
+    for caminho in caminhos:
+        for aba in ABAS:
+            dados.discard_sheet_caches(caminho, aba)
+
+
+def gravar(caminho: str, operacao) -> None:
+    # As funções do app só enfileiram no Excel: a medida vai até a gravação
+    assert operacao(), "a operação foi recusada"
+    assert fila.esperar(caminho), "a fila não terminou a gravação"
+
+
+def incluidos(caminho: str) -> pd.Index:
+    df = dados.load_data(caminho, ABA)
+    return df.index[df["fornecedor"] == "SUITE"]
+
+
+def registro(tipo: str) -> dict:
+    hoje = date.today()
+    return {
+        "data_nf": hoje, "forma_pagamento": "Boleto", "fornecedor": "SUITE", "os": 1,
+        "vencimento": hoje, "valor": 1.23, "estado": ESTADOS[tipo][0],
+    }
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_get_existing_sheets(benchmark, livros, tipo):
+    abas = benchmark.pedantic(
+        dados.get_existing_sheets, args=(livros[tipo],), setup=dados._get_existing_sheets_cached.clear,
+        rounds=REPETICOES
+    )
+    assert abas == ABAS
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_load_data_uma_aba(benchmark, livros, tipo):
+    caminho = livros[tipo]
+    benchmark.pedantic(
+        dados.load_data, args=(caminho, ABA), setup=lambda: frio(caminho), rounds=rodadas(livros, arquivo=True)
+    )
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_load_data_doze_abas(benchmark, livros, tipo):
+    caminho = livros[tipo]
+    dfs = benchmark.pedantic(
+        lambda: [dados.load_data(caminho, aba, tuple(ABAS)) for aba in ABAS], setup=lambda: frio(caminho),
+        rounds=rodadas(livros, arquivo=True)
+    )
+    assert sum(len(df) for df in dfs) == livros["linhas"]
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_load_data_em_cache(benchmark, livros, tipo):
+    dados.load_data(livros[tipo], ABA)
+    benchmark.pedantic(dados.load_data, args=(livros[tipo], ABA), rounds=REPETICOES)
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_update_record(benchmark, livros, tipo):
+    caminho = livros[tipo]
+
+    def preparar():
+        df = dados.load_data(caminho, ABA)
+        idx = df.index[0]
+        return (df, idx, {"valor": round(float(df.at[idx, "valor"]) + 0.01, 2)}), {}
+
+    benchmark.pedantic(
+        lambda df, idx, alteracao: gravar(caminho, lambda: dados.update_record(caminho, ABA, df, idx, alteracao)),
+        setup=preparar, rounds=rodadas(livros, arquivo=True)
+    )
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_add_record(benchmark, livros, tipo):
+    caminho = livros[tipo]
+    rodada = rodadas(livros, arquivo=True)
+    benchmark.pedantic(lambda: gravar(caminho, lambda: dados.add_record(caminho, ABA, registro(tipo))), rounds=rodada)
+    assert len(incluidos(caminho)) == rodada, "inclusão não gravada"
+    # o livro volta ao tamanho original
+    while len(incluidos(caminho)):
+        gravar(caminho, lambda: dados.delete_record(caminho, ABA, dados.load_data(caminho, ABA), incluidos(caminho)[0]))
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_delete_record(benchmark, livros, tipo):
+    caminho = livros[tipo]
+
+    def preparar():
+        # cada rodada remove um lançamento incluído fora da medida
+        gravar(caminho, lambda: dados.add_record(caminho, ABA, registro(tipo)))
+        return (dados.load_data(caminho, ABA), incluidos(caminho)[0]), {}
+
+    benchmark.pedantic(
+        lambda df, idx: gravar(caminho, lambda: dados.delete_record(caminho, ABA, df, idx)),
+        setup=preparar, rounds=rodadas(livros, arquivo=True)
+    )
+    assert not len(incluidos(caminho)), "remoção não gravada"
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_dashboard_summary(benchmark, livros, tipo):
+    caminho = livros[tipo]
+    resumo = benchmark.pedantic(
+        dados.dashboard_summary, args=(caminho, ABAS), setup=lambda: sem_derivados(caminho), rounds=REPETICOES
+    )
+    assert resumo["lancamentos"].sum() == livros["linhas"]
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_aging_report(benchmark, livros, tipo):
+    caminho = livros[tipo]
+    benchmark.pedantic(dados.aging_report, args=([caminho],), setup=lambda: sem_derivados(caminho), rounds=REPETICOES)
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_atrasos_virada_do_dia(benchmark, livros, tipo):
+    hoje = date.today()
+    dfs = [dados.load_data(livros[tipo], aba, tuple(ABAS)) for aba in ABAS]
+    relatorio = atrasos.Relatorio([atrasos.parte_aba(df) for df in dfs], hoje)
+    dias = iter(range(1, 1_000_000))
+
+    def rolar():
+        relatorio.rolar(hoje + timedelta(days=next(dias)))
+        return relatorio.por_faixa(), relatorio.por_fornecedor()
+
+    benchmark.pedantic(rolar, rounds=REPETICOES)
+
+
+def test_cash_flow(benchmark, livros):
+    benchmark.pedantic(
+        dados.cash_flow, args=([livros["pagar"]], [livros["receber"]], fluxo.HORIZONTE, 0.0),
+        setup=lambda: sem_derivados(livros["pagar"], livros["receber"]), rounds=REPETICOES
+    )
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_search_index(benchmark, livros, tipo):
+    caminho = livros[tipo]
+    benchmark.pedantic(
+        lambda: [dados.search_index(caminho, aba, tuple(ABAS)) for aba in ABAS],
+        setup=lambda: sem_derivados(caminho), rounds=REPETICOES
+    )
+
+
+@pytest.mark.parametrize("consulta", list(CONSULTAS))
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_busca(benchmark, livros, tipo, consulta):
+    indices = [(tipo, aba, dados.search_index(livros[tipo], aba, tuple(ABAS))) for aba in ABAS]
+    resultado = benchmark.pedantic(busca.buscar, args=(indices, CONSULTAS[consulta]), rounds=REPETICOES)
+    assert resultado.total
+
+
+@pytest.mark.parametrize("tipo", TIPOS)
+def test_formatacao_da_aba(benchmark, livros, tipo):
+    df = dados.load_data(livros[tipo], ABA)
+    benchmark.pedantic(formatacao.formatar, args=(df,), rounds=REPETICOES)
+
+
+@pytest.fixture(scope="module")
+def anexos_da_aba(livros) -> tuple[str, pd.DataFrame]:
+    # Um anexo por lançamento da aba, com poucos arquivos distintos
+    caminho = livros["pagar"]
+    df = dados.load_data(caminho, ABA)
+    conteudos = [os.urandom(4096) for _ in range(20)]
+    for i, lancamento in enumerate(anexos.chaves(df, dados.CHAVE_ANEXO)):
+        anexos.anexar(dados.ANEXOS_DIR, caminho, ABA, lancamento, "boleto", f"{i}.pdf", io.BytesIO(conteudos[i % 20]))
+    return caminho, df
+
+
+def test_anexos_contagem_da_aba(benchmark, anexos_da_aba):
+    caminho, df = anexos_da_aba
+    contagem = benchmark.pedantic(anexos.contagens, args=(dados.ANEXOS_DIR, caminho, ABA), rounds=REPETICOES)
+    assert sum(contagem.values()) == len(df)
+
+
+def test_anexos_chaves_da_pagina(benchmark, anexos_da_aba):
+    caminho, df = anexos_da_aba
+    contagem = anexos.contagens(dados.ANEXOS_DIR, caminho, ABA)
+    benchmark.pedantic(
+        lambda: [contagem.get(c, "") for c in anexos.chaves(df.iloc[:PAGINA], dados.CHAVE_ANEXO)], rounds=REPETICOES
+    )
+
+
+@pytest.mark.parametrize("is_receber", [False, True], ids=TIPOS)
+@pytest.mark.parametrize("versao", ["iterrows", "vetorizada"])
+def test_classificar_status(benchmark, versao, is_receber):
+    hoje = date.today()
+    df = aba_sintetica(LINHAS_STATUS, is_receber, hoje)
+    benchmark.group = f"classificar_status ({LINHAS_STATUS} linhas)"
+    if versao == "iterrows":
+        benchmark.pedantic(status_iterrows, args=(df, is_receber, hoje), rounds=1)
+    else:
+        benchmark.pedantic(classificar_status, args=(df, is_receber, hoje), rounds=REPETICOES)
+
+
+@pytest.mark.parametrize("versao", ["lambda", "vetorizada", "resumo"])
+def test_evolucao_mensal(benchmark, versao):
+    hoje = date.today()
+    df = aba_sintetica(LINHAS_EVOLUCAO, False, hoje)
+    df["vencimento"] -= pd.to_timedelta((df.index % 6) * 365, unit="D")
+    df["status_pagamento"] = classificar_status(df, False, hoje)
+    df["mes_ano"] = df["vencimento"].dt.to_period("M")
+    benchmark.group = f"evolucao_mensal ({LINHAS_EVOLUCAO} linhas)"
+    if versao == "lambda":
+        benchmark.pedantic(evolucao_lambda, args=(df, "Pago", "pagos_mes"), rounds=REPETICOES)
+    elif versao == "vetorizada":
+        benchmark.pedantic(
+            agregados.evolucao_mensal, args=(df, "Pago", "pagos_mes"),
+            kwargs={"valor": "valor", "status": "status_pagamento"}, rounds=REPETICOES
+        )
+    else:
+        resumo = agregados.agregar_aba(df)
+        benchmark.pedantic(agregados.evolucao_mensal, args=(resumo, "Pago", "pagos_mes"), rounds=REPETICOES)
+
+
+def documento(rng: random.Random) -> str:
+    # Texto de um boleto: palavras, CNPJ, valor e linha digitável
+    cnpj = f"{rng.randrange(10**8):08d}{rng.randrange(10**4):04d}{rng.randrange(100):02d}"
+    linha = " ".join([
+        f"{rng.randrange(10**5):05d}.{rng.randrange(10**5):05d}", f"{rng.randrange(10**5):05d}.{rng.randrange(10**6):06d}",
+        f"{rng.randrange(10**5):05d}.{rng.randrange(10**6):06d}", str(rng.randrange(10)), f"{rng.randrange(10**14):014d}",
+    ])
+    valor = f"{rng.randrange(10, 50000):,}".replace(",", ".") + f",{rng.randrange(100):02d}"
+    palavras = " ".join(rng.choice(PALAVRAS) for _ in range(60))
+    return (
+        f"{palavras}\nCNPJ {cnpj[:2]}.{cnpj[2:5]}.{cnpj[5:8]}/{cnpj[8:12]}-{cnpj[12:]}\n"
+        f"Valor R$ {valor}\n{linha}\n{palavras}"
+    )
+
+
+@pytest.fixture(scope="module")
+def indice_conteudo(tmp_path_factory) -> tuple[str, dict[str, str]]:
+    # Textos gravados direto no índice: a extração dos PDFs não entra na medida
+    pasta = str(tmp_path_factory.mktemp("conteudo"))
+    rng = random.Random(42)
+    textos = [documento(rng) for _ in range(DOCUMENTOS)]
+    with closing(conteudo.conectar(pasta)) as conn, conn:
+        for i, texto in enumerate(textos):
+            sha = hashlib.sha256(texto.encode()).hexdigest()
+            conn.execute("INSERT INTO objetos VALUES (?, ?, 'application/pdf')", (sha, len(texto)))
+            conn.execute(
+                "INSERT INTO vinculos (planilha, mes, lancamento, campo, nome, sha256, criado_em) "
+                "VALUES ('Contas a pagar 2025.xlsx', ?, ?, 'boleto', ?, ?, '')",
+                (f"{i % 12 + 1:02d}", f"linha:{i + HEADER_ROW + 1}", f"{i}.pdf", sha)
+            )
+            conn.execute("INSERT INTO extraidos VALUES (?, 'texto', 1)", (sha,))
+            conn.execute("INSERT INTO textos VALUES (?, ?, ?)", (sha, texto, conteudo.numeros(texto)))
+
+    alvo = textos[DOCUMENTOS // 2].splitlines()
+    return pasta, {
+        "linha digitável": alvo[-2],
+        "CNPJ": alvo[-4].split()[1],
+        "valor": alvo[-3].split()[-1],
+        "palavras": "aluguel energia",
+    }
+
+
+@pytest.mark.parametrize("consulta", ["linha digitável", "CNPJ", "valor", "palavras"])
+def test_conteudo_buscar(benchmark, indice_conteudo, consulta):
+    pasta, consultas = indice_conteudo
+    achados = benchmark.pedantic(conteudo.buscar, args=(pasta, consultas[consulta]), rounds=REPETICOES)
+    assert achados
+
+
+def trabalhador(caminho: str, gravacoes: int, n: int) -> None:
+    # ler → alterar → salvar: incrementa o contador e inclui uma linha
+    for i in range(gravacoes):
+        with gravacao.editar_planilha(caminho, ["01"]) as wb:
+            ws = wb["01"]
+            contador = ws.cell(row=HEADER_ROW + 1, column=3)
+            contador.value += 1
+            linha = HEADER_ROW + 2
+            while ws.cell(row=linha, column=2).value:
+                linha += 1
+            ws.cell(row=linha, column=2, value=f"P{n}-{i}")
+            ws.cell(row=linha, column=3, value=1.0)
+
+
+def test_gravacao_concorrente(benchmark, tmp_path):
+    # Vários processos gravando no mesmo workbook: sem o lock, incrementos e
+    # linhas se perdem
+    caminho = str(tmp_path / "concorrencia.xlsx")
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "01"
+    for col, titulo in enumerate(["Fornecedor", "Valor"], start=2):
+        ws.cell(row=HEADER_ROW, column=col, value=titulo)
+    ws.cell(row=HEADER_ROW + 1, column=2, value="CONTADOR")
+    ws.cell(row=HEADER_ROW + 1, column=3, value=0)
+    wb.save(caminho)
+
+    def concorrer():
+        filhos = [multiprocessing.Process(target=trabalhador, args=(caminho, GRAVACOES, n)) for n in range(PROCESSOS)]
+        for p in filhos:
+            p.start()
+        for p in filhos:
+            p.join()
+        assert all(p.exitcode == 0 for p in filhos), "algum processo falhou"
+
+    benchmark.extra_info["gravações"] = PROCESSOS * GRAVACOES
+    benchmark.pedantic(concorrer, rounds=1)
+
+    linhas = list(load_workbook(caminho, read_only=True)["01"].iter_rows(
+        min_row=HEADER_ROW + 1, min_col=2, max_col=3, values_only=True
+    ))
+    esperado = PROCESSOS * GRAVACOES
+    assert linhas[0][1] == esperado, f"contador {linhas[0][1]} != {esperado}: gravações perdidas"
+    incluidas = [nome for nome, _ in linhas[1:] if nome]
+    assert len(incluidas) == len(set(incluidas)) == esperado, "linhas incluídas perdidas ou duplicadas"
+
+
+@pytest.mark.parametrize("pagina", PAGINAS)
+def test_partida(benchmark, pagina):
+    # Processo inteiro: interpretador, imports do app e a primeira execução
+    def executar():
+        return subprocess.run(
+            [sys.executable, "-c", PARTIDA, pagina], cwd=RAIZ, capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+
+    plotly = benchmark.pedantic(executar, rounds=REPETICOES)
+    if pagina in SEM_GRAFICOS:
+        assert plotly == "False", f"{pagina} importou plotly na primeira execução"
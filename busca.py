@@ -0,0 +1,318 @@
+import re
+import threading
+import unicodedata
+from dataclasses import dataclass
+from datetime import date
+from functools import reduce
+
+import numpy as np
+import pandas as pd
+
+# Busca de lançamentos em todas as abas das planilhas. Cada aba tem um índice
+# em memória (refeito só quando a aba muda): os valores distintos de cada campo
+# de texto com um índice invertido de palavras, vetores ordenados de valor e
+# vencimento para as faixas e listas de posições por estado. A consulta combina
+# máscaras booleanas, sem percorrer os lançamentos. A busca por trecho
+# ("contém") varre os valores distintos de todas as abas de uma vez, como um
+# único texto: com as poucas centenas de lançamentos de cada aba, um índice de
+# trigramas custava mais para montar e consultar do que a varredura.
+CAMPOS_TEXTO = ["fornecedor", "os", "forma_pagamento"]
+_PALAVRA = re.compile(r"\w+")
+_FIM = "\U0010ffff"  # maior caractere: limite superior da faixa de prefixo
+_SEP = "\x00"  # separa os valores distintos no texto varrido pelo "contém"
+
+# (planilha, aba) -> (chave de validade, índice da aba)
+_indices: dict[tuple[str, str], tuple[object, "IndiceAba"]] = {}
+_lock = threading.Lock()
+
+# Textos juntos das últimas combinações de índices varridas pelo "contém"
+# (uma por campo de texto buscado); ver _juntar
+_juntos: list[tuple[list, tuple[str, np.ndarray, np.ndarray]]] = []
+MAX_JUNTOS = 2 * len(CAMPOS_TEXTO)
+
+
+@dataclass
+class Consulta:
+    texto: str = ""
+    campos: tuple = tuple(CAMPOS_TEXTO)
+    prefixo: bool = False  # True: palavras que começam com o texto; False: contém
+    valor_min: float | None = None
+    valor_max: float | None = None
+    vencimento_de: date | None = None
+    vencimento_ate: date | None = None
+    estados: tuple = ()
+
+
+def normalizar(texto: str) -> str:
+    # Minúsculas e sem acentos: "Fábrica" e "fabrica" se encontram
+    decomposto = unicodedata.normalize("NFKD", str(texto).lower())
+    return "".join(c for c in decomposto if not unicodedata.combining(c))
+
+
+class _IndiceTexto:
+    # Índice de um campo de texto sobre os valores distintos da aba (fornecedores
+    # se repetem muito): cada linha aponta para o seu valor distinto
+    def __init__(self, valores: pd.Series):
+        texto = valores.astype(object).where(valores.notna(), "").astype(str).to_numpy(dtype=str)
+        self.originais, self.codigos = np.unique(texto, return_inverse=True)
+        self.distintos = [normalizar(v) for v in self.originais]
+        # Os distintos num só texto, cada um seguido de _SEP, e onde cada um começa
+        self.junto = "".join(v + _SEP for v in self.distintos)
+        self.inicios = np.cumsum([0] + [len(v) + 1 for v in self.distintos])[:-1]
+
+        palavras: dict[str, list[int]] = {}
+        for i, v in enumerate(self.distintos):
+            for p in set(_PALAVRA.findall(v)):
+                palavras.setdefault(p, []).append(i)
+        self.vocabulario = np.array(sorted(palavras), dtype=str)
+        self.postings = [np.array(palavras[p]) for p in self.vocabulario]
+
+    def _com_prefixo(self, termo: str) -> np.ndarray:
+        ini = np.searchsorted(self.vocabulario, termo, side="left")
+        fim = np.searchsorted(self.vocabulario, termo + _FIM, side="left")
+        if ini == fim:
+            return np.array([], dtype=int)
+        return np.unique(np.concatenate(self.postings[ini:fim]))
+
+    def prefixo(self, termo: str) -> np.ndarray:
+        # Distintos em que cada palavra da busca inicia alguma palavra do valor
+        palavras = _PALAVRA.findall(termo)
+        if not palavras:
+            return np.arange(len(self.distintos))
+        return reduce(np.intersect1d, (self._com_prefixo(p) for p in palavras))
+
+    def contem(self, termo: str) -> np.ndarray:
+        # Distintos que contêm o trecho (ver _contidos, que varre várias abas)
+        return _contidos([self], termo)[0]
+
+    def linhas(self, distintos: np.ndarray) -> np.ndarray:
+        marcados = np.zeros(len(self.distintos), dtype=bool)
+        marcados[distintos] = True
+        return marcados[self.codigos]
+
+
+def _juntar(indices: list[_IndiceTexto]) -> tuple[str, np.ndarray, np.ndarray]:
+    # Texto das abas juntas, início de cada distinto nele (numeração corrida) e
+    # primeiro distinto de cada aba; guardado enquanto os índices forem os mesmos
+    with _lock:
+        for chave, juntos in _juntos:
+            if len(chave) == len(indices) and all(a is b for a, b in zip(chave, indices)):
+                return juntos
+    deslocamentos = np.cumsum([0] + [len(indice.junto) for indice in indices[:-1]])
+    inicios = np.concatenate(
+        [indice.inicios + d for indice, d in zip(indices, deslocamentos)] + [np.array([], dtype=int)]
+    )
+    primeiros = np.cumsum([0] + [len(indice.distintos) for indice in indices])
+    juntos = ("".join(indice.junto for indice in indices), inicios, primeiros)
+    with _lock:
+        _juntos.insert(0, (list(indices), juntos))
+        del _juntos[MAX_JUNTOS:]
+    return juntos
+
+
+def _contidos(indices: list[_IndiceTexto], termo: str) -> list[np.ndarray]:
+    # Distintos que contêm o trecho em cada um dos índices, com uma única
+    # varredura sobre os textos juntos; o _SEP impede achados entre dois valores
+    if not termo:
+        return [np.arange(len(indice.distintos)) for indice in indices]
+    texto, inicios, primeiros = _juntar(indices)
+    posicoes = np.fromiter((m.start() for m in re.finditer(re.escape(termo), texto)), dtype=np.int64)
+    # posição no texto -> distinto (numeração corrida) -> (índice, distinto no índice)
+    achados = np.unique(np.searchsorted(inicios, posicoes, side="right") - 1)
+    return [achados[(achados >= ini) & (achados < fim)] - ini for ini, fim in zip(primeiros[:-1], primeiros[1:])]
+
+
+def _ordenar(numeros: np.ndarray, validos: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    # Posições das linhas válidas em ordem crescente e os valores ordenados
+    posicoes = np.flatnonzero(validos)
+    ordem = posicoes[np.argsort(numeros[posicoes], kind="stable")]
+    return ordem, numeros[ordem]
+
+
+class IndiceAba:
+    def __init__(self, df: pd.DataFrame):
+        self.df = df.reset_index(drop=True)
+        self.n = len(self.df)
+        # Colunas como arrays numpy: o resultado é montado com indexação de
+        # arrays e um único DataFrame, não um recorte de DataFrame por aba
+        self.colunas = {c: self.df[c].to_numpy() for c in self.df.columns if c != "#"}
+        self.texto = {c: _IndiceTexto(self.df[c]) for c in CAMPOS_TEXTO if c in self.df}
+
+        valor = pd.to_numeric(self.df["valor"], errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        self._ordem_valor, self._valores = _ordenar(valor, ~np.isnan(valor))
+
+        venc = pd.DatetimeIndex(pd.to_datetime(self.df["vencimento"], errors="coerce")).as_unit("ns")
+        self._ordem_venc, self._vencimentos = _ordenar(venc.asi8, ~venc.isna())
+
+        # Chaves numéricas para ordenar resultados de várias abas (NaN por último)
+        self.chaves = {"valor": valor, "vencimento": np.where(venc.isna(), np.nan, venc.asi8.astype(float))}
+
+        estado = self.df["estado"] if "estado" in self.df else pd.Series("", index=self.df.index)
+        estados = estado.astype(object).where(estado.notna(), "").astype(str)
+        self.estados = {e: np.flatnonzero(estados.to_numpy() == e) for e in estados.unique()}
+        self._opcoes: dict[str, list] = {}
+
+    def opcoes(self, campo: str) -> list:
+        # Valores distintos ordenados (para os filtros), calculados uma vez
+        if campo not in self._opcoes:
+            if campo in self.texto:
+                valores = [v for v in self.texto[campo].originais.tolist() if v]
+            elif campo in self.df:
+                valores = sorted(self.df[campo].dropna().astype(str).unique().tolist())
+            else:
+                valores = []
+            self._opcoes[campo] = valores
+        return self._opcoes[campo]
+
+    def _faixa(self, ordem: np.ndarray, ordenados: np.ndarray, minimo, maximo) -> np.ndarray:
+        ini = 0 if minimo is None else np.searchsorted(ordenados, minimo, side="left")
+        fim = len(ordenados) if maximo is None else np.searchsorted(ordenados, maximo, side="right")
+        marcados = np.zeros(self.n, dtype=bool)
+        marcados[ordem[ini:fim]] = True
+        return marcados
+
+    def buscar(self, consulta: Consulta, contidos: dict[str, np.ndarray] | None = None) -> np.ndarray:
+        # Posições (no df do índice) que atendem a todos os critérios. `contidos`
+        # ({campo: distintos}) traz o "contém" já resolvido junto com outras abas.
+        mascara = np.ones(self.n, dtype=bool)
+
+        termo = normalizar(consulta.texto.strip())
+        if termo:
+            algum = np.zeros(self.n, dtype=bool)
+            for campo in consulta.campos:
+                indice = self.texto.get(campo)
+                if indice is None:
+                    continue
+                if consulta.prefixo:
+                    distintos = indice.prefixo(termo)
+                elif contidos is not None:
+                    distintos = contidos[campo]
+                else:
+                    distintos = indice.contem(termo)
+                algum |= indice.linhas(distintos)
+            mascara &= algum
+
+        if consulta.valor_min is not None or consulta.valor_max is not None:
+            mascara &= self._faixa(self._ordem_valor, self._valores, consulta.valor_min, consulta.valor_max)
+
+        if consulta.vencimento_de is not None or consulta.vencimento_ate is not None:
+            de = pd.Timestamp(consulta.vencimento_de).value if consulta.vencimento_de else None
+            # "até" inclui o dia inteiro
+            ate = (
+                (pd.Timestamp(consulta.vencimento_ate) + pd.Timedelta(days=1)).value - 1
+                if consulta.vencimento_ate else None
+            )
+            mascara &= self._faixa(self._ordem_venc, self._vencimentos, de, ate)
+
+        if consulta.estados:
+            marcados = np.zeros(self.n, dtype=bool)
+            for e in consulta.estados:
+                marcados[self.estados.get(e, [])] = True
+            mascara &= marcados
+
+        return np.flatnonzero(mascara)
+
+
+def indice_aba(excel_path: str, sheet_name: str, chave, carregar) -> IndiceAba:
+    # Devolve o índice da aba; carregar() só é chamado quando a chave mudou
+    with _lock:
+        em_cache = _indices.get((excel_path, sheet_name))
+        if em_cache and em_cache[0] == chave:
+            return em_cache[1]
+
+    indice = IndiceAba(carregar())
+    with _lock:
+        _indices[(excel_path, sheet_name)] = (chave, indice)
+    return indice
+
+
+def descartar(excel_path: str, sheet_name: str) -> None:
+    # Chamada pelas rotinas de gravação após alterar uma aba
+    with _lock:
+        _indices.pop((excel_path, sheet_name), None)
+
+
+def descartar_arquivo(excel_path: str) -> None:
+    # Índices de todas as abas do arquivo (ano descartado da memória)
+    with _lock:
+        for chave in [k for k in _indices if k[0] == excel_path]:
+            _indices.pop(chave, None)
+
+
+def memoria_arquivo(excel_path: str) -> int:
+    with _lock:
+        indices = [indice for (path, _), (_, indice) in _indices.items() if path == excel_path]
+    return int(sum(indice.df.memory_usage(deep=True).sum() for indice in indices))
+
+
+ORDENACOES = ["vencimento", "valor"]
+
+
+class Resultado:
+    # Posições encontradas em cada aba; as linhas só são montadas por página
+    def __init__(self, achados: list[tuple[str, str, IndiceAba, np.ndarray]]):
+        self.achados = [a for a in achados if len(a[3])]
+        self.total = sum(len(a[3]) for a in self.achados)
+
+    def linhas(
+        self, ordenar: str | None = None, crescente: bool = True, inicio: int = 0, quantidade: int | None = None
+    ) -> pd.DataFrame:
+        # Ordenação e recorte são feitos sobre as posições; só as linhas
+        # devolvidas são copiadas das abas
+        colunas = ["planilha", "aba"] + CAMPOS_TEXTO + ["valor", "vencimento", "estado"]
+        achados = self.achados
+        if not achados:
+            return pd.DataFrame(columns=colunas)
+
+        origem = np.repeat(np.arange(len(achados)), [len(a[3]) for a in achados])
+        posicoes = np.concatenate([a[3] for a in achados])
+        if ordenar in ORDENACOES:
+            chave = np.concatenate([indice.chaves[ordenar][p] for _, _, indice, p in achados])
+            ordem = np.argsort(chave if crescente else -chave, kind="stable")
+            origem, posicoes = origem[ordem], posicoes[ordem]
+        fim = self.total if quantidade is None else inicio + quantidade
+        origem, posicoes = origem[inicio:fim], posicoes[inicio:fim]
+
+        # Linhas agrupadas por aba de origem para copiar cada coluna em blocos
+        grupos = np.argsort(origem, kind="stable")
+        limites = np.searchsorted(origem[grupos], np.arange(len(achados) + 1))
+        for _, _, indice, _ in achados:
+            colunas += [c for c in indice.colunas if c not in colunas]
+
+        dados = {
+            "planilha": np.array([a[0] for a in achados], dtype=object)[origem],
+            "aba": np.array([a[1] for a in achados], dtype=object)[origem],
+        }
+        for c in colunas[2:]:
+            tipos = {indice.colunas[c].dtype for _, _, indice, _ in achados if c in indice.colunas}
+            coluna = np.empty(len(origem), dtype=tipos.pop() if len(tipos) == 1 else object)
+            if coluna.dtype.kind == "f":
+                coluna.fill(np.nan)
+            elif coluna.dtype.kind in "Mm":
+                coluna.fill(np.datetime64("NaT"))
+            elif coluna.dtype == object:
+                coluna.fill(None)
+            for k, (_, _, indice, _) in enumerate(achados):
+                linhas = grupos[limites[k]:limites[k + 1]]
+                if len(linhas) and c in indice.colunas:
+                    coluna[linhas] = indice.colunas[c][posicoes[linhas]]
+            dados[c] = coluna
+        return pd.DataFrame(dados, columns=colunas)
+
+
+def buscar(indices: list[tuple[str, str, IndiceAba]], consulta: Consulta) -> Resultado:
+    # Lançamentos de todas as abas que atendem à consulta, com a origem
+    # (planilha e aba) de cada um
+    contidos = [{} for _ in indices]
+    termo = normalizar(consulta.texto.strip())
+    if termo and not consulta.prefixo:
+        # "contém": uma varredura por campo sobre todas as abas
+        for campo in consulta.campos:
+            com_campo = [k for k, (_, _, indice) in enumerate(indices) if campo in indice.texto]
+            achados = _contidos([indices[k][2].texto[campo] for k in com_campo], termo)
+            for k, distintos in zip(com_campo, achados):
+                contidos[k][campo] = distintos
+    return Resultado([
+        (planilha, aba, indice, indice.buscar(consulta, contidos[k] if termo and not consulta.prefixo else None))
+        for k, (planilha, aba, indice) in enumerate(indices)
+    ])
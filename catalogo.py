@@ -0,0 +1,116 @@
+import os
+import re
+import threading
+from collections import OrderedDict
+
+import busca
+import planilhas
+
+# Catálogo dos livros anuais ("Contas a pagar 2025.xlsx", "Contas a receber
+# 2026.xlsx", ...). Nenhum ano é lido na descoberta: as abas de um ano só são
+# carregadas quando uma tela as pede (planilhas.ler_aba/índices de busca), e os anos
+# carregados que não estão em uso são descartados, do menos usado para o mais
+# usado, quando a memória ocupada passa do limite.
+TIPOS = ("pagar", "receber")
+PADRAO = re.compile(r"^contas a (pagar|receber) (\d{4})\.xlsx$", re.IGNORECASE)
+MEMORIA_MB = float(os.environ.get("FINANCEIRO_MEMORIA_MB", "256"))
+
+# caminho -> (geração do arquivo quando medido, bytes em memória), do menos
+# para o mais recentemente usado
+_carregados: OrderedDict[str, tuple[int, int]] = OrderedDict()
+_lock = threading.Lock()
+
+
+def nome_arquivo(tipo: str, ano: int) -> str:
+    return f"Contas a {tipo} {ano}.xlsx"
+
+
+def identificar(excel_path: str) -> tuple[str, int] | None:
+    # ("pagar" | "receber", ano) a partir do nome do arquivo
+    achado = PADRAO.match(os.path.basename(excel_path))
+    return (achado.group(1).lower(), int(achado.group(2))) if achado else None
+
+
+def eh_receber(excel_path: str) -> bool:
+    identificado = identificar(excel_path)
+    return bool(identificado) and identificado[0] == "receber"
+
+
+def descobrir(pasta: str = ".", nomes=()) -> dict[str, dict[int, str]]:
+    # {tipo: {ano: caminho}} com os arquivos da pasta e, no backend SQLite, as
+    # planilhas já importadas para o banco (`nomes`)
+    livros: dict[str, dict[int, str]] = {tipo: {} for tipo in TIPOS}
+    arquivos = [e.name for e in os.scandir(pasta) if e.is_file()] if os.path.isdir(pasta) else []
+    for nome in list(nomes) + arquivos:
+        identificado = identificar(nome)
+        if identificado:
+            tipo, ano = identificado
+            livros[tipo][ano] = nome if pasta == "." else os.path.join(pasta, nome)
+    return livros
+
+
+def anos(livros: dict[str, dict[int, str]]) -> list[int]:
+    # Anos com ao menos um dos livros, do mais recente para o mais antigo
+    return sorted({ano for por_ano in livros.values() for ano in por_ano}, reverse=True)
+
+
+def arquivo(livros: dict[str, dict[int, str]], tipo: str, ano: int) -> str:
+    # Caminho do livro; se o ano não tiver o arquivo, o nome padrão (a tela
+    # avisa que ele não foi encontrado)
+    return livros[tipo].get(ano, nome_arquivo(tipo, ano))
+
+
+def memoria(excel_path: str) -> int:
+    return planilhas.memoria_arquivo(excel_path) + busca.memoria_arquivo(excel_path)
+
+
+def descartar(excel_path: str) -> None:
+    # Libera as abas lidas e os índices de busca do ano. Os resumos do
+    # Dashboard (poucas linhas por aba) continuam em memória: um gráfico de
+    # vários anos não precisa reler os anos que não mudaram.
+    planilhas.descartar_arquivo(excel_path)
+    busca.descartar_arquivo(excel_path)
+
+
+def usar(*excel_paths: str, limite_mb: float | None = None) -> list[str]:
+    # Marca os livros pedidos pela tela como em uso e, se a memória dos anos
+    # carregados passar do limite, descarta os menos usados recentemente que
+    # não estão em uso. Devolve os caminhos descartados.
+    limite = (MEMORIA_MB if limite_mb is None else limite_mb) * 1024 * 1024
+    em_uso = set(excel_paths)
+    with _lock:
+        for path in excel_paths:
+            if path in _carregados:
+                _carregados.move_to_end(path)
+
+        # Mede os livros carregados desde a última chamada (ou relidos)
+        total = 0
+        for path in list(_carregados) + [p for p in excel_paths if p not in _carregados]:
+            if not planilhas.carregado(path):
+                _carregados.pop(path, None)
+                continue
+            geracao = planilhas.geracao_arquivo(path)
+            medido = _carregados.get(path)
+            if medido is None or medido[0] != geracao:
+                medido = (geracao, memoria(path))
+            _carregados[path] = medido
+            if path in em_uso:
+                _carregados.move_to_end(path)
+            total += medido[1]
+
+        descartados = []
+        for path in list(_carregados):
+            if total <= limite:
+                break
+            if path in em_uso:
+                continue
+            total -= _carregados.pop(path)[1]
+            descartar(path)
+            descartados.append(path)
+    return descartados
+
+
+def carregados() -> dict[str, int]:
+    # {caminho: bytes}, do menos para o mais recentemente usado
+    with _lock:
+        return {path: medido[1] for path, medido in _carregados.items()}
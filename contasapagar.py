@@ -1,1316 +1,1191 @@
-import streamlit as st
-import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
-from datetime import datetime, date
-import os
-from openpyxl import load_workbook
-
-# Configuração da página
-st.set_page_config(
-    page_title="💼 Sistema Financeiro 2025",
-    page_icon="💰",
-    layout="wide",
-    initial_sidebar_state="expanded"
-)
-
-# Mapeamento de credenciais e nomes de exibição
-VALID_USERS = {
-    "Vinicius": "vinicius4223",
-    "Flavio":   "Fpp@3737",
-    "ADMfpp":   "Fpeng@37",
-}
-DISPLAY_NAMES = {
-    "ADMfpp": "Emily"
-}
-
-def check_login(username: str, password: str) -> bool:
-    return VALID_USERS.get(username) == password
-
-if "logged_in" not in st.session_state:
-    st.session_state.logged_in = False
-    st.session_state.username = ""
-
-if not st.session_state.logged_in:
-    st.write("\n" * 5)
-    col1, col2, col3 = st.columns([1, 2, 1])
-    with col2:
-        st.title("🔒 Login")
-        username_input = st.text_input("Usuário:")
-        password_input = st.text_input("Senha:", type="password")
-        if st.button("Entrar"):
-            if check_login(username_input, password_input):
-                st.session_state.logged_in = True
-                # Usa o nome de exibição, ou cai no próprio usuário
-                st.session_state.username = DISPLAY_NAMES.get(username_input, username_input)
-            else:
-                st.error("Usuário ou senha inválidos.")
-    st.stop()
-
-
-# Constantes no início do arquivo (após as imports)
-EXCEL_PAGAR = "Contas a pagar 2025.xlsx"
-EXCEL_RECEBER = "Contas a receber 2025.xlsx"
-ANEXOS_DIR = "anexos"  # Esta linha estava faltando
-FULL_MONTHS = [f"{i:02d}" for i in range(1, 13)]
-mes_atual = f"{date.today().month:02d}"
-default_idx = FULL_MONTHS.index(mes_atual) if mes_atual in FULL_MONTHS else 0
-
-
-# Garante pastas de anexos (esta parte deve vir DEPOIS de definir ANEXOS_DIR)
-for pasta in ["Contas a Pagar", "Contas a Receber"]:
-    os.makedirs(os.path.join(ANEXOS_DIR, pasta), exist_ok=True)
-
-
-st.markdown("""
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600&display=swap');
-
-html, body, [class*="css"] {
-    font-family: 'Inter', sans-serif;
-    line-height: 1.6;
-}
-
-/* ----------------- Cabeçalho ----------------- */
-.header {
-    background: linear-gradient(135deg, #4a00e0, #8e2de2);
-    color: white;
-    padding: 2rem;
-    border-radius: 16px;
-    box-shadow: 0 8px 24px rgba(0, 0, 0, 0.2);
-    margin-bottom: 2rem;
-    text-align: center;
-}
-
-/* ----------------- Cards de Métricas ----------------- */
-.metric-card {
-    border-radius: 16px;
-    padding: 1.5rem;
-    border-left: 5px solid #8e2de2;
-    transition: transform 0.3s ease, box-shadow 0.3s ease;
-    box-shadow: 0 3px 10px rgba(0, 0, 0, 0.05);
-    margin-bottom: 1rem;
-}
-
-.metric-card:hover {
-    transform: translateY(-5px);
-    box-shadow: 0 10px 20px rgba(0, 0, 0, 0.1);
-}
-
-.metric-value {
-    font-size: 2.5rem;
-    font-weight: 600;
-    margin-bottom: 0.25rem;
-}
-
-.metric-label {
-    font-size: 0.85rem;
-    text-transform: uppercase;
-    letter-spacing: 1px;
-}
-
-/* Tema Claro */
-.stApp:not([data-theme="dark"]) .metric-card {
-    background: #f9fafe;
-}
-.stApp:not([data-theme="dark"]) .metric-value {
-    color: #2c3e50;
-}
-.stApp:not([data-theme="dark"]) .metric-label {
-    color: #7f8c8d;
-}
-
-/* Tema Escuro */
-.stApp[data-theme="dark"] .metric-card {
-    background: #23242b;
-}
-.stApp[data-theme="dark"] .metric-value {
-    color: #ffffff;
-}
-.stApp[data-theme="dark"] .metric-label {
-    color: #b0b3bd;
-}
-
-/* ----------------- Tabs ----------------- */
-.stTabs [role="tablist"] {
-    gap: 10px;
-    margin-bottom: 1rem;
-}
-.stTabs [role="tab"] {
-    padding: 10px 20px;
-    border-radius: 10px 10px 0 0;
-    font-weight: 500;
-    transition: all 0.3s ease-in-out;
-    border: none;
-}
-.stApp:not([data-theme="dark"]) .stTabs [role="tab"] {
-    background: #e0e3ec;
-    color: #34495e;
-}
-.stApp[data-theme="dark"] .stTabs [role="tab"] {
-    background: #2b2d3a;
-    color: #bbb;
-}
-.stTabs [role="tab"][aria-selected="true"] {
-    background: #8e2de2 !important;
-    color: white !important;
-}
-
-/* ----------------- Gráfico Container ----------------- */
-.chart-container {
-    border-radius: 16px;
-    padding: 1.5rem;
-    margin-bottom: 2rem;
-    transition: box-shadow 0.3s ease;
-}
-.stApp:not([data-theme="dark"]) .chart-container {
-    background: #ffffff;
-    box-shadow: 0 2px 8px rgba(0, 0, 0, 0.05);
-}
-.stApp[data-theme="dark"] .chart-container {
-    background: #1e1f26;
-    box-shadow: 0 2px 12px rgba(0, 0, 0, 0.2);
-}
-
-/* ----------------- Botões ----------------- */
-.stButton > button,
-.stDownloadButton > button {
-    border-radius: 10px;
-    padding: 10px 20px;
-    font-weight: 500;
-    transition: all 0.3s ease;
-    border: none;
-    box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
-    cursor: pointer;
-}
-.stApp:not([data-theme="dark"]) .stButton > button,
-.stApp:not([data-theme="dark"]) .stDownloadButton > button {
-    background-color: #4a00e0;
-    color: white;
-}
-.stApp[data-theme="dark"] .stButton > button,
-.stApp[data-theme="dark"] .stDownloadButton > button {
-    background-color: #9c6df2;
-    color: white;
-}
-.stButton > button:hover,
-.stDownloadButton > button:hover {
-    filter: brightness(0.95);
-    transform: scale(1.02);
-}
-
-/* ----------------- Inputs ----------------- */
-input, select, textarea, .stTextInput > div > input {
-    border-radius: 8px !important;
-    padding: 0.5rem !important;
-    font-size: 0.95rem !important;
-    border: 1px solid #ccc !important;
-}
-
-.stApp[data-theme="dark"] input,
-.stApp[data-theme="dark"] select,
-.stApp[data-theme="dark"] textarea {
-    background-color: #2b2d3a !important;
-    color: white !important;
-    border: 1px solid #444 !important;
-}
-
-/* ----------------- File Uploader ----------------- */
-section[data-testid="stFileUploader"] div[role="button"] {
-    border-radius: 8px;
-    padding: 0.75rem 1rem;
-    background-color: #8e2de2;
-    color: white;
-    border: none;
-    font-weight: 500;
-}
-section[data-testid="stFileUploader"] div[role="button"]:hover {
-    background-color: #762bd0;
-}
-
-/* ----------------- DataFrame ----------------- */
-.css-1d391kg, .stDataFrame, .stTable {
-    border-radius: 10px !important;
-    overflow: hidden;
-}
-thead tr th {
-    background-color: #8e2de2 !important;
-    color: white !important;
-    font-weight: 600;
-    padding: 0.5rem;
-}
-tbody tr td {
-    padding: 0.4rem;
-}
-.stApp[data-theme="dark"] .stDataFrame tbody tr td {
-    background-color: #1f2028 !important;
-    color: #e0e0e0 !important;
-}
-.stApp:not([data-theme="dark"]) .stDataFrame tbody tr td {
-    background-color: #ffffff !important;
-    color: #2c3e50 !important;
-}
-</style>
-""", unsafe_allow_html=True)
-
-
-def get_existing_sheets(excel_path: str) -> list[str]:
-    try:
-        wb = pd.ExcelFile(excel_path)
-        numeric_sheets = []
-        for s in wb.sheet_names:
-            nome = s.strip()
-            if nome.lower() == "tutorial":
-                continue
-            if nome.isdigit():
-                nome_formatado = f"{int(nome):02d}"
-                numeric_sheets.append(nome_formatado)
-        return sorted(set(numeric_sheets))
-    except Exception as e:
-        st.error(f"Erro ao ler abas do arquivo: {e}")
-        return []
-
-def load_data(excel_path: str, sheet_name: str) -> pd.DataFrame:
-    cols = [
-        "data_nf", "forma_pagamento", "fornecedor", "os",
-        "vencimento", "valor", "estado", "situacao", "boleto", "comprovante"
-    ]
-    
-    if not os.path.isfile(excel_path):
-        return pd.DataFrame(columns=cols + ["status_pagamento"])
-
-    try:
-        # Mapeia abas numéricas ("04" → "4")
-        sheet_lookup = {}
-        with pd.ExcelFile(excel_path) as wb:
-            for s in wb.sheet_names:
-                nome = s.strip()
-                if nome.lower() != "tutorial" and nome.isdigit():
-                    sheet_lookup[f"{int(nome):02d}"] = nome
-        
-        if sheet_name not in sheet_lookup:
-            return pd.DataFrame(columns=cols + ["status_pagamento"])
-            
-        real_sheet = sheet_lookup[sheet_name]
-        df = pd.read_excel(excel_path, sheet_name=real_sheet, skiprows=7, header=0)
-
-        # Renomeia colunas
-        rename_map = {}
-        for col in df.columns:
-            nome = str(col).strip().lower()
-            if ("data" in nome and "nf" in nome) or "data da nota fiscal" in nome:
-                rename_map[col] = "data_nf"
-            elif "forma" in nome and "pagamento" in nome:
-                rename_map[col] = "forma_pagamento"
-            elif nome == "descrição":
-                rename_map[col] = "forma_pagamento"
-            elif nome == "fornecedor" or "cliente" in nome:
-                rename_map[col] = "fornecedor"
-            elif "os" in nome or nome == "documento":
-                rename_map[col] = "os"
-            elif "vencimento" in nome:
-                rename_map[col] = "vencimento"
-            elif "valor" in nome:
-                rename_map[col] = "valor"
-            elif nome == "estado":
-                rename_map[col] = "estado"
-            elif "situa" in nome:
-                rename_map[col] = "situacao"
-            elif "comprov" in nome:
-                rename_map[col] = "comprovante"
-            elif "boleto" in nome:
-                rename_map[col] = "boleto"
-
-        df = df.rename(columns=rename_map)
-        df = df[[c for c in df.columns if c in cols]]
-
-        # Garante colunas mínimas
-        for obrig in ["fornecedor", "valor"]:
-            if obrig not in df.columns:
-                df[obrig] = pd.NA
-
-        df = df.dropna(subset=["fornecedor", "valor"], how="all").reset_index(drop=True)
-
-        # Converte tipos
-        df["vencimento"] = pd.to_datetime(df["vencimento"], errors="coerce")
-        df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
-
-        # Detecta modo: Pagar ou Receber
-        is_receber = (excel_path == EXCEL_RECEBER)
-
-        # Monta status_pagamento
-        status_list = []
-        hoje = datetime.now().date()
-        for _, row in df.iterrows():
-            estado_atual = str(row.get("estado", "")).strip().lower()
-            if estado_atual == ("recebido" if is_receber else "pago"):
-                status_list.append("Recebido" if is_receber else "Pago")
-            else:
-                data_venc = row["vencimento"].date() if pd.notna(row["vencimento"]) else None
-                if data_venc:
-                    if data_venc < hoje:
-                        status_list.append("Em Atraso")
-                    else:
-                        status_list.append("A Receber" if is_receber else "Em Aberto")
-                else:
-                    status_list.append("Sem Data")
-
-        df["status_pagamento"] = status_list
-        return df
-
-    except Exception as e:
-        st.error(f"Erro ao carregar dados: {e}")
-        return pd.DataFrame(columns=cols + ["status_pagamento"])
-
-def save_data(excel_path: str, sheet_name: str, df: pd.DataFrame) -> bool:
-    try:
-        wb = load_workbook(excel_path)
-        
-        if sheet_name not in wb.sheetnames:
-            st.error(f"A aba '{sheet_name}' não existe no arquivo.")
-            return False
-            
-        ws = wb[sheet_name]
-        header_row = 8
-        
-        headers = [
-            str(ws.cell(row=header_row, column=col).value).strip().lower()
-            for col in range(2, ws.max_column + 1)
-        ]
-
-        field_map = {
-            "data_nf":         ["data documento", "data_nf", "data n/f", "data da nota fiscal"],
-            "forma_pagamento": ["descrição", "forma_pagamento", "forma de pagamento"],
-            "fornecedor":      ["fornecedor", "cliente"],      # <- incluímos "cliente" aqui
-            "os":              ["documento", "os", "os interna"],
-            "vencimento":      ["vencimento"],
-            "valor":           ["valor"],
-            "estado":          ["estado"],
-            "boleto":          ["boleto", "boleto anexo"],
-            "comprovante":     ["comprovante", "comprovante de pagto"]
-        }
-
-        col_pos = {}
-        for key, names in field_map.items():
-            idx = next((i for i, h in enumerate(headers) if h in names), None)
-            col_pos[key] = idx + 2 if idx is not None else None
-
-        for i, row in df.iterrows():
-            excel_row = header_row + 1 + i
-            for key, col in col_pos.items():
-                if not col or key == "situacao":
-                    continue
-                    
-                val = row.get(key, "")
-                if key in ("data_nf", "vencimento"):
-                    try:
-                        val = pd.to_datetime(val, errors="coerce")
-                        if pd.notna(val):
-                            val = val.to_pydatetime()
-                        else:
-                            continue
-                    except:
-                        continue
-                elif key == "valor":
-                    try:
-                        val = float(val)
-                    except:
-                        val = None
-
-                ws.cell(row=excel_row, column=col, value=val)
-
-        wb.save(excel_path)
-        return True
-        
-    except Exception as e:
-        st.error(f"Erro ao salvar dados: {e}")
-        return False
-
-
-def add_record(excel_path: str, sheet_name: str, record: dict) -> bool:
-    try:
-        wb = load_workbook(excel_path)
-        
-        if sheet_name not in wb.sheetnames:
-            numeric = [s for s in wb.sheetnames if s.isdigit()]
-            template_ws = wb[numeric[0]] if numeric else wb[wb.sheetnames[0]]
-            ws = wb.copy_worksheet(template_ws)
-            ws.title = sheet_name
-        else:
-            ws = wb[sheet_name]
-
-        header_row = 8
-        headers = [
-            str(ws.cell(row=header_row, column=col).value).strip().lower()
-            for col in range(2, ws.max_column + 1)
-        ]
-
-        field_map = {
-            "data_nf":         ["data documento", "data_nf", "data n/f", "data da nota fiscal"],
-            "forma_pagamento": ["descrição", "forma_pagamento", "forma de pagamento"],
-            "fornecedor":      ["fornecedor", "cliente"],  # <- e aqui também
-            "os":              ["documento", "os", "os interna"],
-            "vencimento":      ["vencimento"],
-            "valor":           ["valor"],
-            "estado":          ["estado"],
-            "boleto":          ["boleto", "boleto anexo"],
-            "comprovante":     ["comprovante", "comprovante de pagto"]
-        }
-
-        col_pos = {}
-        for key, names in field_map.items():
-            idx = next((i for i, h in enumerate(headers) if h in names), None)
-            col_pos[key] = idx + 2 if idx is not None else None
-
-        col_forn = col_pos.get("fornecedor", 2)
-
-        # encontra próxima linha vazia com base no fornecedor/cliente
-        next_row = header_row + 1
-        while ws.cell(row=next_row, column=col_forn).value:
-            next_row += 1
-
-        for key, col in col_pos.items():
-            if not col or key == "situacao":
-                continue
-
-            val = record.get(key, "")
-            if key in ("data_nf", "vencimento"):
-                try:
-                    dt = pd.to_datetime(val, errors="coerce")
-                    if pd.notna(dt):
-                        val = dt.to_pydatetime()
-                    else:
-                        continue
-                except:
-                    continue
-            elif key == "valor":
-                try:
-                    val = float(val)
-                except:
-                    val = None
-
-            ws.cell(row=next_row, column=col, value=val)
-
-        wb.save(excel_path)
-        return True
-
-    except Exception as e:
-        st.error(f"Erro ao adicionar registro: {e}")
-        return False
-
-
-st.markdown("""
-<div style="text-align: center; color: #4B8BBE; margin-bottom: 10px;">
-    <h1>💼 Sistema Financeiro 2025</h1>
-    <p style="color: #555; font-size: 16px;">Dashboard avançado com estatísticas e gráficos interativos.</p>
-</div>
-""", unsafe_allow_html=True)
-st.markdown("---")
-
-# 👤 Mostra usuário logado
-st.sidebar.markdown(f"**Bem Vindo(a):** {st.session_state.username}")
-
-# 🔘 NAVEGAÇÃO
-page = st.sidebar.radio("Ir para:", ["Dashboard", "Contas a Pagar", "Contas a Receber"])
-
-# Dashboard Modernizado
-if page == "Dashboard":
-    if not os.path.isfile(EXCEL_PAGAR):
-        st.error(f"Arquivo '{EXCEL_PAGAR}' não encontrado. Verifique o caminho.")
-    if not os.path.isfile(EXCEL_RECEBER):
-        st.error(f"Arquivo '{EXCEL_RECEBER}' não encontrado. Verifique o caminho.")
-    if not os.path.isfile(EXCEL_PAGAR) or not os.path.isfile(EXCEL_RECEBER):
-        st.stop()
-    
-    sheets_p = get_existing_sheets(EXCEL_PAGAR)
-    sheets_r = get_existing_sheets(EXCEL_RECEBER)
-    
-    # Layout com tabs modernas
-    tab1, tab2 = st.tabs(["📥 Contas a Pagar", "📤 Contas a Receber"])
-    
-    with tab1:
-        if not sheets_p:
-            st.warning("Nenhuma aba válida encontrada em Contas a Pagar")
-        else:
-            df_all_p = pd.concat([load_data(EXCEL_PAGAR, s) for s in sheets_p], ignore_index=True)
-            
-            if df_all_p.empty:
-                st.info("Nenhum dado encontrado nas planilhas de Contas a Pagar")
-            else:
-                # Métricas principais
-                total_p = df_all_p["valor"].sum()
-                num_lanc_p = len(df_all_p)
-                media_p = df_all_p["valor"].mean() if num_lanc_p else 0
-                atrasados_p = df_all_p[df_all_p["status_pagamento"] == "Em Atraso"]
-                num_atras_p = len(atrasados_p)
-                perc_atras_p = (num_atras_p / num_lanc_p * 100) if num_lanc_p else 0
-                
-                # Layout de métricas
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div class="metric-label">Total a Pagar</div>
-                        <div class="metric-value">R$ {total_p:,.2f}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col2:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div class="metric-label">Lançamentos</div>
-                        <div class="metric-value">{num_lanc_p}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col3:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div class="metric-label">Média por Conta</div>
-                        <div class="metric-value">R$ {media_p:,.2f}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col4:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div class="metric-label">Em Atraso</div>
-                        <div class="metric-value">{perc_atras_p:.1f}%</div>
-                        <div style="font-size: 0.8rem; color: {'#e74c3c' if perc_atras_p > 10 else '#27ae60'}">
-                            ({num_atras_p} conta{'s' if num_atras_p != 1 else ''})
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                st.markdown("---")
-                
-                # Gráfico de distribuição por status
-                st.markdown("#### 📊 Distribuição por Status")
-                status_counts_p = (
-                    df_all_p["status_pagamento"]
-                    .value_counts()
-                    .rename_axis("status")
-                    .reset_index(name="contagem")
-                )
-                
-                fig_status = px.pie(
-                    status_counts_p,
-                    values="contagem",
-                    names="status",
-                    hole=0.4,
-                    color_discrete_sequence=px.colors.qualitative.Pastel
-                )
-                fig_status.update_traces(
-                    textposition="inside",
-                    textinfo="percent+label",
-                    hovertemplate="<b>%{label}</b><br>%{value} contas (%{percent})"
-                )
-                fig_status.update_layout(
-                    showlegend=False,
-                    margin=dict(l=20, r=20, t=30, b=20),
-                    height=350
-                )
-                
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.plotly_chart(fig_status, use_container_width=True)
-                
-                with col2:
-                    st.markdown("""
-                    <div style="background: #f8f9fa; padding: 1rem; border-radius: 10px;">
-                        <h4 style="margin-top: 0;">Legenda</h4>
-                        <div style="display: flex; align-items: center; margin-bottom: 8px;">
-                            <div style="width: 12px; height: 12px; background: #636EFA; border-radius: 50%; margin-right: 8px;"></div>
-                            <span>Em Aberto</span>
-                        </div>
-                        <div style="display: flex; align-items: center; margin-bottom: 8px;">
-                            <div style="width: 12px; height: 12px; background: #EF553B; border-radius: 50%; margin-right: 8px;"></div>
-                            <span>Em Atraso</span>
-                        </div>
-                        <div style="display: flex; align-items: center; margin-bottom: 8px;">
-                            <div style="width: 12px; height: 12px; background: #00CC96; border-radius: 50%; margin-right: 8px;"></div>
-                            <span>Pago</span>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                st.markdown("---")
-                
-                # Evolução mensal
-                st.markdown("#### 📈 Evolução Mensal")
-                df_all_p["mes_ano"] = df_all_p["vencimento"].dt.to_period("M")
-                monthly_group_p = (
-                    df_all_p
-                    .groupby("mes_ano")
-                    .agg(
-                        total_mes=("valor", "sum"),
-                        pagos_mes=("valor", lambda x: x[df_all_p.loc[x.index, "status_pagamento"] == "Pago"].sum()),
-                        pendentes_mes=("valor", lambda x: x[df_all_p.loc[x.index, "status_pagamento"] != "Pago"].sum())
-                    )
-                    .reset_index()
-                )
-                monthly_group_p["mes_ano_str"] = monthly_group_p["mes_ano"].dt.strftime("%b/%Y")
-                
-                fig_evolucao = go.Figure()
-                fig_evolucao.add_trace(go.Scatter(
-                    x=monthly_group_p["mes_ano_str"],
-                    y=monthly_group_p["total_mes"],
-                    name="Total",
-                    line=dict(color="#6e8efb", width=3),
-                    mode="lines+markers",
-                    hovertemplate="<b>%{x}</b><br>Total: R$ %{y:,.2f}<extra></extra>"
-                ))
-                fig_evolucao.add_trace(go.Scatter(
-                    x=monthly_group_p["mes_ano_str"],
-                    y=monthly_group_p["pagos_mes"],
-                    name="Pagas",
-                    line=dict(color="#00CC96", width=2),
-                    mode="lines+markers",
-                    hovertemplate="<b>%{x}</b><br>Pagas: R$ %{y:,.2f}<extra></extra>"
-                ))
-                fig_evolucao.add_trace(go.Scatter(
-                    x=monthly_group_p["mes_ano_str"],
-                    y=monthly_group_p["pendentes_mes"],
-                    name="Pendentes",
-                    line=dict(color="#EF553B", width=2),
-                    mode="lines+markers",
-                    hovertemplate="<b>%{x}</b><br>Pendentes: R$ %{y:,.2f}<extra></extra>"
-                ))
-                
-                fig_evolucao.update_layout(
-                    hovermode="x unified",
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    ),
-                    margin=dict(l=20, r=20, t=30, b=20),
-                    height=400,
-                    xaxis_title="Mês/Ano",
-                    yaxis_title="Valor (R$)",
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    paper_bgcolor="rgba(0,0,0,0)"
-                )
-                
-                st.plotly_chart(fig_evolucao, use_container_width=True)
-                
-                # Top 10 fornecedores
-                st.markdown("---")
-                st.markdown("#### 🏆 Top 10 Fornecedores")
-                top_fornecedores = (
-                    df_all_p.groupby("fornecedor")
-                    .agg(total=("valor", "sum"), contagem=("valor", "count"))
-                    .sort_values("total", ascending=False)
-                    .head(10)
-                    .reset_index()
-                )
-                
-                fig_fornecedores = px.bar(
-                    top_fornecedores,
-                    x="total",
-                    y="fornecedor",
-                    orientation="h",
-                    color="contagem",
-                    color_continuous_scale="Blues",
-                    labels={"total": "Valor Total (R$)", "fornecedor": "", "contagem": "Nº Contas"},
-                    hover_data={"contagem": True}
-                )
-                fig_fornecedores.update_layout(
-                    height=500,
-                    xaxis_title="Valor Total (R$)",
-                    yaxis_title="",
-                    yaxis={"categoryorder": "total ascending"},
-                    margin=dict(l=20, r=20, t=30, b=20),
-                    coloraxis_colorbar=dict(title="Nº Contas")
-                )
-                
-                st.plotly_chart(fig_fornecedores, use_container_width=True)
-                
-                # Download dos dados
-                st.markdown("---")
-                with st.expander("💾 Exportar Dados", expanded=False):
-                    try:
-                        with open(EXCEL_PAGAR, "rb") as f:
-                            st.download_button(
-                                label="Baixar Planilha Completa (Contas a Pagar)",
-                                data=f.read(),
-                                file_name=EXCEL_PAGAR,
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                            )
-                    except Exception as e:
-                        st.error(f"Erro ao preparar download: {e}")
-
-    with tab2:
-        if not sheets_r:
-            st.warning("Nenhuma aba válida encontrada em Contas a Receber")
-        else:
-            df_all_r = pd.concat([load_data(EXCEL_RECEBER, s) for s in sheets_r], ignore_index=True)
-            
-            if df_all_r.empty:
-                st.info("Nenhum dado encontrado nas planilhas de Contas a Receber")
-            else:
-                # Métricas principais
-                total_r = df_all_r["valor"].sum()
-                num_lanc_r = len(df_all_r)
-                media_r = df_all_r["valor"].mean() if num_lanc_r else 0
-                atrasados_r = df_all_r[df_all_r["status_pagamento"] == "Em Atraso"]
-                num_atras_r = len(atrasados_r)
-                perc_atras_r = (num_atras_r / num_lanc_r * 100) if num_lanc_r else 0
-                
-                # Layout de métricas
-                col1, col2, col3, col4 = st.columns(4)
-                with col1:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div class="metric-label">Total a Receber</div>
-                        <div class="metric-value">R$ {total_r:,.2f}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col2:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div class="metric-label">Lançamentos</div>
-                        <div class="metric-value">{num_lanc_r}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col3:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div class="metric-label">Média por Conta</div>
-                        <div class="metric-value">R$ {media_r:,.2f}</div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                with col4:
-                    st.markdown(f"""
-                    <div class="metric-card">
-                        <div class="metric-label">Em Atraso</div>
-                        <div class="metric-value">{perc_atras_r:.1f}%</div>
-                        <div style="font-size: 0.8rem; color: {'#e74c3c' if perc_atras_r > 10 else '#27ae60'}">
-                            ({num_atras_r} conta{'s' if num_atras_r != 1 else ''})
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                st.markdown("---")
-                
-                # Gráfico de distribuição por status
-                st.markdown("#### 📊 Distribuição por Status")
-                status_counts_r = (
-                    df_all_r["status_pagamento"]
-                    .value_counts()
-                    .rename_axis("status")
-                    .reset_index(name="contagem")
-                )
-                
-                fig_status = px.pie(
-                    status_counts_r,
-                    values="contagem",
-                    names="status",
-                    hole=0.4,
-                    color_discrete_sequence=px.colors.qualitative.Pastel
-                )
-                fig_status.update_traces(
-                    textposition="inside",
-                    textinfo="percent+label",
-                    hovertemplate="<b>%{label}</b><br>%{value} contas (%{percent})"
-                )
-                fig_status.update_layout(
-                    showlegend=False,
-                    margin=dict(l=20, r=20, t=30, b=20),
-                    height=350
-                )
-                
-                col1, col2 = st.columns([3, 1])
-                with col1:
-                    st.plotly_chart(fig_status, use_container_width=True)
-                
-                with col2:
-                    st.markdown("""
-                    <div style="background: #f8f9fa; padding: 1rem; border-radius: 10px;">
-                        <h4 style="margin-top: 0;">Legenda</h4>
-                        <div style="display: flex; align-items: center; margin-bottom: 8px;">
-                            <div style="width: 12px; height: 12px; background: #636EFA; border-radius: 50%; margin-right: 8px;"></div>
-                            <span>A Receber</span>
-                        </div>
-                        <div style="display: flex; align-items: center; margin-bottom: 8px;">
-                            <div style="width: 12px; height: 12px; background: #EF553B; border-radius: 50%; margin-right: 8px;"></div>
-                            <span>Em Atraso</span>
-                        </div>
-                        <div style="display: flex; align-items: center; margin-bottom: 8px;">
-                            <div style="width: 12px; height: 12px; background: #00CC96; border-radius: 50%; margin-right: 8px;"></div>
-                            <span>Recebido</span>
-                        </div>
-                    </div>
-                    """, unsafe_allow_html=True)
-                
-                st.markdown("---")
-                
-                # Evolução mensal
-                st.markdown("#### 📈 Evolução Mensal")
-                df_all_r["mes_ano"] = df_all_r["vencimento"].dt.to_period("M")
-                monthly_group_r = (
-                    df_all_r
-                    .groupby("mes_ano")
-                    .agg(
-                        total_mes=("valor", "sum"),
-                        recebidos_mes=("valor", lambda x: x[df_all_r.loc[x.index, "status_pagamento"] == "Recebido"].sum()),
-                        pendentes_mes=("valor", lambda x: x[df_all_r.loc[x.index, "status_pagamento"] != "Recebido"].sum())
-                    )
-                    .reset_index()
-                )
-                monthly_group_r["mes_ano_str"] = monthly_group_r["mes_ano"].dt.strftime("%b/%Y")
-                
-                fig_evolucao = go.Figure()
-                fig_evolucao.add_trace(go.Scatter(
-                    x=monthly_group_r["mes_ano_str"],
-                    y=monthly_group_r["total_mes"],
-                    name="Total",
-                    line=dict(color="#6e8efb", width=3),
-                    mode="lines+markers",
-                    hovertemplate="<b>%{x}</b><br>Total: R$ %{y:,.2f}<extra></extra>"
-                ))
-                fig_evolucao.add_trace(go.Scatter(
-                    x=monthly_group_r["mes_ano_str"],
-                    y=monthly_group_r["recebidos_mes"],
-                    name="Recebidos",
-                    line=dict(color="#00CC96", width=2),
-                    mode="lines+markers",
-                    hovertemplate="<b>%{x}</b><br>Recebidos: R$ %{y:,.2f}<extra></extra>"
-                ))
-                fig_evolucao.add_trace(go.Scatter(
-                    x=monthly_group_r["mes_ano_str"],
-                    y=monthly_group_r["pendentes_mes"],
-                    name="Pendentes",
-                    line=dict(color="#EF553B", width=2),
-                    mode="lines+markers",
-                    hovertemplate="<b>%{x}</b><br>Pendentes: R$ %{y:,.2f}<extra></extra>"
-                ))
-                
-                fig_evolucao.update_layout(
-                    hovermode="x unified",
-                    legend=dict(
-                        orientation="h",
-                        yanchor="bottom",
-                        y=1.02,
-                        xanchor="right",
-                        x=1
-                    ),
-                    margin=dict(l=20, r=20, t=30, b=20),
-                    height=400,
-                    xaxis_title="Mês/Ano",
-                    yaxis_title="Valor (R$)",
-                    plot_bgcolor="rgba(0,0,0,0)",
-                    paper_bgcolor="rgba(0,0,0,0)"
-                )
-                
-                st.plotly_chart(fig_evolucao, use_container_width=True)
-                
-                # Top 10 clientes
-                st.markdown("---")
-                st.markdown("#### 🏆 Top 10 Clientes")
-                top_clientes = (
-                    df_all_r.groupby("fornecedor")
-                    .agg(total=("valor", "sum"), contagem=("valor", "count"))
-                    .sort_values("total", ascending=False)
-                    .head(10)
-                    .reset_index()
-                )
-                
-                fig_clientes = px.bar(
-                    top_clientes,
-                    x="total",
-                    y="fornecedor",
-                    orientation="h",
-                    color="contagem",
-                    color_continuous_scale="Blues",
-                    labels={"total": "Valor Total (R$)", "fornecedor": "", "contagem": "Nº Contas"},
-                    hover_data={"contagem": True}
-                )
-                fig_clientes.update_layout(
-                    height=500,
-                    xaxis_title="Valor Total (R$)",
-                    yaxis_title="",
-                    yaxis={"categoryorder": "total ascending"},
-                    margin=dict(l=20, r=20, t=30, b=20),
-                    coloraxis_colorbar=dict(title="Nº Contas")
-                )
-                
-                st.plotly_chart(fig_clientes, use_container_width=True)
-                
-                # Download dos dados
-                st.markdown("---")
-                with st.expander("💾 Exportar Dados", expanded=False):
-                    try:
-                        with open(EXCEL_RECEBER, "rb") as f:
-                            st.download_button(
-                                label="Baixar Planilha Completa (Contas a Receber)",
-                                data=f.read(),
-                                file_name=EXCEL_RECEBER,
-                                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet"
-                            )
-                    except Exception as e:
-                        st.error(f"Erro ao preparar download: {e}")
-
-elif page == "Contas a Pagar":
-    st.subheader("🗂️ Contas a Pagar")
-
-    # Verifica existência do arquivo
-    if not os.path.isfile(EXCEL_PAGAR):
-        st.error(f"Arquivo '{EXCEL_PAGAR}' não encontrado. Verifique o caminho.")
-        st.stop()
-
-    # Select mês (padrão atual)
-    default_idx = FULL_MONTHS.index(date.today().strftime("%m"))
-    aba = st.selectbox("Selecione o mês:", FULL_MONTHS, index=default_idx)
-
-    # Carrega dados diretamente do Excel
-    df = load_data(EXCEL_PAGAR, aba).reset_index(drop=True)
-    df.insert(0, "#", range(1, len(df) + 1))
-
-    # Filtros avançados
-    with st.expander("🔍 Filtros Avançados", expanded=False):
-        col1, col2 = st.columns(2)
-        with col1:
-            fornecedores = ["Todos"] + sorted(df["fornecedor"].dropna().unique().tolist())
-            filtro_fn = st.selectbox("Fornecedor", fornecedores)
-        with col2:
-            status_opts = ["Todos"] + sorted(df["status_pagamento"].dropna().unique().tolist())
-            filtro_st = st.selectbox("Status", status_opts)
-
-    # Aplica filtros
-    df_disp = df.copy()
-    if filtro_fn != "Todos":
-        df_disp = df_disp[df_disp["fornecedor"] == filtro_fn]
-    if filtro_st != "Todos":
-        df_disp = df_disp[df_disp["status_pagamento"] == filtro_st]
-
-    # Exibe tabela
-    st.markdown("### 📋 Lançamentos")
-    table_pl = st.empty()
-    if df_disp.empty:
-        st.warning("Nenhum registro encontrado com os filtros selecionados.")
-    else:
-        df_exib = df_disp.copy()
-        # Formatação de moeda e datas
-        if "valor" in df_exib:
-            df_exib["valor"] = df_exib["valor"].apply(lambda x: f"R$ {x:,.2f}" if pd.notna(x) else "")
-        if "vencimento" in df_exib:
-            df_exib["vencimento"] = pd.to_datetime(df_exib["vencimento"], errors="coerce").dt.strftime("%d/%m/%Y")
-        if "data_nf" in df_exib:
-            df_exib["data_nf"] = pd.to_datetime(df_exib["data_nf"], errors="coerce").dt.strftime("%d/%m/%Y")
-
-        cols_show = ["#", "data_nf", "fornecedor", "valor", "vencimento", "status_pagamento", "estado"]
-        cols_show = [c for c in cols_show if c in df_exib.columns]
-        table_pl.dataframe(df_exib[cols_show], height=400, use_container_width=True)
-
-    # ----- REMOVER REGISTRO -----
-    with st.expander("🗑️ Remover Registro", expanded=False):
-        if not df_disp.empty:
-            sel = st.selectbox("Selecione o número da linha (#) para remover:", df_disp["#"].tolist(), key="remove_idx_pagar")
-            if st.button("Remover Registro", key="btn_remove_pagar"):
-                try:
-                    # índice no DataFrame completo
-                    idx_full = df[df["#"] == sel].index[0]
-                    excel_row = 8 + 1 + idx_full  # cabeçalho está na linha 8
-                    wb = load_workbook(EXCEL_PAGAR)
-                    ws = wb[aba]
-                    ws.delete_rows(excel_row)
-                    wb.save(EXCEL_PAGAR)
-                    st.success(f"Registro #{sel} removido com sucesso!")
-                    # Recarrega tabela
-                    df = load_data(EXCEL_PAGAR, aba).reset_index(drop=True)
-                    df.insert(0, "#", range(1, len(df) + 1))
-                    # reaplica filtros e reexibe
-                    df_disp = df.copy()
-                    if filtro_fn != "Todos":
-                        df_disp = df_disp[df_disp["fornecedor"] == filtro_fn]
-                    if filtro_st != "Todos":
-                        df_disp = df_disp[df_disp["status_pagamento"] == filtro_st]
-                    df_exib = df_disp.copy()
-                    if "valor" in df_exib:
-                        df_exib["valor"] = df_exib["valor"].apply(lambda x: f"R$ {x:,.2f}" if pd.notna(x) else "")
-                    if "vencimento" in df_exib:
-                        df_exib["vencimento"] = pd.to_datetime(df_exib["vencimento"], errors="coerce").dt.strftime("%d/%m/%Y")
-                    if "data_nf" in df_exib:
-                        df_exib["data_nf"] = pd.to_datetime(df_exib["data_nf"], errors="coerce").dt.strftime("%d/%m/%Y")
-                    table_pl.dataframe(df_exib[cols_show], height=400, use_container_width=True)
-                except Exception as e:
-                    st.error(f"Erro ao remover registro: {e}")
-        else:
-            st.info("Nenhum registro para remover.")
-
-    # ----- EDITAR REGISTRO -----
-    with st.expander("✏️ Editar Registro", expanded=False):
-        if not df_disp.empty:
-            sel = st.selectbox("Selecione o nº da linha (#) para editar:", df_disp["#"].tolist(), key="edit_idx_pagar")
-            idx_full = df[df["#"] == sel].index[0]
-            rec = df.loc[idx_full]
-            col1, col2 = st.columns(2)
-            with col1:
-                novo_valor = st.number_input("Valor (R$):", value=float(rec["valor"]) if pd.notna(rec["valor"]) else 0.0, step=0.01, key="edit_valor_pagar")
-                novo_venc = st.date_input("Vencimento:", value=rec["vencimento"].date() if pd.notna(rec["vencimento"]) else date.today(), key="edit_venc_pagar")
-            with col2:
-                novo_estado = st.selectbox("Estado:", ["Em Aberto", "Pago"], index=0 if rec["estado"] == "Em Aberto" else 1, key="edit_estado_pagar")
-                sit_opts = ["Em Atraso", "Pago", "Em Aberto"]
-                idx_sit = sit_opts.index(rec.get("situacao", "Em Atraso")) if rec.get("situacao") in sit_opts else 0
-                nova_sit = st.selectbox("Situação:", sit_opts, index=idx_sit, key="edit_situacao_pagar")
-
-            if st.button("💾 Salvar Alterações", key="btn_save_edit_pagar"):
-                try:
-                    # atualiza DataFrame e salva
-                    df.at[idx_full, "valor"] = novo_valor
-                    df.at[idx_full, "vencimento"] = novo_venc
-                    df.at[idx_full, "estado"] = novo_estado
-                    df.at[idx_full, "situacao"] = nova_sit
-                    if save_data(EXCEL_PAGAR, aba, df):
-                        st.success("Registro atualizado com sucesso!")
-                    else:
-                        st.error("Falha ao salvar alterações.")
-                    # Recarrega e reexibe tabela
-                    df = load_data(EXCEL_PAGAR, aba).reset_index(drop=True)
-                    df.insert(0, "#", range(1, len(df) + 1))
-                    df_disp = df.copy()
-                    if filtro_fn != "Todos": df_disp = df_disp[df_disp["fornecedor"] == filtro_fn]
-                    if filtro_st != "Todos": df_disp = df_disp[df_disp["status_pagamento"] == filtro_st]
-                    df_exib = df_disp.copy()
-                    if "valor" in df_exib: df_exib["valor"] = df_exib["valor"].apply(lambda x: f"R$ {x:,.2f}" if pd.notna(x) else "")
-                    if "vencimento" in df_exib: df_exib["vencimento"] = pd.to_datetime(df_exib["vencimento"], errors="coerce").dt.strftime("%d/%m/%Y")
-                    if "data_nf" in df_exib: df_exib["data_nf"] = pd.to_datetime(df_exib["data_nf"], errors="coerce").dt.strftime("%d/%m/%Y")
-                    table_pl.dataframe(df_exib[cols_show], height=400, use_container_width=True)
-                except Exception as e:
-                    st.error(f"Erro ao editar registro: {e}")
-        else:
-            st.info("Nenhum registro para editar.")
-
-    # ----- ADICIONAR NOVO REGISTRO -----
-    with st.expander("➕ Adicionar Nova Conta", expanded=False):
-        col1, col2 = st.columns(2)
-        with col1:
-            nf_data = st.date_input("Data N/F:", value=date.today())
-            nf_desc = st.text_input("Descrição:")
-            nf_forn = st.text_input("Fornecedor:")
-        with col2:
-            nf_os = st.text_input("Documento/OS:")
-            nf_venc = st.date_input("Vencimento:", value=date.today())
-            nf_val = st.number_input("Valor (R$):", min_value=0.01, step=0.01)
-        nf_estado = st.selectbox("Estado:", ["Em Aberto", "Pago"])
-        nf_situ   = st.selectbox("Situação:", ["Em Atraso", "Pago", "Em Aberto"])
-
-        if st.button("➕ Adicionar Conta", key="btn_add_pagar"):
-            novo = {
-                "data_nf": nf_data,
-                "forma_pagamento": nf_desc,
-                "fornecedor": nf_forn,
-                "os": nf_os,
-                "vencimento": nf_venc,
-                "valor": nf_val,
-                "estado": nf_estado,
-                "situacao": nf_situ
-            }
-            try:
-                if add_record(EXCEL_PAGAR, aba, novo):
-                    st.success("Conta adicionada com sucesso!")
-                    # Recarrega e reexibe tabela
-                    df = load_data(EXCEL_PAGAR, aba).reset_index(drop=True)
-                    df.insert(0, "#", range(1, len(df) + 1))
-                    df_disp = df.copy()
-                    if filtro_fn != "Todos": df_disp = df_disp[df_disp["fornecedor"] == filtro_fn]
-                    if filtro_st != "Todos": df_disp = df_disp[df_disp["status_pagamento"] == filtro_st]
-                    df_exib = df_disp.copy()
-                    if "valor" in df_exib: df_exib["valor"] = df_exib["valor"].apply(lambda x: f"R$ {x:,.2f}" if pd.notna(x) else "")
-                    if "vencimento" in df_exib: df_exib["vencimento"] = pd.to_datetime(df_exib["vencimento"], errors="coerce").dt.strftime("%d/%m/%Y")
-                    if "data_nf" in df_exib: df_exib["data_nf"] = pd.to_datetime(df_exib["data_nf"], errors="coerce").dt.strftime("%d/%m/%Y")
-                    table_pl.dataframe(df_exib[cols_show], height=400, use_container_width=True)
-                else:
-                    st.error("Erro ao adicionar conta.")
-            except Exception as e:
-                st.error(f"Erro ao adicionar conta: {e}")
-
-elif page == "Contas a Receber":
-    st.subheader("🗂️ Contas a Receber")
-
-    if not os.path.isfile(EXCEL_RECEBER):
-        st.error(f"Arquivo '{EXCEL_RECEBER}' não encontrado. Verifique o caminho.")
-        st.stop()
-
-    default_idx = FULL_MONTHS.index(date.today().strftime("%m"))
-    aba = st.selectbox("Selecione o mês:", FULL_MONTHS, index=default_idx)
-
-    df = load_data(EXCEL_RECEBER, aba).reset_index(drop=True)
-    df.insert(0, "#", range(1, len(df) + 1))
-
-    with st.expander("🔍 Filtros Avançados", expanded=False):
-        col1, col2 = st.columns(2)
-        with col1:
-            if "fornecedor" in df.columns:
-                clientes = ["Todos"] + sorted(df["fornecedor"].dropna().astype(str).unique().tolist())
-            elif "cliente" in df.columns:
-                clientes = ["Todos"] + sorted(df["cliente"].dropna().astype(str).unique().tolist())
-            else:
-                clientes = ["Todos"]
-            filtro_cl = st.selectbox("Cliente", clientes)
-
-        with col2:
-            status_opts = ["Todos"] + sorted(df["status_pagamento"].dropna().unique().tolist()) \
-                          if "status_pagamento" in df.columns else ["Todos"]
-            filtro_st = st.selectbox("Status", status_opts)
-
-    df_disp = df.copy()
-    if filtro_cl != "Todos":
-        if "fornecedor" in df_disp.columns:
-            df_disp = df_disp[df_disp["fornecedor"] == filtro_cl]
-        elif "cliente" in df_disp.columns:
-            df_disp = df_disp[df_disp["cliente"] == filtro_cl]
-    if filtro_st != "Todos":
-        df_disp = df_disp[df_disp["status_pagamento"] == filtro_st]
-
-    st.markdown("### 📋 Lançamentos")
-    table_pr = st.empty()
-    if df_disp.empty:
-        st.warning("Nenhum registro encontrado com os filtros selecionados.")
-    else:
-        df_exib = df_disp.copy()
-
-        # Renomeia para exibição
-        if "fornecedor" in df_exib.columns:
-            df_exib.rename(columns={"fornecedor": "Cliente"}, inplace=True)
-        elif "cliente" in df_exib.columns:
-            df_exib.rename(columns={"cliente": "Cliente"}, inplace=True)
-
-        if "valor" in df_exib:
-            df_exib["valor"] = df_exib["valor"].apply(lambda x: f"R$ {x:,.2f}" if pd.notna(x) else "")
-
-        for d in ("vencimento", "data_nf"):
-            if d in df_exib:
-                df_exib[d] = (
-                    pd.to_datetime(df_exib[d], errors="coerce")
-                      .dt.strftime("%d/%m/%Y")
-                      .fillna("")
-                )
-
-        cols_show = ["#", "data_nf", "Cliente", "valor", "vencimento", "status_pagamento", "estado"]
-        cols_show = [c for c in cols_show if c in df_exib.columns]
-        table_pr.dataframe(df_exib[cols_show], height=400, use_container_width=True)
-
-    # ----- REMOVER REGISTRO -----
-    with st.expander("🗑️ Remover Registro", expanded=False):
-        if not df_disp.empty:
-            sel = st.selectbox("Selecione o número da linha (#) para remover:", df_disp["#"].tolist(), key="remove_idx_receber")
-            if st.button("Remover Registro", key="btn_remove_receber"):
-                try:
-                    idx_full = df[df["#"] == sel].index[0]
-                    excel_row = 8 + 1 + idx_full
-                    wb = load_workbook(EXCEL_RECEBER)
-                    ws = wb[aba]
-                    ws.delete_rows(excel_row)
-                    wb.save(EXCEL_RECEBER)
-                    st.success(f"Registro #{sel} removido com sucesso!")
-
-                    # recarrega dados e reaplica filtros
-                    df = load_data(EXCEL_RECEBER, aba).reset_index(drop=True)
-                    df.insert(0, "#", range(1, len(df) + 1))
-                    df_disp = df.copy()
-                    if filtro_cl != "Todos":
-                        df_disp = df_disp[df_disp["fornecedor"] == filtro_cl]
-                    if filtro_st != "Todos":
-                        df_disp = df_disp[df_disp["status_pagamento"] == filtro_st]
-
-                    # reexibe tabela
-                    df_exib = df_disp.copy()
-                    df_exib.rename(columns={"fornecedor": "Cliente"}, inplace=True)
-                    df_exib["valor"] = df_exib["valor"].apply(lambda x: f"R$ {x:,.2f}" if pd.notna(x) else "")
-                    for col in ("vencimento", "data_nf"):
-                        if col in df_exib:
-                            df_exib[col] = (
-                                pd.to_datetime(df_exib[col], errors="coerce")
-                                  .dt.strftime("%d/%m/%Y")
-                                  .fillna("")
-                            )
-                    table_pr.dataframe(df_exib[cols_show], height=400, use_container_width=True)
-
-                except Exception as e:
-                    st.error(f"Erro ao remover registro: {e}")
-        else:
-            st.info("Nenhum registro para remover.")
-
-    # ----- EDITAR REGISTRO -----
-    with st.expander("✏️ Editar Registro", expanded=False):
-        if not df_disp.empty:
-            sel = st.selectbox("Selecione o nº da linha (#) para editar:", df_disp["#"].tolist(), key="edit_idx_receber")
-            idx_full = df[df["#"] == sel].index[0]
-            rec = df.loc[idx_full]
-
-            col1, col2 = st.columns(2)
-            with col1:
-                novo_valor = st.number_input("Valor (R$):", value=float(rec["valor"]) if pd.notna(rec["valor"]) else 0.0, step=0.01, key="edit_valor_receber")
-                novo_venc = st.date_input("Vencimento:", value=rec["vencimento"].date() if pd.notna(rec["vencimento"]) else date.today(), key="edit_venc_receber")
-            with col2:
-                novo_estado = st.selectbox("Estado:", ["A Receber", "Recebido"], index=0 if rec["estado"]=="A Receber" else 1, key="edit_estado_receber")
-                sit_opts = ["Em Atraso", "Recebido", "A Receber"]
-                idx_sit = sit_opts.index(rec.get("situacao","Em Atraso")) if rec.get("situacao") in sit_opts else 0
-                nova_sit = st.selectbox("Situação:", sit_opts, index=idx_sit, key="edit_situacao_receber")
-
-            if st.button("💾 Salvar Alterações", key="btn_save_edit_receber"):
-                try:
-                    df.at[idx_full, "valor"] = novo_valor
-                    df.at[idx_full, "vencimento"] = novo_venc
-                    df.at[idx_full, "estado"] = novo_estado
-                    df.at[idx_full, "situacao"] = nova_sit
-                    if save_data(EXCEL_RECEBER, aba, df):
-                        st.success("Registro atualizado com sucesso!")
-                        # recarregar e reexibir tabela (mesma lógica de cima)...
-                    else:
-                        st.error("Falha ao salvar alterações.")
-                except Exception as e:
-                    st.error(f"Erro ao editar registro: {e}")
-        else:
-            st.info("Nenhum registro para editar.")
-
-    # ----- ADICIONAR NOVO REGISTRO -----
-    with st.expander("➕ Adicionar Nova Conta", expanded=False):
-        col1, col2 = st.columns(2)
-        with col1:
-            nf_data    = st.date_input("Data N/F:", value=date.today())
-            nf_desc    = st.text_input("Descrição:")
-            nf_cliente = st.text_input("Cliente:")
-        with col2:
-            nf_os      = st.text_input("Documento/OS:")
-            nf_venc    = st.date_input("Vencimento:", value=date.today())
-            nf_val     = st.number_input("Valor (R$):", min_value=0.01, step=0.01)
-
-        nf_estado = st.selectbox("Estado:", ["A Receber", "Recebido"])
-        nf_situ   = st.selectbox("Situação:", ["Em Atraso", "Recebido", "A Receber"])
-
-        if st.button("➕ Adicionar Conta", key="btn_add_receber"):
-            if not nf_cliente or nf_val <= 0:
-                st.error("Preencha pelo menos Cliente e Valor.")
-            else:
-                novo = {
-                    "data_nf":         nf_data,
-                    "forma_pagamento": nf_desc,
-                    "fornecedor":      nf_cliente,
-                    "os":              nf_os,
-                    "vencimento":      nf_venc,
-                    "valor":           nf_val,
-                    "estado":          nf_estado,
-                    "situacao":        nf_situ
-                }
-                if add_record(EXCEL_RECEBER, aba, novo):
-                    st.success("Conta adicionada com sucesso!")
-                    if hasattr(st, "experimental_rerun"):
-                        st.experimental_rerun()
-                else:
-                    st.error("Erro ao adicionar conta. Verifique o Excel.")
-
-
-            
-st.markdown("""
-<div style="text-align: center; font-size:12px; color:gray; margin-top: 20px;">
-    <p>© 2025 Desenvolvido por Vinicius Magalhães</p>
-</div>
-""", unsafe_allow_html=True)
+import streamlit as st
+import pandas as pd
+from datetime import date
+import os
+import time
+import agregados
+import anexos
+import armazenamento
+import atrasos
+import busca
+import catalogo
+import conteudo
+import fila
+import fluxo
+import formatacao
+import graficos
+import importacao
+from dados import (
+    ANEXOS_DIR, BACKEND, CHAVE_ANEXO, DB_PATH, add_record, add_records, aging_report, cash_flow,
+    dashboard_summary, delete_record, export_data, fonte_disponivel, get_existing_sheets, load_data,
+    search_index, sheet_key, update_record, use_ledgers
+)
+from planilhas import DATA_COLS
+
+# Configuração da página
+st.set_page_config(
+    page_title="💼 Sistema Financeiro 2025",
+    page_icon="💰",
+    layout="wide",
+    initial_sidebar_state="expanded"
+)
+
+# Mapeamento de credenciais e nomes de exibição
+VALID_USERS = {
+    "Vinicius": "vinicius4223",
+    "Flavio":   "Fpp@3737",
+    "ADMfpp":   "Fpeng@37",
+}
+DISPLAY_NAMES = {
+    "ADMfpp": "Emily"
+}
+
+def check_login(username: str, password: str) -> bool:
+    return VALID_USERS.get(username) == password
+
+if "logged_in" not in st.session_state:
+    st.session_state.logged_in = False
+    st.session_state.username = ""
+
+if not st.session_state.logged_in:
+    st.write("\n" * 5)
+    col1, col2, col3 = st.columns([1, 2, 1])
+    with col2:
+        st.title("🔒 Login")
+        username_input = st.text_input("Usuário:")
+        password_input = st.text_input("Senha:", type="password")
+        if st.button("Entrar"):
+            if check_login(username_input, password_input):
+                st.session_state.logged_in = True
+                # Usa o nome de exibição, ou cai no próprio usuário
+                st.session_state.username = DISPLAY_NAMES.get(username_input, username_input)
+            else:
+                st.error("Usuário ou senha inválidos.")
+    st.stop()
+
+
+# Constantes no início do arquivo (após as imports)
+FULL_MONTHS = [f"{i:02d}" for i in range(1, 13)]
+# Tabela de lançamentos paginada: só a página visível é formatada e enviada
+TAMANHOS_PAGINA = [25, 50, 100, 200]
+TAMANHO_PAGINA = 50
+mes_atual = f"{date.today().month:02d}"
+default_idx = FULL_MONTHS.index(mes_atual) if mes_atual in FULL_MONTHS else 0
+
+
+# Livros anuais ("Contas a pagar 2025.xlsx", ...) encontrados na pasta; o ano
+# é escolhido na barra lateral e cada ano só é lido quando uma tela o pede
+LIVROS = catalogo.descobrir()
+
+# No backend SQLite, a primeira execução importa as planilhas existentes
+if BACKEND == "sqlite":
+    for por_ano in LIVROS.values():
+        for planilha in por_ano.values():
+            armazenamento.preparar_base(DB_PATH, planilha)
+    LIVROS = catalogo.descobrir(nomes=armazenamento.listar_planilhas(DB_PATH))
+ANOS = catalogo.anos(LIVROS) or [date.today().year]
+
+# Texto dos anexos em PDF indexado em segundo plano (uma vez por processo)
+conteudo.iniciar(ANEXOS_DIR)
+
+
+st.markdown("""
+<style>
+@import url('https://fonts.googleapis.com/css2?family=Inter:wght@300;400;500;600&display=swap');
+
+html, body, [class*="css"] {
+    font-family: 'Inter', sans-serif;
+    line-height: 1.6;
+}
+
+/* ----------------- Cabeçalho ----------------- */
+.header {
+    background: linear-gradient(135deg, #4a00e0, #8e2de2);
+    color: white;
+    padding: 2rem;
+    border-radius: 16px;
+    box-shadow: 0 8px 24px rgba(0, 0, 0, 0.2);
+    margin-bottom: 2rem;
+    text-align: center;
+}
+
+/* ----------------- Cards de Métricas ----------------- */
+.metric-card {
+    border-radius: 16px;
+    padding: 1.5rem;
+    border-left: 5px solid #8e2de2;
+    transition: transform 0.3s ease, box-shadow 0.3s ease;
+    box-shadow: 0 3px 10px rgba(0, 0, 0, 0.05);
+    margin-bottom: 1rem;
+}
+
+.metric-card:hover {
+    transform: translateY(-5px);
+    box-shadow: 0 10px 20px rgba(0, 0, 0, 0.1);
+}
+
+.metric-value {
+    font-size: 2.5rem;
+    font-weight: 600;
+    margin-bottom: 0.25rem;
+}
+
+.metric-label {
+    font-size: 0.85rem;
+    text-transform: uppercase;
+    letter-spacing: 1px;
+}
+
+/* Tema Claro */
+.stApp:not([data-theme="dark"]) .metric-card {
+    background: #f9fafe;
+}
+.stApp:not([data-theme="dark"]) .metric-value {
+    color: #2c3e50;
+}
+.stApp:not([data-theme="dark"]) .metric-label {
+    color: #7f8c8d;
+}
+
+/* Tema Escuro */
+.stApp[data-theme="dark"] .metric-card {
+    background: #23242b;
+}
+.stApp[data-theme="dark"] .metric-value {
+    color: #ffffff;
+}
+.stApp[data-theme="dark"] .metric-label {
+    color: #b0b3bd;
+}
+
+/* ----------------- Tabs ----------------- */
+.stTabs [role="tablist"] {
+    gap: 10px;
+    margin-bottom: 1rem;
+}
+.stTabs [role="tab"] {
+    padding: 10px 20px;
+    border-radius: 10px 10px 0 0;
+    font-weight: 500;
+    transition: all 0.3s ease-in-out;
+    border: none;
+}
+.stApp:not([data-theme="dark"]) .stTabs [role="tab"] {
+    background: #e0e3ec;
+    color: #34495e;
+}
+.stApp[data-theme="dark"] .stTabs [role="tab"] {
+    background: #2b2d3a;
+    color: #bbb;
+}
+.stTabs [role="tab"][aria-selected="true"] {
+    background: #8e2de2 !important;
+    color: white !important;
+}
+
+/* ----------------- Gráfico Container ----------------- */
+.chart-container {
+    border-radius: 16px;
+    padding: 1.5rem;
+    margin-bottom: 2rem;
+    transition: box-shadow 0.3s ease;
+}
+.stApp:not([data-theme="dark"]) .chart-container {
+    background: #ffffff;
+    box-shadow: 0 2px 8px rgba(0, 0, 0, 0.05);
+}
+.stApp[data-theme="dark"] .chart-container {
+    background: #1e1f26;
+    box-shadow: 0 2px 12px rgba(0, 0, 0, 0.2);
+}
+
+/* ----------------- Botões ----------------- */
+.stButton > button,
+.stDownloadButton > button {
+    border-radius: 10px;
+    padding: 10px 20px;
+    font-weight: 500;
+    transition: all 0.3s ease;
+    border: none;
+    box-shadow: 0 2px 4px rgba(0, 0, 0, 0.1);
+    cursor: pointer;
+}
+.stApp:not([data-theme="dark"]) .stButton > button,
+.stApp:not([data-theme="dark"]) .stDownloadButton > button {
+    background-color: #4a00e0;
+    color: white;
+}
+.stApp[data-theme="dark"] .stButton > button,
+.stApp[data-theme="dark"] .stDownloadButton > button {
+    background-color: #9c6df2;
+    color: white;
+}
+.stButton > button:hover,
+.stDownloadButton > button:hover {
+    filter: brightness(0.95);
+    transform: scale(1.02);
+}
+
+/* ----------------- Inputs ----------------- */
+input, select, textarea, .stTextInput > div > input {
+    border-radius: 8px !important;
+    padding: 0.5rem !important;
+    font-size: 0.95rem !important;
+    border: 1px solid #ccc !important;
+}
+
+.stApp[data-theme="dark"] input,
+.stApp[data-theme="dark"] select,
+.stApp[data-theme="dark"] textarea {
+    background-color: #2b2d3a !important;
+    color: white !important;
+    border: 1px solid #444 !important;
+}
+
+/* ----------------- File Uploader ----------------- */
+section[data-testid="stFileUploader"] div[role="button"] {
+    border-radius: 8px;
+    padding: 0.75rem 1rem;
+    background-color: #8e2de2;
+    color: white;
+    border: none;
+    font-weight: 500;
+}
+section[data-testid="stFileUploader"] div[role="button"]:hover {
+    background-color: #762bd0;
+}
+
+/* ----------------- DataFrame ----------------- */
+.css-1d391kg, .stDataFrame, .stTable {
+    border-radius: 10px !important;
+    overflow: hidden;
+}
+thead tr th {
+    background-color: #8e2de2 !important;
+    color: white !important;
+    font-weight: 600;
+    padding: 0.5rem;
+}
+tbody tr td {
+    padding: 0.4rem;
+}
+.stApp[data-theme="dark"] .stDataFrame tbody tr td {
+    background-color: #1f2028 !important;
+    color: #e0e0e0 !important;
+}
+.stApp:not([data-theme="dark"]) .stDataFrame tbody tr td {
+    background-color: #ffffff !important;
+    color: #2c3e50 !important;
+}
+</style>
+""", unsafe_allow_html=True)
+
+
+def show_write_status(excel_path: str) -> None:
+    # Situação da fila de gravação em segundo plano e erros das alterações do usuário
+    pendentes, ultima, novos = fila.situacao(excel_path, st.session_state.get("username"))
+    erros = st.session_state.setdefault(f"erros_gravacao_{excel_path}", [])
+    erros.extend(novos)
+    for erro in erros:
+        st.error(erro)
+    if pendentes:
+        st.caption(f"⏳ {pendentes} alteração(ões) aguardando gravação na planilha...")
+    elif ultima:
+        st.caption(f"✅ Alterações gravadas na planilha às {ultima:%H:%M:%S}.")
+
+
+@st.fragment(run_every=2)
+def _write_status_live(excel_path: str) -> None:
+    # Atualiza sozinho enquanto a página estiver aberta com gravações pendentes
+    show_write_status(excel_path)
+
+
+def write_status(excel_path: str) -> None:
+    if fila.pendentes(excel_path):
+        _write_status_live(excel_path)
+    else:
+        # Erros continuam visíveis até a próxima interação do usuário
+        show_write_status(excel_path)
+        st.session_state[f"erros_gravacao_{excel_path}"] = []
+
+
+def entries_controls(total: int, rotulos: dict, key: str) -> dict:
+    # Ordenação e paginação de uma tabela de lançamentos (rotulos: coluna -> título)
+    col1, col2, col3, col4 = st.columns([3, 2, 2, 2])
+    with col1:
+        ordenar = st.selectbox("Ordenar por", list(rotulos), format_func=rotulos.get, key=f"ordenar_{key}")
+    with col2:
+        sentido = st.selectbox("Ordem", ["Crescente", "Decrescente"], key=f"sentido_{key}")
+    with col3:
+        tamanho = st.selectbox(
+            "Linhas por página", TAMANHOS_PAGINA, index=TAMANHOS_PAGINA.index(TAMANHO_PAGINA), key=f"tamanho_{key}"
+        )
+    paginas = max(1, -(-total // tamanho))
+    pagina_key = f"pagina_{key}"
+    # Filtros ou remoções podem reduzir o número de páginas
+    st.session_state[pagina_key] = min(st.session_state.get(pagina_key, 1), paginas)
+    with col4:
+        st.number_input(f"Página (de {paginas})", min_value=1, max_value=paginas, step=1, key=pagina_key)
+    return {"ordenar": ordenar, "crescente": sentido == "Crescente", "tamanho": tamanho, "pagina_key": pagina_key}
+
+
+def _chave_ordenacao(col: pd.Series) -> pd.Series:
+    if pd.api.types.is_numeric_dtype(col) or pd.api.types.is_datetime64_any_dtype(col):
+        return col
+    return col.where(col.isna(), col.astype(str).str.lower())
+
+
+def filter_entries(df: pd.DataFrame, coluna: str, valor: str, status: str) -> pd.DataFrame:
+    # Filtros avançados da página do mês ("Todos" não filtra)
+    if valor != "Todos":
+        df = df[df[coluna].astype(str) == valor]
+    if status != "Todos":
+        df = df[df["status_pagamento"] == status]
+    return df
+
+
+def page_bounds(total: int, pagina: dict) -> tuple[int, int]:
+    # (primeira linha, tamanho) da página atual
+    tamanho = pagina["tamanho"]
+    paginas = max(1, -(-total // tamanho))
+    atual = min(st.session_state.get(pagina["pagina_key"], 1), paginas)
+    return (atual - 1) * tamanho, tamanho
+
+
+def render_entries(
+    placeholder, df: pd.DataFrame, df_disp: pd.DataFrame, cols_show: list[str],
+    pagina: dict, renomear: dict | None = None
+) -> None:
+    # Ordena os dados tipados (em cache) e envia só a página atual. O texto
+    # formatado vem da visão da aba inteira, formatada uma vez por versão dos
+    # dados; sem versão (SQLite) só a página é formatada.
+    inicio, tamanho = page_bounds(len(df_disp), pagina)
+    ordem = df_disp.sort_values(
+        pagina["ordenar"], ascending=pagina["crescente"], na_position="last",
+        kind="stable", key=_chave_ordenacao
+    )
+    linhas = ordem.index[inicio:inicio + tamanho]
+    chave = df.attrs.get("visao")
+    if chave is None:
+        pagina_df = formatacao.formatar(df_disp.loc[linhas, cols_show])
+    else:
+        pagina_df = formatacao.visao(chave, df, cols_show).loc[linhas]
+
+    if "aba" in df.attrs:
+        # Nº de anexos só das linhas da página, numa consulta ao índice
+        contagem = anexos.contagens(ANEXOS_DIR, *df.attrs["aba"])
+        pagina_df = pagina_df.assign(
+            **{"📎": [str(contagem.get(c, "")) for c in anexos.chaves(df_disp.loc[linhas], CHAVE_ANEXO)]}
+        ) if contagem else pagina_df
+
+    with placeholder.container():
+        st.dataframe(
+            pagina_df.rename(columns=renomear or {}), height=400, use_container_width=True
+        )
+        st.caption(f"Mostrando {inicio + 1}–{inicio + len(pagina_df)} de {len(df_disp)} lançamentos")
+
+
+def import_entries(excel_path: str, sheet_name: str, key: str) -> None:
+    # Importação em massa: valida o arquivo enviado e grava tudo com um único salvamento
+    arquivo = st.file_uploader("Arquivo (CSV, OFX ou XLSX):", type=importacao.FORMATOS, key=f"upload_{key}")
+    if arquivo is None:
+        return
+
+    # A leitura/validação roda uma vez por arquivo enviado, não a cada rerun
+    estado_key = f"import_{key}"
+    estado = st.session_state.get(estado_key)
+    if not estado or estado[0] != (arquivo.name, arquivo.size):
+        try:
+            abas = tuple(get_existing_sheets(excel_path))
+            existentes = [load_data(excel_path, s, abas) for s in abas]
+            existentes = pd.concat(existentes, ignore_index=True) if existentes else pd.DataFrame(columns=DATA_COLS)
+            identificado = catalogo.identificar(excel_path)
+            entradas, rejeitados = importacao.preparar_importacao(
+                arquivo.name, arquivo, catalogo.eh_receber(excel_path), existentes, sheet_name,
+                ano=identificado[1] if identificado else None,
+            )
+        except Exception as e:
+            st.error(f"Erro ao ler o arquivo: {e}")
+            return
+        estado = ((arquivo.name, arquivo.size), entradas, rejeitados)
+        st.session_state[estado_key] = estado
+    _, entradas, rejeitados = estado
+
+    if rejeitados:
+        st.warning(f"{len(rejeitados)} linha(s) ignorada(s):")
+        st.dataframe(pd.DataFrame({"Motivo": rejeitados}), height=150, use_container_width=True)
+    if not entradas:
+        st.info("Nenhum lançamento novo para importar.")
+        return
+
+    previa = pd.DataFrame([{"mes": aba, **registro} for aba, registro in entradas])
+    st.dataframe(
+        previa[["mes", "fornecedor", "valor", "vencimento", "estado", "os"]],
+        height=250, use_container_width=True
+    )
+    if st.button(f"📥 Importar {len(entradas)} Lançamento(s)", key=f"btn_import_{key}"):
+        if add_records(excel_path, entradas):
+            st.session_state.pop(estado_key, None)
+            st.success(f"{len(entradas)} lançamento(s) importado(s) com sucesso!")
+        else:
+            st.error("Erro ao importar lançamentos.")
+
+
+def render_attachments(excel_path: str, sheet_name: str, df: pd.DataFrame, df_disp: pd.DataFrame, key: str) -> None:
+    # Boletos e comprovantes do lançamento escolhido: lista, download e envio
+    if df_disp.empty:
+        st.info("Nenhum registro para anexar arquivos.")
+        return
+
+    sel = st.selectbox("Selecione o nº da linha (#):", df_disp["#"].tolist(), key=f"anexo_idx_{key}")
+    rec = df.loc[df[df["#"] == sel].index[0]]
+    lancamento = anexos.chave(rec, CHAVE_ANEXO)
+    if lancamento is None:
+        st.info("Este lançamento ainda está na fila de gravação; os anexos ficam disponíveis depois de gravado.")
+        return
+
+    for item in anexos.listar(ANEXOS_DIR, excel_path, sheet_name, lancamento):
+        col1, col2, col3, col4 = st.columns([1, 4, 1, 1])
+        with col1:
+            # Miniatura gerada só quando o lançamento é aberto aqui, depois fica em disco
+            miniatura = anexos.miniatura(ANEXOS_DIR, item["sha256"], item["mime"])
+            if miniatura:
+                st.image(miniatura, width=80)
+            else:
+                st.markdown("📄")
+        with col2:
+            st.markdown(f"**{anexos.CAMPOS.get(item['campo'], item['campo'])}:** {item['nome']}")
+            st.caption(f"{item['tamanho'] / 1024:,.0f} KB · enviado em {item['criado_em'].replace('T', ' ')}")
+        with col3:
+            st.download_button(
+                "⬇️", data=lambda sha=item["sha256"]: anexos.ler(ANEXOS_DIR, sha),
+                file_name=item["nome"], mime=item["mime"], on_click="ignore", key=f"baixar_anexo_{key}_{item['id']}"
+            )
+        with col4:
+            if st.button("🗑️", key=f"remover_anexo_{key}_{item['id']}"):
+                anexos.remover(ANEXOS_DIR, item["id"])
+                st.rerun()
+
+    # O uploader ganha uma chave nova depois de cada envio, para esvaziar
+    envio = st.session_state.setdefault(f"anexo_envio_{key}", 0)
+    col1, col2 = st.columns([1, 3])
+    with col1:
+        campo = st.selectbox("Tipo:", list(anexos.CAMPOS), format_func=anexos.CAMPOS.get, key=f"anexo_campo_{key}")
+    with col2:
+        arquivo = st.file_uploader(
+            "Arquivo (PDF ou imagem):", type=anexos.TIPOS, key=f"anexo_upload_{key}_{envio}"
+        )
+    if arquivo is not None and st.button("📎 Anexar", key=f"btn_anexar_{key}"):
+        try:
+            sha = anexos.anexar(ANEXOS_DIR, excel_path, sheet_name, lancamento, campo, arquivo.name, arquivo)
+            conteudo.agendar(ANEXOS_DIR, sha)
+            st.session_state[f"anexo_envio_{key}"] = envio + 1
+            st.rerun()
+        except Exception as e:
+            st.error(f"Erro ao anexar arquivo: {e}")
+
+
+def attachment_results(achados: list[dict]) -> pd.DataFrame:
+    # Resultados da busca nos anexos com o lançamento de cada um (planilha,
+    # mês, fornecedor/cliente, valor e vencimento), quando ainda existe
+    linhas = []
+    lancamentos = {}
+    for achado in achados:
+        identificado = catalogo.identificar(achado["planilha"])
+        tipo, ano = identificado or ("", "")
+        excel_path = catalogo.arquivo(LIVROS, tipo, ano) if identificado else achado["planilha"]
+        aba = (excel_path, achado["mes"])
+        if aba not in lancamentos:
+            df = load_data(*aba) if identificado and fonte_disponivel(excel_path) else pd.DataFrame()
+            por_chave = dict(zip(anexos.chaves(df, CHAVE_ANEXO), df.index)) if not df.empty else {}
+            lancamentos[aba] = (df, por_chave)
+        df, por_chave = lancamentos[aba]
+        rec = df.loc[por_chave[achado["lancamento"]]] if achado["lancamento"] in por_chave else {}
+        linhas.append({
+            "planilha": f"Contas a {tipo.capitalize()}" if identificado else achado["planilha"],
+            "aba": f"{achado['mes']}/{ano}" if identificado else achado["mes"],
+            "anexo": anexos.CAMPOS.get(achado["campo"], achado["campo"]),
+            "arquivo": achado["nome"],
+            "fornecedor": rec.get("fornecedor"),
+            "valor": rec.get("valor"),
+            "vencimento": rec.get("vencimento"),
+            "trecho": " ".join(achado["trecho"].split()),
+        })
+    resultado = pd.DataFrame(linhas)
+    resultado["vencimento"] = pd.to_datetime(resultado["vencimento"], errors="coerce")
+    resultado["valor"] = pd.to_numeric(resultado["valor"], errors="coerce")
+    return formatacao.formatar(resultado, textos=["fornecedor"])
+
+
+def render_ledger_dashboard(excel_paths: list[str], is_receber: bool) -> None:
+    # Painel de um livro (Pagar ou Receber) em um ou mais anos; só é executado
+    # para a aba selecionada. Os resumos por aba ficam em memória, então anos
+    # que não mudaram não são relidos.
+    titulo = "Contas a Receber" if is_receber else "Contas a Pagar"
+    quitado = "Recebido" if is_receber else "Pago"
+    em_aberto = "A Receber" if is_receber else "Em Aberto"
+    rotulo_quitados = "Recebidos" if is_receber else "Pagas"
+    sheets = {excel_path: get_existing_sheets(excel_path) for excel_path in excel_paths}
+
+    if not any(sheets.values()):
+        st.warning(f"Nenhuma aba válida encontrada em {titulo}")
+    else:
+        resumo = agregados.combinar([dashboard_summary(excel_path, abas) for excel_path, abas in sheets.items()])
+        # Versão dos dados do painel: chave das figuras em cache
+        livros = tuple(excel_paths)
+        versao = tuple(sheet_key(excel_path, s) for excel_path, abas in sheets.items() for s in abas)
+        
+        if resumo.empty:
+            st.info(f"Nenhum dado encontrado nas planilhas de {titulo}")
+        else:
+            # Métricas principais
+            total = resumo["total"].sum()
+            num_lanc = int(resumo["lancamentos"].sum())
+            media = total / resumo["contagem"].sum() if resumo["contagem"].sum() else 0
+            num_atras = int(resumo.loc[resumo["status"] == "Em Atraso", "lancamentos"].sum())
+            perc_atras = (num_atras / num_lanc * 100) if num_lanc else 0
+            
+            # Layout de métricas
+            col1, col2, col3, col4 = st.columns(4)
+            with col1:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-label">{"Total a Receber" if is_receber else "Total a Pagar"}</div>
+                    <div class="metric-value">{formatacao.moeda_texto(total)}</div>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            with col2:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-label">Lançamentos</div>
+                    <div class="metric-value">{num_lanc}</div>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            with col3:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-label">Média por Conta</div>
+                    <div class="metric-value">{formatacao.moeda_texto(media)}</div>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            with col4:
+                st.markdown(f"""
+                <div class="metric-card">
+                    <div class="metric-label">Em Atraso</div>
+                    <div class="metric-value">{perc_atras:.1f}%</div>
+                    <div style="font-size: 0.8rem; color: {'#e74c3c' if perc_atras > 10 else '#27ae60'}">
+                        ({num_atras} conta{'s' if num_atras != 1 else ''})
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            st.markdown("---")
+            
+            # Gráfico de distribuição por status
+            st.markdown("#### 📊 Distribuição por Status")
+            fig_status = graficos.figura(livros, (versao, "status"), lambda: graficos.status(
+                resumo
+                .groupby("status")["lancamentos"]
+                .sum()
+                .sort_values(ascending=False)
+                .reset_index(name="contagem")
+            ))
+            
+            col1, col2 = st.columns([3, 1])
+            with col1:
+                st.plotly_chart(fig_status, use_container_width=True)
+            
+            with col2:
+                st.markdown(f"""
+                <div style="background: #f8f9fa; padding: 1rem; border-radius: 10px;">
+                    <h4 style="margin-top: 0;">Legenda</h4>
+                    <div style="display: flex; align-items: center; margin-bottom: 8px;">
+                        <div style="width: 12px; height: 12px; background: #636EFA; border-radius: 50%; margin-right: 8px;"></div>
+                        <span>{em_aberto}</span>
+                    </div>
+                    <div style="display: flex; align-items: center; margin-bottom: 8px;">
+                        <div style="width: 12px; height: 12px; background: #EF553B; border-radius: 50%; margin-right: 8px;"></div>
+                        <span>Em Atraso</span>
+                    </div>
+                    <div style="display: flex; align-items: center; margin-bottom: 8px;">
+                        <div style="width: 12px; height: 12px; background: #00CC96; border-radius: 50%; margin-right: 8px;"></div>
+                        <span>{quitado}</span>
+                    </div>
+                </div>
+                """, unsafe_allow_html=True)
+            
+            st.markdown("---")
+            
+            # Evolução mensal
+            st.markdown("#### 📈 Evolução Mensal")
+            def montar_evolucao():
+                monthly_group = agregados.evolucao_mensal(resumo, quitado, "quitados_mes")
+                monthly_group["mes_ano_str"] = formatacao.mes_ano(monthly_group["mes_ano"])
+                return graficos.evolucao(monthly_group, rotulo_quitados)
+
+            fig_evolucao = graficos.figura(livros, (versao, "evolucao"), montar_evolucao)
+            st.plotly_chart(fig_evolucao, use_container_width=True)
+
+            # Atrasos por faixa de dias
+            st.markdown("---")
+            st.markdown("#### ⏳ Atrasos por Faixa")
+            por_faixa, por_fornecedor = aging_report(excel_paths)
+            if not por_faixa["contagem"].sum():
+                st.info("Nenhuma conta vencida em aberto.")
+            else:
+                fig_atrasos = graficos.figura(livros, (versao, "atrasos"), lambda: graficos.atrasos(por_faixa))
+                st.plotly_chart(fig_atrasos, use_container_width=True)
+
+                tabela = formatacao.formatar(por_fornecedor, moedas=atrasos.FAIXAS + ["total"], datas=())
+                st.dataframe(
+                    tabela.rename(columns={
+                        "fornecedor": "Cliente" if is_receber else "Fornecedor",
+                        "total": "Total Vencido", "contagem": "Nº Contas"
+                    }),
+                    height=300, use_container_width=True, hide_index=True
+                )
+            
+            # Top 10 fornecedores
+            st.markdown("---")
+            st.markdown(f"#### 🏆 Top 10 {'Clientes' if is_receber else 'Fornecedores'}")
+            fig_top = graficos.figura(livros, (versao, "top"), lambda: graficos.top(
+                resumo.groupby("fornecedor")
+                .agg(total=("total", "sum"), contagem=("contagem", "sum"))
+                .sort_values("total", ascending=False)
+                .head(10)
+                .reset_index()
+            ))
+            st.plotly_chart(fig_top, use_container_width=True)
+            
+            # Download dos dados
+            st.markdown("---")
+            with st.expander("💾 Exportar Dados", expanded=False):
+                for excel_path in excel_paths:
+                    try:
+                        st.download_button(
+                            label=f"Baixar Planilha Completa ({titulo} {catalogo.identificar(excel_path)[1]})",
+                            data=lambda excel_path=excel_path: export_data(excel_path),  # gerado só no clique
+                            file_name=os.path.basename(excel_path),
+                            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+                            key=f"exportar_{excel_path}"
+                        )
+                    except Exception as e:
+                        st.error(f"Erro ao preparar download: {e}")
+
+
+def render_cash_flow(livros_pagar: list[str], livros_receber: list[str]) -> None:
+    # Saldo projetado: contas a receber menos contas a pagar em aberto ou em
+    # atraso, por vencimento (vencidas entram no dia de hoje)
+    col1, col2, col3 = st.columns(3)
+    with col1:
+        saldo_inicial = st.number_input("Saldo inicial (R$):", value=0.0, step=100.0, key="fluxo_saldo")
+    with col2:
+        dias = st.select_slider("Horizonte (dias):", fluxo.HORIZONTES, value=fluxo.HORIZONTE, key="fluxo_dias")
+    with col3:
+        visao = st.radio("Visão:", ["Diária", "Semanal"], horizontal=True, key="fluxo_visao")
+
+    projecao = cash_flow(livros_pagar, livros_receber, dias, saldo_inicial)
+    if visao == "Semanal":
+        projecao = fluxo.semanal(projecao)
+    menor = projecao.loc[projecao["saldo"].idxmin()]
+
+    col1, col2, col3, col4 = st.columns(4)
+    for coluna, rotulo, valor in (
+        (col1, "Entradas Previstas", projecao["entradas"].sum()),
+        (col2, "Saídas Previstas", projecao["saidas"].sum()),
+        (col3, f"Saldo em {dias} dias", projecao["saldo"].iloc[-1]),
+        (col4, f"Menor Saldo ({formatacao.data([menor['data']])[0]})", menor["saldo"]),
+    ):
+        with coluna:
+            st.markdown(f"""
+            <div class="metric-card">
+                <div class="metric-label">{rotulo}</div>
+                <div class="metric-value">{formatacao.moeda_texto(valor)}</div>
+            </div>
+            """, unsafe_allow_html=True)
+
+    st.markdown("---")
+    st.markdown("#### 💵 Saldo Projetado")
+    livros = tuple(livros_pagar + livros_receber)
+    versao = tuple(sheet_key(excel_path, s) for excel_path in livros for s in get_existing_sheets(excel_path))
+    fig_fluxo = graficos.figura(
+        livros, (versao, dias, saldo_inicial, visao), lambda: graficos.fluxo(projecao, visao == "Semanal")
+    )
+    st.plotly_chart(fig_fluxo, use_container_width=True)
+
+    tabela = formatacao.formatar(projecao, moedas=("entradas", "saidas", "liquido", "saldo"), datas=("data",))
+    st.dataframe(
+        tabela.rename(columns={
+            "data": "Data", "entradas": "Entradas", "saidas": "Saídas", "liquido": "Líquido", "saldo": "Saldo"
+        }),
+        height=300, use_container_width=True, hide_index=True
+    )
+
+
+# 👤 Mostra usuário logado
+st.sidebar.markdown(f"**Bem Vindo(a):** {st.session_state.username}")
+
+# 📅 Ano dos livros usados pelas páginas de lançamentos
+ano_padrao = date.today().year if date.today().year in ANOS else ANOS[0]
+ANO = st.sidebar.selectbox("Ano:", ANOS, index=ANOS.index(ano_padrao), key="ano")
+EXCEL_PAGAR = catalogo.arquivo(LIVROS, "pagar", ANO)
+EXCEL_RECEBER = catalogo.arquivo(LIVROS, "receber", ANO)
+
+st.markdown(f"""
+<div style="text-align: center; color: #4B8BBE; margin-bottom: 10px;">
+    <h1>💼 Sistema Financeiro {ANO}</h1>
+    <p style="color: #555; font-size: 16px;">Dashboard avançado com estatísticas e gráficos interativos.</p>
+</div>
+""", unsafe_allow_html=True)
+st.markdown("---")
+
+# 🔘 NAVEGAÇÃO
+page = st.sidebar.radio(
+    "Ir para:", ["Dashboard", "Contas a Pagar", "Contas a Receber", "Buscar Lançamentos"], key="pagina"
+)
+
+# Dashboard Modernizado
+if page == "Dashboard":
+    # Vários anos no mesmo painel: a evolução mensal passa de um ano para o outro
+    anos_dashboard = sorted(st.multiselect("Anos:", ANOS, default=[ANO], key="dashboard_anos") or [ANO])
+    livros_pagar = [catalogo.arquivo(LIVROS, "pagar", ano) for ano in anos_dashboard]
+    livros_receber = [catalogo.arquivo(LIVROS, "receber", ano) for ano in anos_dashboard]
+    faltando = [livro for livro in livros_pagar + livros_receber if not fonte_disponivel(livro)]
+    for livro in faltando:
+        st.error(f"Arquivo '{livro}' não encontrado. Verifique o caminho.")
+    if faltando:
+        st.stop()
+    # O fluxo de caixa usa também os anos que o horizonte alcança
+    fim_horizonte = date.today() + pd.Timedelta(days=max(fluxo.HORIZONTES))
+    anos_fluxo = sorted(set(anos_dashboard) | {a for a in ANOS if date.today().year <= a <= fim_horizonte.year})
+    fluxo_pagar = [catalogo.arquivo(LIVROS, "pagar", ano) for ano in anos_fluxo]
+    fluxo_receber = [catalogo.arquivo(LIVROS, "receber", ano) for ano in anos_fluxo]
+    fluxo_pagar = [livro for livro in fluxo_pagar if fonte_disponivel(livro)]
+    fluxo_receber = [livro for livro in fluxo_receber if fonte_disponivel(livro)]
+    use_ledgers(*livros_pagar, *livros_receber, *fluxo_pagar, *fluxo_receber)
+    
+    # Layout com tabs modernas; com on_change="rerun" só a aba aberta é montada
+    tab1, tab2, tab3 = st.tabs(
+        ["📥 Contas a Pagar", "📤 Contas a Receber", "💵 Fluxo de Caixa"], key="dashboard_tab", on_change="rerun"
+    )
+    
+    if tab1.open:
+        with tab1:
+            render_ledger_dashboard(livros_pagar, is_receber=False)
+    if tab2.open:
+        with tab2:
+            render_ledger_dashboard(livros_receber, is_receber=True)
+    if tab3.open:
+        with tab3:
+            render_cash_flow(fluxo_pagar, fluxo_receber)
+
+elif page == "Contas a Pagar":
+    st.subheader("🗂️ Contas a Pagar")
+
+    # Verifica existência do arquivo
+    if not fonte_disponivel(EXCEL_PAGAR):
+        st.error(f"Arquivo '{EXCEL_PAGAR}' não encontrado. Verifique o caminho.")
+        st.stop()
+    use_ledgers(EXCEL_PAGAR)
+
+    # Select mês (padrão atual)
+    default_idx = FULL_MONTHS.index(date.today().strftime("%m"))
+    aba = st.selectbox("Selecione o mês:", FULL_MONTHS, index=default_idx)
+
+    # Carrega dados diretamente do Excel
+    df = load_data(EXCEL_PAGAR, aba).reset_index(drop=True)
+    df.insert(0, "#", range(1, len(df) + 1))
+
+    # Filtros avançados (opções vindas do índice de busca da aba, em cache)
+    indice = search_index(EXCEL_PAGAR, aba)
+    with st.expander("🔍 Filtros Avançados", expanded=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            filtro_fn = st.selectbox("Fornecedor", ["Todos"] + indice.opcoes("fornecedor"))
+        with col2:
+            filtro_st = st.selectbox("Status", ["Todos"] + indice.opcoes("status_pagamento"))
+
+    # Aplica filtros
+    df_disp = filter_entries(df, "fornecedor", filtro_fn, filtro_st)
+
+    # Exibe tabela (paginada)
+    st.markdown("### 📋 Lançamentos")
+    cols_show = ["#", "data_nf", "fornecedor", "valor", "vencimento", "status_pagamento", "estado"]
+    cols_show = [c for c in cols_show if c in df.columns]
+    pagina_pl = entries_controls(len(df_disp), {
+        "#": "#", "data_nf": "Data N/F", "fornecedor": "Fornecedor", "valor": "Valor",
+        "vencimento": "Vencimento", "status_pagamento": "Status", "estado": "Estado",
+    }, "pagar")
+    table_pl = st.empty()
+    status_pl = st.container()
+    if df_disp.empty:
+        st.warning("Nenhum registro encontrado com os filtros selecionados.")
+    else:
+        render_entries(table_pl, df, df_disp, cols_show, pagina_pl)
+
+    # ----- REMOVER REGISTRO -----
+    with st.expander("🗑️ Remover Registro", expanded=False):
+        if not df_disp.empty:
+            sel = st.selectbox("Selecione o número da linha (#) para remover:", df_disp["#"].tolist(), key="remove_idx_pagar")
+            if st.button("Remover Registro", key="btn_remove_pagar"):
+                try:
+                    # índice no DataFrame completo
+                    idx_full = df[df["#"] == sel].index[0]
+                    delete_record(EXCEL_PAGAR, aba, df, idx_full)
+                    st.success(f"Registro #{sel} removido com sucesso!")
+                    # Recarrega tabela
+                    df = load_data(EXCEL_PAGAR, aba).reset_index(drop=True)
+                    df.insert(0, "#", range(1, len(df) + 1))
+                    # reaplica filtros e reexibe
+                    df_disp = filter_entries(df, "fornecedor", filtro_fn, filtro_st)
+                    render_entries(table_pl, df, df_disp, cols_show, pagina_pl)
+                except Exception as e:
+                    st.error(f"Erro ao remover registro: {e}")
+        else:
+            st.info("Nenhum registro para remover.")
+
+    # ----- EDITAR REGISTRO -----
+    with st.expander("✏️ Editar Registro", expanded=False):
+        if not df_disp.empty:
+            sel = st.selectbox("Selecione o nº da linha (#) para editar:", df_disp["#"].tolist(), key="edit_idx_pagar")
+            idx_full = df[df["#"] == sel].index[0]
+            rec = df.loc[idx_full]
+            col1, col2 = st.columns(2)
+            with col1:
+                novo_valor = st.number_input("Valor (R$):", value=float(rec["valor"]) if pd.notna(rec["valor"]) else 0.0, step=0.01, key="edit_valor_pagar")
+                novo_venc = st.date_input("Vencimento:", value=rec["vencimento"].date() if pd.notna(rec["vencimento"]) else date.today(), key="edit_venc_pagar")
+            with col2:
+                novo_estado = st.selectbox("Estado:", ["Em Aberto", "Pago"], index=0 if rec["estado"] == "Em Aberto" else 1, key="edit_estado_pagar")
+                sit_opts = ["Em Atraso", "Pago", "Em Aberto"]
+                idx_sit = sit_opts.index(rec.get("situacao", "Em Atraso")) if rec.get("situacao") in sit_opts else 0
+                nova_sit = st.selectbox("Situação:", sit_opts, index=idx_sit, key="edit_situacao_pagar")
+
+            if st.button("💾 Salvar Alterações", key="btn_save_edit_pagar"):
+                try:
+                    # grava só os campos que mudaram
+                    alteracoes = {
+                        "valor": novo_valor,
+                        "vencimento": novo_venc,
+                        "estado": novo_estado,
+                        "situacao": nova_sit
+                    }
+                    if update_record(EXCEL_PAGAR, aba, df, idx_full, alteracoes):
+                        st.success("Registro atualizado com sucesso!")
+                    else:
+                        st.error("Falha ao salvar alterações.")
+                    # Recarrega e reexibe tabela
+                    df = load_data(EXCEL_PAGAR, aba).reset_index(drop=True)
+                    df.insert(0, "#", range(1, len(df) + 1))
+                    df_disp = filter_entries(df, "fornecedor", filtro_fn, filtro_st)
+                    render_entries(table_pl, df, df_disp, cols_show, pagina_pl)
+                except Exception as e:
+                    st.error(f"Erro ao editar registro: {e}")
+        else:
+            st.info("Nenhum registro para editar.")
+
+    # ----- ADICIONAR NOVO REGISTRO -----
+    with st.expander("➕ Adicionar Nova Conta", expanded=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            nf_data = st.date_input("Data N/F:", value=date.today())
+            nf_desc = st.text_input("Descrição:")
+            nf_forn = st.text_input("Fornecedor:")
+        with col2:
+            nf_os = st.text_input("Documento/OS:")
+            nf_venc = st.date_input("Vencimento:", value=date.today())
+            nf_val = st.number_input("Valor (R$):", min_value=0.01, step=0.01)
+        nf_estado = st.selectbox("Estado:", ["Em Aberto", "Pago"])
+        nf_situ   = st.selectbox("Situação:", ["Em Atraso", "Pago", "Em Aberto"])
+
+        if st.button("➕ Adicionar Conta", key="btn_add_pagar"):
+            novo = {
+                "data_nf": nf_data,
+                "forma_pagamento": nf_desc,
+                "fornecedor": nf_forn,
+                "os": nf_os,
+                "vencimento": nf_venc,
+                "valor": nf_val,
+                "estado": nf_estado,
+                "situacao": nf_situ
+            }
+            try:
+                if add_record(EXCEL_PAGAR, aba, novo):
+                    st.success("Conta adicionada com sucesso!")
+                    # Recarrega e reexibe tabela
+                    df = load_data(EXCEL_PAGAR, aba).reset_index(drop=True)
+                    df.insert(0, "#", range(1, len(df) + 1))
+                    df_disp = filter_entries(df, "fornecedor", filtro_fn, filtro_st)
+                    render_entries(table_pl, df, df_disp, cols_show, pagina_pl)
+                else:
+                    st.error("Erro ao adicionar conta.")
+            except Exception as e:
+                st.error(f"Erro ao adicionar conta: {e}")
+
+    # ----- ANEXOS -----
+    with st.expander("📎 Anexos (Boletos e Comprovantes)", expanded=False):
+        render_attachments(EXCEL_PAGAR, aba, df, df_disp, "pagar")
+
+    # ----- IMPORTAR LANÇAMENTOS -----
+    with st.expander("📥 Importar Lançamentos (CSV/OFX/XLSX)", expanded=False):
+        import_entries(EXCEL_PAGAR, aba, "pagar")
+
+    with status_pl:
+        write_status(EXCEL_PAGAR)
+
+elif page == "Contas a Receber":
+    st.subheader("🗂️ Contas a Receber")
+
+    if not fonte_disponivel(EXCEL_RECEBER):
+        st.error(f"Arquivo '{EXCEL_RECEBER}' não encontrado. Verifique o caminho.")
+        st.stop()
+    use_ledgers(EXCEL_RECEBER)
+
+    default_idx = FULL_MONTHS.index(date.today().strftime("%m"))
+    aba = st.selectbox("Selecione o mês:", FULL_MONTHS, index=default_idx)
+
+    df = load_data(EXCEL_RECEBER, aba).reset_index(drop=True)
+    df.insert(0, "#", range(1, len(df) + 1))
+
+    # Coluna do cliente (exibida como "Cliente")
+    col_cliente = "fornecedor" if "fornecedor" in df.columns else "cliente"
+    indice = search_index(EXCEL_RECEBER, aba)
+    with st.expander("🔍 Filtros Avançados", expanded=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            filtro_cl = st.selectbox("Cliente", ["Todos"] + indice.opcoes(col_cliente))
+
+        with col2:
+            filtro_st = st.selectbox("Status", ["Todos"] + indice.opcoes("status_pagamento"))
+
+    df_disp = filter_entries(df, col_cliente, filtro_cl, filtro_st)
+
+    st.markdown("### 📋 Lançamentos")
+    cols_show = ["#", "data_nf", col_cliente, "valor", "vencimento", "status_pagamento", "estado"]
+    cols_show = [c for c in cols_show if c in df.columns]
+    pagina_pr = entries_controls(len(df_disp), {
+        "#": "#", "data_nf": "Data N/F", col_cliente: "Cliente", "valor": "Valor",
+        "vencimento": "Vencimento", "status_pagamento": "Status", "estado": "Estado",
+    }, "receber")
+    table_pr = st.empty()
+    status_pl = st.container()
+    if df_disp.empty:
+        st.warning("Nenhum registro encontrado com os filtros selecionados.")
+    else:
+        render_entries(table_pr, df, df_disp, cols_show, pagina_pr, {col_cliente: "Cliente"})
+
+    # ----- REMOVER REGISTRO -----
+    with st.expander("🗑️ Remover Registro", expanded=False):
+        if not df_disp.empty:
+            sel = st.selectbox("Selecione o número da linha (#) para remover:", df_disp["#"].tolist(), key="remove_idx_receber")
+            if st.button("Remover Registro", key="btn_remove_receber"):
+                try:
+                    idx_full = df[df["#"] == sel].index[0]
+                    delete_record(EXCEL_RECEBER, aba, df, idx_full)
+                    st.success(f"Registro #{sel} removido com sucesso!")
+
+                    # recarrega dados e reaplica filtros
+                    df = load_data(EXCEL_RECEBER, aba).reset_index(drop=True)
+                    df.insert(0, "#", range(1, len(df) + 1))
+                    df_disp = filter_entries(df, col_cliente, filtro_cl, filtro_st)
+
+                    # reexibe tabela
+                    render_entries(table_pr, df, df_disp, cols_show, pagina_pr, {col_cliente: "Cliente"})
+
+                except Exception as e:
+                    st.error(f"Erro ao remover registro: {e}")
+        else:
+            st.info("Nenhum registro para remover.")
+
+    # ----- EDITAR REGISTRO -----
+    with st.expander("✏️ Editar Registro", expanded=False):
+        if not df_disp.empty:
+            sel = st.selectbox("Selecione o nº da linha (#) para editar:", df_disp["#"].tolist(), key="edit_idx_receber")
+            idx_full = df[df["#"] == sel].index[0]
+            rec = df.loc[idx_full]
+
+            col1, col2 = st.columns(2)
+            with col1:
+                novo_valor = st.number_input("Valor (R$):", value=float(rec["valor"]) if pd.notna(rec["valor"]) else 0.0, step=0.01, key="edit_valor_receber")
+                novo_venc = st.date_input("Vencimento:", value=rec["vencimento"].date() if pd.notna(rec["vencimento"]) else date.today(), key="edit_venc_receber")
+            with col2:
+                novo_estado = st.selectbox("Estado:", ["A Receber", "Recebido"], index=0 if rec["estado"]=="A Receber" else 1, key="edit_estado_receber")
+                sit_opts = ["Em Atraso", "Recebido", "A Receber"]
+                idx_sit = sit_opts.index(rec.get("situacao","Em Atraso")) if rec.get("situacao") in sit_opts else 0
+                nova_sit = st.selectbox("Situação:", sit_opts, index=idx_sit, key="edit_situacao_receber")
+
+            if st.button("💾 Salvar Alterações", key="btn_save_edit_receber"):
+                try:
+                    alteracoes = {
+                        "valor": novo_valor,
+                        "vencimento": novo_venc,
+                        "estado": novo_estado,
+                        "situacao": nova_sit
+                    }
+                    if update_record(EXCEL_RECEBER, aba, df, idx_full, alteracoes):
+                        st.success("Registro atualizado com sucesso!")
+                        # recarregar e reexibir tabela (mesma lógica de cima)...
+                    else:
+                        st.error("Falha ao salvar alterações.")
+                except Exception as e:
+                    st.error(f"Erro ao editar registro: {e}")
+        else:
+            st.info("Nenhum registro para editar.")
+
+    # ----- ADICIONAR NOVO REGISTRO -----
+    with st.expander("➕ Adicionar Nova Conta", expanded=False):
+        col1, col2 = st.columns(2)
+        with col1:
+            nf_data    = st.date_input("Data N/F:", value=date.today())
+            nf_desc    = st.text_input("Descrição:")
+            nf_cliente = st.text_input("Cliente:")
+        with col2:
+            nf_os      = st.text_input("Documento/OS:")
+            nf_venc    = st.date_input("Vencimento:", value=date.today())
+            nf_val     = st.number_input("Valor (R$):", min_value=0.01, step=0.01)
+
+        nf_estado = st.selectbox("Estado:", ["A Receber", "Recebido"])
+        nf_situ   = st.selectbox("Situação:", ["Em Atraso", "Recebido", "A Receber"])
+
+        if st.button("➕ Adicionar Conta", key="btn_add_receber"):
+            if not nf_cliente or nf_val <= 0:
+                st.error("Preencha pelo menos Cliente e Valor.")
+            else:
+                novo = {
+                    "data_nf":         nf_data,
+                    "forma_pagamento": nf_desc,
+                    "fornecedor":      nf_cliente,
+                    "os":              nf_os,
+                    "vencimento":      nf_venc,
+                    "valor":           nf_val,
+                    "estado":          nf_estado,
+                    "situacao":        nf_situ
+                }
+                if add_record(EXCEL_RECEBER, aba, novo):
+                    st.success("Conta adicionada com sucesso!")
+                    if hasattr(st, "experimental_rerun"):
+                        st.experimental_rerun()
+                else:
+                    st.error("Erro ao adicionar conta. Verifique o Excel.")
+
+    # ----- ANEXOS -----
+    with st.expander("📎 Anexos (Boletos e Comprovantes)", expanded=False):
+        render_attachments(EXCEL_RECEBER, aba, df, df_disp, "receber")
+
+    # ----- IMPORTAR LANÇAMENTOS -----
+    with st.expander("📥 Importar Lançamentos (CSV/OFX/XLSX)", expanded=False):
+        import_entries(EXCEL_RECEBER, aba, "receber")
+
+    with status_pl:
+        write_status(EXCEL_RECEBER)
+
+elif page == "Buscar Lançamentos":
+    st.subheader("🔎 Buscar Lançamentos")
+    planilhas_busca = {"Contas a Pagar": "pagar", "Contas a Receber": "receber"}
+    campos_busca = {"fornecedor": "Fornecedor/Cliente", "os": "Documento/OS", "forma_pagamento": "Descrição"}
+
+    col1, col2 = st.columns([3, 1])
+    with col1:
+        texto = st.text_input("Buscar por fornecedor/cliente, documento/OS ou descrição:", key="busca_texto")
+    with col2:
+        modo = st.selectbox("Texto", ["Contém", "Começa com"], key="busca_modo")
+
+    with st.expander("🔍 Mais Filtros", expanded=False):
+        col1, col2, col3 = st.columns(3)
+        with col1:
+            origens = st.multiselect("Planilhas", list(planilhas_busca), default=list(planilhas_busca), key="busca_planilhas")
+            anos_busca = st.multiselect("Anos", ANOS, default=[ANO], key="busca_anos")
+            campos = st.multiselect(
+                "Buscar em", list(campos_busca), default=list(campos_busca),
+                format_func=campos_busca.get, key="busca_campos"
+            )
+        with col2:
+            valor_min = st.number_input("Valor mínimo (R$):", value=None, min_value=0.0, step=0.01, key="busca_valor_min")
+            valor_max = st.number_input("Valor máximo (R$):", value=None, min_value=0.0, step=0.01, key="busca_valor_max")
+        with col3:
+            venc_de = st.date_input("Vencimento de:", value=None, format="DD/MM/YYYY", key="busca_venc_de")
+            venc_ate = st.date_input("Vencimento até:", value=None, format="DD/MM/YYYY", key="busca_venc_ate")
+        estados = st.multiselect("Estado", ["Em Aberto", "Pago", "A Receber", "Recebido"], key="busca_estados")
+
+    # Índices de todas as abas das planilhas e anos escolhidos (só as abas
+    # alteradas são refeitas; anos fora da busca podem sair da memória)
+    livros_busca = [
+        (nome, ano, catalogo.arquivo(LIVROS, planilhas_busca[nome], ano))
+        for nome in origens for ano in sorted(anos_busca)
+    ]
+    livros_busca = [(nome, ano, livro) for nome, ano, livro in livros_busca if fonte_disponivel(livro)]
+    use_ledgers(*(livro for _, _, livro in livros_busca))
+    abas_busca = {livro: tuple(get_existing_sheets(livro)) for _, _, livro in livros_busca}
+    indices = [
+        (nome, f"{aba}/{ano}", search_index(livro, aba, abas_busca[livro]))
+        for nome, ano, livro in livros_busca
+        for aba in abas_busca[livro]
+    ]
+    consulta = busca.Consulta(
+        texto=texto, campos=tuple(campos), prefixo=modo == "Começa com",
+        valor_min=valor_min, valor_max=valor_max, vencimento_de=venc_de, vencimento_ate=venc_ate,
+        estados=tuple(estados),
+    )
+    inicio_busca = time.perf_counter()
+    resultado = busca.buscar(indices, consulta)
+    duracao = (time.perf_counter() - inicio_busca) * 1000
+
+    st.markdown("### 📋 Resultados")
+    pagina_busca = entries_controls(resultado.total, {"vencimento": "Vencimento", "valor": "Valor"}, "busca")
+    if not resultado.total:
+        st.warning("Nenhum lançamento encontrado.")
+    else:
+        inicio, tamanho = page_bounds(resultado.total, pagina_busca)
+        encontrados = resultado.linhas(pagina_busca["ordenar"], pagina_busca["crescente"], inicio, tamanho)
+        cols_show = ["planilha", "aba", "data_nf", "fornecedor", "os", "forma_pagamento",
+                     "valor", "vencimento", "status_pagamento", "estado"]
+        cols_show = [c for c in cols_show if c in encontrados.columns]
+        st.dataframe(
+            formatacao.formatar(encontrados[cols_show], textos=busca.CAMPOS_TEXTO),
+            height=400, use_container_width=True, hide_index=True
+        )
+        st.caption(
+            f"Mostrando {inicio + 1}–{inicio + len(encontrados)} de {resultado.total} lançamentos "
+            f"(busca em {duracao:.0f} ms)"
+        )
+
+    # ----- BUSCA NO CONTEÚDO DOS ANEXOS -----
+    st.markdown("### 📎 Buscar nos Anexos")
+    texto_anexos = st.text_input(
+        "Linha digitável, CNPJ, valor ou texto dos boletos e comprovantes (PDF):", key="busca_anexos_texto"
+    )
+    if texto_anexos.strip():
+        inicio_busca = time.perf_counter()
+        achados = conteudo.buscar(ANEXOS_DIR, texto_anexos)
+        duracao = (time.perf_counter() - inicio_busca) * 1000
+        if not achados:
+            st.warning("Nenhum anexo encontrado.")
+        else:
+            st.dataframe(attachment_results(achados), height=300, use_container_width=True, hide_index=True)
+            escolhido = st.selectbox(
+                "Baixar anexo:", range(len(achados)), key="busca_anexo_baixar",
+                format_func=lambda i: f"{achados[i]['nome']} ({achados[i]['planilha']}, mês {achados[i]['mes']})"
+            )
+            st.download_button(
+                "⬇️ Baixar", data=lambda sha=achados[escolhido]["sha256"]: anexos.ler(ANEXOS_DIR, sha),
+                file_name=achados[escolhido]["nome"], mime=achados[escolhido]["mime"], on_click="ignore",
+                key="busca_anexo_download"
+            )
+            st.caption(f"{len(achados)} anexo(s) encontrado(s) (busca em {duracao:.0f} ms)")
+    indexados = conteudo.situacao(ANEXOS_DIR)
+    pendentes = conteudo.pendentes()
+    st.caption(
+        f"{indexados.get('texto', 0)} PDF(s) com texto indexado, "
+        f"{indexados.get('sem texto', 0)} arquivo(s) sem texto (imagens ou PDFs escaneados)"
+        + (f", {pendentes} aguardando indexação." if pendentes else ".")
+    )
+
+
+            
+st.markdown("""
+<div style="text-align: center; font-size:12px; color:gray; margin-top: 20px;">
+    <p>© 2025 Desenvolvido por Vinicius Magalhães</p>
+</div>
+""", unsafe_allow_html=True)
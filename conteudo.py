@@ -0,0 +1,170 @@
+import queue
+import re
+import sqlite3
+import threading
+from contextlib import closing
+
+import anexos
+
+# Índice de texto dos anexos (FTS5 no mesmo anexos/indice.db): o texto dos PDFs
+# que já têm camada de texto é extraído por uma thread em segundo plano, uma vez
+# por arquivo (o endereço é o SHA-256, então cópias do mesmo arquivo são
+# indexadas uma vez só). Imagens e PDFs escaneados entram como "sem texto", sem
+# OCR. Além das palavras, cada sequência de dígitos com pontos, traços, barras
+# ou espaços (linha digitável, CNPJ, CPF) é indexada também só com os dígitos.
+MAX_PAGINAS = 50
+MIN_DIGITOS = 8  # sequências menores não são tratadas como códigos
+GRUPOS = 8  # grupos separados por espaço juntados num código (linha digitável tem 5)
+
+SCHEMA = """
+CREATE VIRTUAL TABLE IF NOT EXISTS textos USING fts5 (
+    sha256 UNINDEXED, texto, numeros, tokenize = "unicode61 remove_diacritics 2"
+);
+CREATE TABLE IF NOT EXISTS extraidos (
+    sha256    TEXT PRIMARY KEY,
+    situacao  TEXT NOT NULL,  -- "texto", "sem texto" ou "erro"
+    paginas   INTEGER
+);
+"""
+
+_CODIGO = re.compile(r"\d[\d.\-/ ]*\d")
+
+_fila: queue.Queue = queue.Queue()
+_iniciados: set[str] = set()
+_lock = threading.Lock()
+
+
+def conectar(pasta: str) -> sqlite3.Connection:
+    conn = anexos.conectar(pasta)
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def numeros(texto: str) -> str:
+    # Códigos do texto só com os dígitos. Grupos separados por espaço (os
+    # campos da linha digitável) também começam um código, para que a busca
+    # por prefixo ache a partir de qualquer grupo.
+    codigos = []
+    for achado in _CODIGO.finditer(texto):
+        grupos = [re.sub(r"\D", "", g) for g in achado.group().split()]
+        for i in range(len(grupos)):
+            codigo = "".join(grupos[i:i + GRUPOS])
+            if len(codigo) >= MIN_DIGITOS:
+                codigos.append(codigo)
+    return " ".join(codigos)
+
+
+def extrair(caminho: str, mime: str) -> tuple[str, str, int | None]:
+    # (situação, texto, páginas) do arquivo; só PDFs com camada de texto têm texto
+    if mime != "application/pdf":
+        return "sem texto", "", None
+    from pypdf import PdfReader
+
+    leitor = PdfReader(caminho)
+    paginas = leitor.pages[:MAX_PAGINAS]
+    texto = "\n".join(pagina.extract_text() or "" for pagina in paginas).strip()
+    return ("texto" if texto else "sem texto"), texto, len(leitor.pages)
+
+
+def indexar(pasta: str, sha: str) -> bool:
+    # Extrai e grava o texto de um arquivo ainda não indexado; False se já estava
+    with closing(conectar(pasta)) as conn:
+        ja = conn.execute("SELECT 1 FROM extraidos WHERE sha256 = ?", (sha,)).fetchone()
+        row = conn.execute("SELECT mime FROM objetos WHERE sha256 = ?", (sha,)).fetchone()
+    if ja or row is None:
+        return False
+
+    try:
+        situacao, texto, paginas = extrair(anexos.caminho_objeto(pasta, sha), row[0])
+    except Exception:
+        situacao, texto, paginas = "erro", "", None
+
+    with closing(conectar(pasta)) as conn, conn:
+        # Outro processo pode ter indexado o mesmo arquivo enquanto este extraía
+        cur = conn.execute(
+            "INSERT OR IGNORE INTO extraidos (sha256, situacao, paginas) VALUES (?, ?, ?)", (sha, situacao, paginas)
+        )
+        if cur.rowcount and texto:
+            conn.execute(
+                "INSERT INTO textos (sha256, texto, numeros) VALUES (?, ?, ?)", (sha, texto, numeros(texto))
+            )
+    return bool(cur.rowcount)
+
+
+def _executar() -> None:
+    while True:
+        pasta, sha = _fila.get()
+        try:
+            indexar(pasta, sha)
+        except Exception:
+            pass  # o arquivo volta para a fila na próxima partida (ver iniciar)
+
+
+def agendar(pasta: str, sha: str) -> None:
+    # Chamada depois de anexar um arquivo: a extração roda em segundo plano
+    iniciar(pasta)
+    _fila.put((pasta, sha))
+
+
+def iniciar(pasta: str) -> None:
+    # Uma vez por processo: sobe a thread e agenda os arquivos ainda não
+    # indexados (enviados por outro processo ou antes de uma parada), além de
+    # tirar do índice os arquivos que foram apagados
+    with _lock:
+        if pasta in _iniciados:
+            return
+        if not _iniciados:
+            threading.Thread(target=_executar, name="indexador de anexos", daemon=True).start()
+        _iniciados.add(pasta)
+
+    with closing(conectar(pasta)) as conn, conn:
+        conn.execute("DELETE FROM textos WHERE sha256 NOT IN (SELECT sha256 FROM objetos)")
+        conn.execute("DELETE FROM extraidos WHERE sha256 NOT IN (SELECT sha256 FROM objetos)")
+        faltando = conn.execute(
+            "SELECT sha256 FROM objetos WHERE sha256 NOT IN (SELECT sha256 FROM extraidos)"
+        ).fetchall()
+    for (sha,) in faltando:
+        _fila.put((pasta, sha))
+
+
+def pendentes() -> int:
+    return _fila.qsize()
+
+
+def _consulta(texto: str) -> str | None:
+    # Expressão FTS5: um código (só dígitos e separadores) vai na coluna de
+    # números, por prefixo; o resto vira termos (também por prefixo) na coluna de texto
+    digitos = re.sub(r"[\s.\-/]", "", texto)
+    if digitos.isdigit() and len(digitos) >= MIN_DIGITOS:
+        return f'numeros : "{digitos}"*'
+    termos = [t.replace('"', '""') for t in texto.split()]
+    return " AND ".join(f'texto : "{t}"*' for t in termos) or None
+
+
+def buscar(pasta: str, texto: str, limite: int = 50) -> list[dict]:
+    # Anexos cujo conteúdo tem o texto/código, dos indexados por último para os
+    # primeiros, com o lançamento de cada um e um trecho do texto. A ordem pelo
+    # rowid segue a lista do próprio índice, sem pontuar todos os documentos
+    # encontrados, e o trecho só é montado para os que serão devolvidos.
+    consulta = _consulta(texto)
+    if consulta is None:
+        return []
+    with closing(conectar(pasta)) as conn:
+        conn.row_factory = sqlite3.Row
+        rows = conn.execute(
+            "WITH achados AS ("
+            "    SELECT rowid AS ordem, sha256, snippet(textos, 1, '**', '**', ' … ', 12) AS trecho"
+            "    FROM textos WHERE textos MATCH ? ORDER BY rowid DESC LIMIT ?"
+            ") "
+            "SELECT v.id, v.planilha, v.mes, v.lancamento, v.campo, v.nome, v.sha256, o.mime, a.trecho "
+            "FROM achados a JOIN vinculos v ON v.sha256 = a.sha256 JOIN objetos o ON o.sha256 = a.sha256 "
+            "ORDER BY a.ordem DESC, v.id LIMIT ?",
+            (consulta, limite, limite)
+        ).fetchall()
+    return [dict(r) for r in rows]
+
+
+def situacao(pasta: str) -> dict[str, int]:
+    # Nº de arquivos por situação da extração
+    with closing(conectar(pasta)) as conn:
+        return dict(conn.execute("SELECT situacao, COUNT(*) FROM extraidos GROUP BY situacao").fetchall())
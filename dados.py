@@ -0,0 +1,302 @@
+import os
+from datetime import date
+
+import pandas as pd
+import streamlit as st
+
+import agregados
+import anexos
+import armazenamento
+import atrasos
+import busca
+import catalogo
+import fila
+import fluxo
+import graficos
+import gravacao
+from planilhas import (
+    DATA_COLS, classificar_status, diferencas, ler_aba, listar_abas, normalizar_aba, novos_ids,
+    registrar_proxima_linha, versao_aba, versao_arquivo
+)
+
+# Caminho de dados do app: leitura das abas, gravações (direto no banco ou pela
+# fila de gravação do Excel) e os caches derivados usados pelas telas. Fica
+# fora de contasapagar.py para poder ser importado sem a interface (ver
+# benchmarks/suite.py).
+
+ANEXOS_DIR = "anexos"
+# Backend de dados: "excel" (padrão, lê e grava direto nas planilhas) ou "sqlite"
+# (banco local; as planilhas viram formato de importação/exportação)
+BACKEND = os.environ.get("FINANCEIRO_BACKEND", "excel").strip().lower()
+DB_PATH = os.environ.get("FINANCEIRO_DB", "financeiro.db")
+# Endereço persistente dos lançamentos, que liga cada um aos seus anexos
+CHAVE_ANEXO = "id" if BACKEND == "sqlite" else "linha"
+
+
+# Os caches abaixo são chaveados pela versão do arquivo/aba (ver planilhas.versao_aba):
+# trocar filtros não relê o Excel, e cada escrita do app invalida só a aba alterada.
+@st.cache_data(show_spinner=False, max_entries=64)
+def _get_existing_sheets_cached(excel_path: str, versao: int) -> list[str]:
+    # Só o xl/workbook.xml é lido, nenhuma aba
+    return listar_abas(excel_path)
+
+
+def fonte_disponivel(excel_path: str) -> bool:
+    return BACKEND == "sqlite" or os.path.isfile(excel_path)
+
+
+def get_existing_sheets(excel_path: str) -> list[str]:
+    try:
+        if BACKEND == "sqlite":
+            return armazenamento.listar_meses(DB_PATH, excel_path)
+        return _get_existing_sheets_cached(excel_path, versao_arquivo(excel_path))
+    except Exception as e:
+        st.error(f"Erro ao ler abas do arquivo: {e}")
+        return []
+
+
+def load_data(excel_path: str, sheet_name: str, junto: tuple = ()) -> pd.DataFrame:
+    # `junto`: demais abas que serão carregadas em seguida (ver planilhas.ler_aba)
+    if not fonte_disponivel(excel_path):
+        return pd.DataFrame(columns=DATA_COLS + ["status_pagamento"])
+
+    try:
+        if BACKEND == "sqlite":
+            # Consulta indexada por (planilha, mês): não precisa de cache
+            df = armazenamento.carregar_aba(DB_PATH, excel_path, sheet_name)
+            df["status_pagamento"] = classificar_status(df, catalogo.eh_receber(excel_path))
+            df.attrs["aba"] = (excel_path, sheet_name)
+            return df
+
+        versao = versao_aba(excel_path, sheet_name)
+        df = _load_data_cached(excel_path, sheet_name, versao, date.today(), junto)
+        pendentes = fila.pendentes(excel_path, sheet_name)
+        if pendentes:
+            # Alterações ainda na fila de gravação já aparecem para todos
+            df = fila.aplicar_pendentes(excel_path, sheet_name, df)
+            df["status_pagamento"] = classificar_status(df, catalogo.eh_receber(excel_path))
+        # Identifica esta versão dos dados para as visões formatadas em cache
+        df.attrs["visao"] = (excel_path, sheet_name, versao, date.today(), tuple(c.seq for c in pendentes))
+        df.attrs["aba"] = (excel_path, sheet_name)
+        return df
+    except Exception as e:
+        st.error(f"Erro ao carregar dados: {e}")
+        return pd.DataFrame(columns=DATA_COLS + ["status_pagamento"])
+
+
+@st.cache_data(show_spinner=False, max_entries=256)
+def _load_data_cached(
+    excel_path: str, sheet_name: str, versao: tuple[int, int], hoje: date, _junto: tuple = ()
+) -> pd.DataFrame:
+    # Só esta aba (e as de _junto que faltam) é lida do arquivo, em fluxo (em
+    # cache por mtime/tamanho); _junto fica fora da chave do cache
+    bruto = ler_aba(excel_path, sheet_name, _junto)
+
+    if bruto is None:
+        return pd.DataFrame(columns=DATA_COLS + ["status_pagamento"])
+
+    df = normalizar_aba(bruto.copy())
+
+    # Detecta modo: Pagar ou Receber
+    is_receber = catalogo.eh_receber(excel_path)
+
+    # Monta status_pagamento (vetorizado)
+    df["status_pagamento"] = classificar_status(df, is_receber, hoje)
+    # Versão da aba lida, conferida pelas gravações (ver gravacao.editar_planilha)
+    df.attrs["versao"] = versao
+    return df
+
+
+def add_record(excel_path: str, sheet_name: str, record: dict) -> bool:
+    if BACKEND == "sqlite":
+        return add_records(excel_path, [(sheet_name, record)])
+    # No Excel a inclusão vai para a fila de gravação em segundo plano
+    fila.enfileirar(excel_path, fila.Comando(
+        "incluir", sheet_name, id=novos_ids(1)[0], campos=record, dono=st.session_state.get("username")
+    ))
+    return True
+
+
+def add_records(excel_path: str, entries: list[tuple[str, dict]]) -> bool:
+    # Inclui vários lançamentos (aba, registro) com um único salvamento do workbook
+    try:
+        if BACKEND == "sqlite":
+            armazenamento.inserir_em_lote(DB_PATH, excel_path, entries)
+            for sheet_name in {aba for aba, _ in entries}:
+                discard_sheet_caches(excel_path, sheet_name)
+            return True
+
+        # Inclusões não precisam de checagem de versão: a próxima linha livre
+        # é conferida no workbook aberto sob o lock
+        abas = list(dict.fromkeys(aba for aba, _ in entries))
+        alteracoes = {}
+        with gravacao.editar_planilha(excel_path, abas, alteracoes=alteracoes) as wb:
+            proximas = gravacao.incluir_registros(wb, excel_path, entries, alteracoes=alteracoes)
+
+        for sheet_name, next_row in proximas.items():
+            registrar_proxima_linha(excel_path, sheet_name, next_row)
+            discard_sheet_caches(excel_path, sheet_name)
+        return True
+
+    except Exception as e:
+        st.error(f"Erro ao adicionar registro: {e}")
+        return False
+
+
+def update_record(excel_path: str, sheet_name: str, df: pd.DataFrame, idx: int, changes: dict) -> bool:
+    # Grava apenas as células que mudaram na linha idx (diff contra o registro carregado)
+    alteradas = diferencas(df.loc[idx], changes)
+    if not alteradas:
+        return True
+
+    try:
+        if BACKEND == "sqlite":
+            armazenamento.atualizar_campos(DB_PATH, df.at[idx, "id"], alteradas)
+            discard_sheet_caches(excel_path, sheet_name)
+            return True
+
+        # "Situação" é fórmula na planilha e não é gravada
+        alteradas.pop("situacao", None)
+        if not alteradas:
+            return True
+
+        # No Excel a gravação vai para a fila em segundo plano; a linha vem do
+        # id estável do lançamento e é conferida pelo registro original
+        fila.enfileirar(excel_path, fila.Comando(
+            "editar", sheet_name, *_endereco(df, idx), _identificacao(df, idx), alteradas,
+            dono=st.session_state.get("username")
+        ))
+        return True
+
+    except Exception as e:
+        st.error(f"Erro ao salvar dados: {e}")
+        return False
+
+
+def delete_record(excel_path: str, sheet_name: str, df: pd.DataFrame, idx: int) -> bool:
+    # Remove a linha idx do DataFrame carregado por load_data
+    # Os anexos do lançamento saem junto, só depois que a remoção é gravada
+    if BACKEND == "sqlite":
+        removido = armazenamento.remover_lancamento(DB_PATH, df.at[idx, "id"])
+        discard_sheet_caches(excel_path, sheet_name)
+        if removido:
+            anexos.remover_lancamento(ANEXOS_DIR, excel_path, sheet_name, anexos.chave(df.loc[idx], CHAVE_ANEXO))
+        return removido
+
+    fila.enfileirar(excel_path, fila.Comando(
+        "remover", sheet_name, *_endereco(df, idx), _identificacao(df, idx), dono=st.session_state.get("username")
+    ))
+    return True
+
+
+def _apos_gravar(excel_path: str, comando: fila.Comando, linha: int) -> None:
+    # Chamada pela fila depois de salvar cada comando, inclusive os retomados
+    # do diário: os anexos da linha removida saem e os de baixo sobem junto
+    if comando.tipo == "remover":
+        anexos.remover_linha(ANEXOS_DIR, excel_path, comando.aba, linha)
+
+
+fila.ao_gravar = _apos_gravar
+
+
+def _endereco(df: pd.DataFrame, idx: int) -> tuple[int | None, int | None]:
+    # (id estável, linha do Excel) do lançamento carregado
+    return tuple(
+        int(df.at[idx, c]) if c in df.columns and pd.notna(df.at[idx, c]) else None
+        for c in ("id", "linha")
+    )
+
+
+def _identificacao(df: pd.DataFrame, idx: int) -> dict:
+    # Campos do registro como o usuário o viu, para localizá-lo na hora de gravar
+    return {c: df.at[idx, c] for c in gravacao.IDENTIFICACAO if c in df.columns}
+
+
+def discard_sheet_caches(excel_path: str, sheet_name: str) -> None:
+    # Resumo do Dashboard e índice de busca da aba gravada
+    agregados.descartar(excel_path, sheet_name)
+    busca.descartar(excel_path, sheet_name)
+    fluxo.descartar(excel_path, sheet_name)
+    atrasos.descartar(excel_path, sheet_name)
+    graficos.descartar(excel_path)
+
+
+def use_ledgers(*excel_paths: str) -> None:
+    # Livros (anos) usados pela tela atual: os demais podem sair da memória.
+    # As cópias normalizadas do cache do Streamlit não têm descarte por
+    # chave; quando algum ano é descartado elas são limpas juntas.
+    if BACKEND == "excel" and catalogo.usar(*excel_paths):
+        _load_data_cached.clear()
+
+
+def sheet_version(excel_path: str, sheet_name: str):
+    # Versão dos dados da aba para os caches derivados: muda com cada gravação
+    # e com cada alteração que entra na fila de gravação (no SQLite as
+    # gravações descartam os caches da aba diretamente)
+    if BACKEND == "sqlite":
+        return None
+    pendentes = tuple(c.seq for c in fila.pendentes(excel_path, sheet_name))
+    return (versao_aba(excel_path, sheet_name), pendentes)
+
+
+def sheet_key(excel_path: str, sheet_name: str):
+    # Como sheet_version, mas também muda com a data (status Em Atraso)
+    return (date.today(), sheet_version(excel_path, sheet_name))
+
+
+def search_index(excel_path: str, sheet_name: str, junto: tuple = ()) -> busca.IndiceAba:
+    # Índice de busca da aba, refeito só quando a aba (ou a fila dela) muda
+    return busca.indice_aba(
+        excel_path, sheet_name, sheet_key(excel_path, sheet_name), lambda: load_data(excel_path, sheet_name, junto)
+    )
+
+
+def aging_report(excel_paths: list[str]) -> tuple[pd.DataFrame, pd.DataFrame]:
+    # Atrasos por faixa e por fornecedor/cliente. As partes por aba não
+    # dependem da data; na virada do dia o relatório só é rolado.
+    abas = {excel_path: tuple(get_existing_sheets(excel_path)) for excel_path in excel_paths}
+    partes = tuple(
+        (excel_path, s, sheet_version(excel_path, s))
+        for excel_path in excel_paths for s in abas[excel_path]
+    )
+    return atrasos.relatorio(tuple(excel_paths), partes, lambda: [
+        atrasos.parte(
+            excel_path, s, versao, lambda excel_path=excel_path, s=s: load_data(excel_path, s, abas[excel_path])
+        )
+        for excel_path, s, versao in partes
+    ])
+
+
+def cash_flow(livros_pagar: list[str], livros_receber: list[str], dias: int, saldo_inicial: float) -> pd.DataFrame:
+    # Projeção diária do saldo; só as abas alteradas têm os totais refeitos
+    partes = {False: [], True: []}
+    for is_receber, livros in ((False, livros_pagar), (True, livros_receber)):
+        for excel_path in livros:
+            abas = tuple(get_existing_sheets(excel_path))
+            for s in abas:
+                partes[is_receber].append(fluxo.vencimentos(
+                    excel_path, s, sheet_key(excel_path, s),
+                    lambda excel_path=excel_path, s=s, abas=abas: load_data(excel_path, s, abas), is_receber
+                ))
+    return fluxo.projetar(partes[False], partes[True], date.today(), dias, saldo_inicial)
+
+
+def dashboard_summary(excel_path: str, sheets: list[str]) -> pd.DataFrame:
+    # Resumo mês × status × fornecedor usado pelas métricas e gráficos do Dashboard.
+    # Só as abas alteradas (ou com alterações na fila) desde a última renderização
+    # são recarregadas.
+    resumos = [
+        agregados.resumo_aba(
+            excel_path, s, sheet_key(excel_path, s), lambda s=s: load_data(excel_path, s, tuple(sheets))
+        )
+        for s in sheets
+    ]
+    return agregados.combinar(resumos)
+
+
+def export_data(excel_path: str) -> bytes:
+    # Planilha completa para o botão "Exportar Dados"
+    if BACKEND == "sqlite":
+        return armazenamento.exportar_excel(DB_PATH, excel_path)
+    with open(excel_path, "rb") as f:
+        return f.read()
@@ -0,0 +1,69 @@
+import threading
+
+# Mapeamento entre o cabeçalho das planilhas e os campos normalizados, usado
+# tanto na leitura (planilhas.normalizar_aba) quanto na gravação
+# (gravacao.posicoes_colunas). O mapa de um cabeçalho é montado uma vez e fica
+# em memória pela tupla de títulos: abas com o mesmo layout compartilham o mapa.
+
+# Títulos aceitos no cabeçalho para cada campo gravado no Excel
+FIELD_MAP = {
+    "data_nf":         ["data documento", "data_nf", "data n/f", "data da nota fiscal"],
+    "forma_pagamento": ["descrição", "forma_pagamento", "forma de pagamento"],
+    "fornecedor":      ["fornecedor", "cliente"],
+    "os":              ["documento", "os", "os interna"],
+    "vencimento":      ["vencimento"],
+    "valor":           ["valor"],
+    "estado":          ["estado"],
+    "boleto":          ["boleto", "boleto anexo"],
+    "comprovante":     ["comprovante", "comprovante de pagto"]
+}
+
+_SINONIMOS = {nome: campo for campo, nomes in FIELD_MAP.items() for nome in nomes}
+
+# títulos do cabeçalho -> {campo: posição do título}
+_mapas: dict[tuple, dict[str, int]] = {}
+_lock = threading.Lock()
+
+
+def campo_da_coluna(coluna) -> str | None:
+    # Traduz o título de uma coluna da planilha para o campo normalizado:
+    # primeiro os títulos exatos do FIELD_MAP, depois variações conhecidas
+    nome = str(coluna).strip().lower()
+    if nome in _SINONIMOS:
+        return _SINONIMOS[nome]
+    if ("data" in nome and "nf" in nome) or "data da nota fiscal" in nome:
+        return "data_nf"
+    elif "forma" in nome and "pagamento" in nome:
+        return "forma_pagamento"
+    elif "cliente" in nome:
+        return "fornecedor"
+    elif "os" in nome:
+        return "os"
+    elif "vencimento" in nome:
+        return "vencimento"
+    elif "valor" in nome:
+        return "valor"
+    elif "situa" in nome:
+        return "situacao"
+    elif "comprov" in nome:
+        return "comprovante"
+    elif "boleto" in nome:
+        return "boleto"
+    return None
+
+
+def compilar(titulos) -> dict[str, int]:
+    # {campo: posição} para a sequência de títulos do cabeçalho, na ordem das
+    # colunas. Quando dois títulos dão no mesmo campo vale o primeiro.
+    titulos = tuple(titulos)
+    with _lock:
+        mapa = _mapas.get(titulos)
+    if mapa is None:
+        mapa = {}
+        for pos, titulo in enumerate(titulos):
+            campo = campo_da_coluna(titulo)
+            if campo and campo not in mapa:
+                mapa[campo] = pos
+        with _lock:
+            _mapas[titulos] = mapa
+    return dict(mapa)
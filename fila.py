@@ -0,0 +1,384 @@
+import atexit
+import itertools
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from dataclasses import asdict, dataclass, field
+from datetime import date, datetime
+from typing import Callable
+
+import numpy as np
+import pandas as pd
+
+import gravacao
+from planilhas import (
+    HEADER_ROW, assinatura_arquivo, chave_aba, diferencas, linha_do_id, novos_ids, proxima_linha,
+    registrar_proxima_linha
+)
+
+# Fila de gravação em segundo plano: edições, inclusões e remoções entram na
+# fila e aparecem na hora para todas as sessões (aplicadas sobre os dados
+# carregados); uma thread por planilha grava os comandos acumulados com um
+# único salvamento do workbook.
+#
+# Os comandos ainda não gravados ficam também num diário (write-ahead) ao lado
+# da planilha, <planilha>.pendentes.jsonl: cada comando é acrescentado antes de
+# entrar na fila, e o diário é reescrito com os que restam a cada salvamento.
+# Se o servidor cair com comandos na fila, eles voltam para a fila na próxima
+# vez que a planilha for usada. (Uma queda entre o salvamento e a reescrita do
+# diário faz o lote ser refeito: edições e remoções são recusadas por não
+# encontrarem mais o registro original, mas inclusões se repetem.)
+AGRUPAR = 0.3  # segundos de espera para juntar comandos seguidos
+ESPERA_SAIDA = 60  # segundos para esvaziar as filas ao encerrar o servidor
+
+_sequencia = itertools.count(1)
+
+# Chamado como ao_gravar(planilha, comando, linha) para cada comando aplicado,
+# depois que o arquivo com ele é salvo (inclusive os retomados do diário)
+ao_gravar: Callable[[str, "Comando", int], None] | None = None
+
+
+@dataclass(eq=False)
+class Comando:
+    tipo: str  # "editar", "incluir" ou "remover"
+    aba: str
+    id: int | None = None  # id estável do lançamento (ver planilhas.novos_ids)
+    linha: int | None = None  # linha do Excel (no arquivo gravado) quando o comando foi criado
+    original: dict = field(default_factory=dict)  # IDENTIFICACAO do registro como visto
+    campos: dict = field(default_factory=dict)
+    dono: str | None = None
+    seq: int = field(default_factory=lambda: next(_sequencia))  # ordem de criação
+
+
+def caminho_diario(excel_path: str) -> str:
+    return f"{excel_path}.pendentes.jsonl"
+
+
+def _para_json(val):
+    # Datas viram {"data": ...} para voltarem como datas; números do numpy, nativos
+    if isinstance(val, (date, np.datetime64)):
+        return {"data": pd.Timestamp(val).isoformat()}
+    if isinstance(val, np.generic):
+        return val.item()
+    return str(val)
+
+
+def _de_json(item: dict):
+    return pd.Timestamp(item["data"]) if item.keys() == {"data"} else item
+
+
+def _linha_diario(comando: Comando) -> str:
+    item = {k: v for k, v in asdict(comando).items() if k != "seq"}
+    return json.dumps(item, default=_para_json, ensure_ascii=False) + "\n"
+
+
+class _Fila:
+    def __init__(self, excel_path: str):
+        self.excel_path = excel_path
+        self.fila: queue.Queue[Comando] = queue.Queue()
+        self.pendentes: list[Comando] = []
+        self.erros: dict[str | None, list[str]] = {}
+        self.gravados = 0
+        self.ultima_gravacao: datetime | None = None
+        # Linhas das inclusões do último lote gravado, {id: (aba, linha)}, válidas
+        # enquanto o arquivo tiver a assinatura registrada: localizam os
+        # lançamentos incluídos mesmo que o cache da aba tenha sido relido
+        self.incluidas: tuple[tuple[int, int] | None, dict[int, tuple[str, int]]] = (None, {})
+        self.cond = threading.Condition()
+        for comando in self._retomar():
+            self.pendentes.append(comando)
+            self.fila.put(comando)
+        threading.Thread(target=self._executar, name=f"gravacao:{excel_path}", daemon=True).start()
+
+    def _retomar(self) -> list[Comando]:
+        # Comandos que ficaram no diário de uma execução anterior. Os ids eram
+        # dos dados carregados naquele processo: as inclusões recebem ids novos
+        # (e as edições delas os acompanham); os demais comandos são localizados
+        # pela linha e pelo registro original.
+        caminho = caminho_diario(self.excel_path)
+        if not os.path.isfile(caminho):
+            return []
+        comandos = []
+        ids = {}
+        with open(caminho, encoding="utf-8") as f:
+            for linha in f:
+                try:
+                    item = json.loads(linha, object_hook=_de_json)
+                except json.JSONDecodeError:
+                    continue  # linha truncada por uma queda no meio da escrita
+                if item["tipo"] == "incluir":
+                    ids[item["id"]] = novos_ids(1)[0]
+                item["id"] = ids.get(item["id"])
+                comandos.append(Comando(**item))
+        return comandos
+
+    def enfileirar(self, comando: Comando) -> None:
+        with self.cond:
+            with open(caminho_diario(self.excel_path), "a", encoding="utf-8") as f:
+                f.write(_linha_diario(comando))
+                f.flush()
+                os.fsync(f.fileno())
+            self.pendentes.append(comando)
+        self.fila.put(comando)
+
+    def _reescrever_diario(self) -> None:
+        # Só os comandos ainda pendentes; sem nenhum, o diário é apagado.
+        # Chamado com self.cond adquirido.
+        caminho = caminho_diario(self.excel_path)
+        if not self.pendentes:
+            if os.path.exists(caminho):
+                os.remove(caminho)
+            return
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(caminho)), suffix=".tmp")
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            f.writelines(_linha_diario(c) for c in self.pendentes)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, caminho)
+
+    def _executar(self) -> None:
+        while True:
+            lote = [self.fila.get()]
+            time.sleep(AGRUPAR)
+            while True:
+                try:
+                    lote.append(self.fila.get_nowait())
+                except queue.Empty:
+                    break
+
+            recusados = []
+            try:
+                recusados = self._gravar(lote)
+            except Exception as e:
+                recusados = [(c, f"Erro ao gravar na planilha: {e}") for c in lote]
+            finally:
+                self._concluir(lote, recusados)
+
+    def _concluir(self, lote: list[Comando], recusados: list[tuple[Comando, str]]) -> None:
+        # Tira o lote da fila; chamado assim que o arquivo é substituído, para
+        # que o modelo em memória não aplique de novo o que já está gravado
+        with self.cond:
+            if lote[0] not in self.pendentes:
+                return
+            for c, motivo in recusados:
+                self.erros.setdefault(c.dono, []).append(motivo)
+            self.gravados += len(lote) - len(recusados)
+            self.ultima_gravacao = datetime.now()
+            for c in lote:
+                self.pendentes.remove(c)
+            self._reescrever_diario()
+            self.cond.notify_all()
+
+    def _gravar(self, lote: list[Comando]) -> list[tuple[Comando, str]]:
+        # Aplica o lote em ordem num único salvamento; devolve os recusados
+        recusados = []
+        proximas = {}
+        alteracoes = {}
+        removidas: dict[str, list[int]] = {}
+        # {id: (aba, linha, remoções da aba até então)} das inclusões deste lote:
+        # um lançamento incluído ainda não tem linha no cache até o salvamento
+        incluidas: dict[int, tuple[str, int, int]] = {}
+        gravados: list[tuple[Comando, int]] = []  # comandos aplicados e a linha de cada um
+        abas = list(dict.fromkeys(c.aba for c in lote))
+
+        def salvo() -> None:
+            self.incluidas = (assinatura_arquivo(self.excel_path), {
+                id_: (aba, _descontar(linha, removidas.get(aba, [])[n:]))
+                for id_, (aba, linha, n) in incluidas.items()
+            })
+            for c, linha in gravados:
+                if ao_gravar is None:
+                    break
+                try:
+                    ao_gravar(self.excel_path, c, linha)
+                except Exception as e:
+                    with self.cond:
+                        self.erros.setdefault(c.dono, []).append(f"A alteração foi gravada, mas houve um erro depois do salvamento: {e}")
+            self._concluir(lote, recusados)
+
+        with gravacao.editar_planilha(self.excel_path, abas, ao_salvar=salvo, alteracoes=alteracoes) as wb:
+            for c in lote:
+                if c.tipo == "incluir":
+                    gravacao.incluir_registros(
+                        wb, self.excel_path, [(c.aba, {**c.campos, "id": c.id})], proximas, alteracoes
+                    )
+                    if c.id is not None:
+                        incluidas[c.id] = (c.aba, proximas[c.aba] - 1, len(removidas.get(c.aba, [])))
+                    gravados.append((c, proximas[c.aba] - 1))
+                    continue
+                if c.aba not in wb.sheetnames:
+                    recusados.append((c, f"A aba '{c.aba}' não existe no arquivo."))
+                    continue
+
+                ws = wb[c.aba]
+                col_pos = gravacao.posicoes_colunas(ws)
+                esperada = self._linha_esperada(c, removidas, incluidas)
+                linha = gravacao.localizar_linha(ws, esperada, c.original, col_pos)
+                if linha is None:
+                    recusados.append((c, (
+                        f"O registro de {c.original.get('fornecedor')} (aba {c.aba}) foi alterado ou "
+                        "removido por outro usuário; a alteração não foi gravada."
+                    )))
+                    continue
+
+                gravados.append((c, linha))
+                if c.tipo == "editar":
+                    celulas = gravacao.gravar_campos(ws, linha, c.campos, col_pos)
+                    gravacao.registrar_alteracao(alteracoes, c.aba, "editar", linha, celulas)
+                else:
+                    ws.delete_rows(linha)
+                    gravacao.registrar_alteracao(alteracoes, c.aba, "remover", linha)
+                    removidas.setdefault(c.aba, []).append(linha)
+                    # a remoção sobe as linhas seguintes: a próxima livre também sobe
+                    proxima = proximas.get(c.aba) or proxima_linha(self.excel_path, c.aba)
+                    if proxima and linha < proxima:
+                        proximas[c.aba] = max(proxima - 1, HEADER_ROW + 1)
+
+        for aba, linha in proximas.items():
+            registrar_proxima_linha(self.excel_path, aba, linha)
+        return recusados
+
+    def _linha_esperada(
+        self, c: Comando, removidas: dict[str, list[int]], incluidas: dict[int, tuple[str, int, int]]
+    ) -> int | None:
+        # Linha atual pelo índice de linhas da aba, descontando as remoções já
+        # feitas neste lote (o índice só é atualizado depois do salvamento).
+        # Lançamentos incluídos ainda na fila não têm linha: ela vem da
+        # inclusão, feita neste lote ou no anterior.
+        if c.id in incluidas:
+            aba, linha, n = incluidas[c.id]
+            return _descontar(linha, removidas.get(aba, [])[n:])
+        linha = linha_do_id(self.excel_path, c.aba, c.id) if c.id is not None else None
+        if linha is None:
+            assinatura, anteriores = self.incluidas
+            if c.id in anteriores and assinatura == assinatura_arquivo(self.excel_path):
+                linha = anteriores[c.id][1]
+        if linha is None:
+            linha = c.linha
+        if linha is None:
+            return None
+        return _descontar(linha, removidas.get(c.aba, []))
+
+    def esperar(self, espera: float | None = None) -> bool:
+        with self.cond:
+            return self.cond.wait_for(lambda: not self.pendentes, timeout=espera)
+
+
+def _descontar(linha: int, removidas: list[int]) -> int | None:
+    # Linha depois das remoções feitas em ordem; None se a própria foi removida
+    for removida in removidas:
+        if removida < linha:
+            linha -= 1
+        elif removida == linha:
+            return None
+    return linha
+
+
+_filas: dict[str, _Fila] = {}
+_filas_lock = threading.Lock()
+
+
+def _fila(excel_path: str) -> _Fila:
+    with _filas_lock:
+        if excel_path not in _filas:
+            _filas[excel_path] = _Fila(excel_path)
+        return _filas[excel_path]
+
+
+def _existente(excel_path: str) -> _Fila | None:
+    # A fila da planilha, criada também quando há comandos no diário de uma
+    # execução anterior (para que voltem a aparecer e sejam gravados)
+    fila = _filas.get(excel_path)
+    if fila is None and os.path.isfile(caminho_diario(excel_path)):
+        fila = _fila(excel_path)
+    return fila
+
+
+def enfileirar(excel_path: str, comando: Comando) -> None:
+    _fila(excel_path).enfileirar(comando)
+
+
+def pendentes(excel_path: str, sheet_name: str | None = None) -> list[Comando]:
+    fila = _existente(excel_path)
+    if fila is None:
+        return []
+    with fila.cond:
+        return [
+            c for c in fila.pendentes
+            if sheet_name is None or chave_aba(c.aba) == chave_aba(sheet_name)
+        ]
+
+
+def situacao(excel_path: str, dono: str | None) -> tuple[int, datetime | None, list[str]]:
+    # (comandos pendentes, hora da última gravação, erros do usuário ainda não exibidos)
+    fila = _existente(excel_path)
+    if fila is None:
+        return 0, None, []
+    with fila.cond:
+        return len(fila.pendentes), fila.ultima_gravacao, fila.erros.pop(dono, [])
+
+
+def esperar(excel_path: str, espera: float | None = None) -> bool:
+    fila = _existente(excel_path)
+    return fila.esperar(espera) if fila else True
+
+
+def _localizar(df: pd.DataFrame, id_, original: dict) -> int | None:
+    # Pelo id estável; sem id (ou id desconhecido), pela identificação do registro
+    if id_ is not None and "id" in df.columns:
+        encontrados = df.index[df["id"] == id_]
+        if len(encontrados):
+            return encontrados[0]
+    campos = [c for c in gravacao.IDENTIFICACAO if c in original and c in df.columns]
+    candidatos = [i for i in df.index if not diferencas(df.loc[i], {c: original[c] for c in campos})]
+    return candidatos[0] if len(candidatos) == 1 else None
+
+
+def _atribuir(df: pd.DataFrame, i: int, campo: str, val) -> None:
+    if campo == "vencimento":
+        val = pd.to_datetime(val, errors="coerce")
+    elif campo == "valor":
+        val = pd.to_numeric(val, errors="coerce")
+    if campo not in df.columns:
+        df[campo] = pd.Series(None, index=df.index, dtype=object)
+    try:
+        df.at[i, campo] = val
+    except (TypeError, ValueError):
+        df[campo] = df[campo].astype(object)
+        df.at[i, campo] = val
+
+
+def aplicar_pendentes(excel_path: str, sheet_name: str, df: pd.DataFrame) -> pd.DataFrame:
+    # Modelo em memória: os dados carregados da planilha mais os comandos
+    # ainda não gravados, na ordem em que foram enfileirados. A coluna "linha"
+    # continua sendo a do arquivo gravado (a remoção só sobe as linhas quando é
+    # gravada); incluídos ainda não têm linha.
+    df = df.copy()
+    for c in pendentes(excel_path, sheet_name):
+        if c.tipo == "incluir":
+            i = len(df)
+            df = df.reindex(range(i + 1))
+            for campo, val in {**c.campos, "id": c.id}.items():
+                _atribuir(df, i, campo, val)
+            continue
+
+        i = _localizar(df, c.id, c.original)
+        if i is None:
+            continue
+        if c.tipo == "editar":
+            for campo, val in c.campos.items():
+                _atribuir(df, i, campo, val)
+        else:
+            df = df.drop(index=i).reset_index(drop=True)
+    return df
+
+
+@atexit.register
+def _esvaziar_filas() -> None:
+    # Ao encerrar o servidor, espera as gravações pendentes terminarem
+    limite = time.monotonic() + ESPERA_SAIDA
+    for fila in list(_filas.values()):
+        fila.esperar(max(0.0, limite - time.monotonic()))
@@ -0,0 +1,95 @@
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+# Fluxo de caixa projetado: saídas (contas a pagar em aberto ou em atraso) e
+# entradas (contas a receber em aberto ou em atraso) somadas por dia de
+# vencimento. Cada aba tem em memória os seus totais por dia (refeitos só
+# quando a aba muda); a projeção junta esses totais num calendário de N dias e
+# acumula o saldo com cumsum, sem percorrer os lançamentos.
+HORIZONTE = 90  # dias
+HORIZONTES = [30, 60, 90, 180]
+ABERTOS = {False: ("Em Aberto", "Em Atraso"), True: ("A Receber", "Em Atraso")}
+COLUNAS = ["data", "entradas", "saidas", "liquido", "saldo"]
+
+# (planilha, aba) -> (chave de validade, totais por vencimento da aba)
+_vencimentos: dict[tuple[str, str], tuple[object, pd.DataFrame]] = {}
+_lock = threading.Lock()
+
+
+def vencimentos_aba(df: pd.DataFrame, is_receber: bool) -> pd.DataFrame:
+    # Total em aberto por dia de vencimento (lançamentos sem data ficam fora)
+    if df.empty:
+        return pd.DataFrame({"vencimento": pd.Series(dtype="datetime64[ns]"), "total": pd.Series(dtype=float)})
+
+    aberto = df["status_pagamento"].isin(ABERTOS[is_receber])
+    vencimento = df["vencimento"]
+    if not pd.api.types.is_datetime64_any_dtype(vencimento):
+        vencimento = pd.to_datetime(vencimento, errors="coerce")
+    base = pd.DataFrame({
+        "vencimento": vencimento.dt.normalize(),
+        "total": pd.to_numeric(df["valor"], errors="coerce"),
+    })[aberto.to_numpy()].dropna()
+    return base.groupby("vencimento", sort=False)["total"].sum().reset_index()
+
+
+def vencimentos(excel_path: str, sheet_name: str, chave, carregar, is_receber: bool) -> pd.DataFrame:
+    # Devolve os totais da aba; carregar() só é chamado quando a chave mudou
+    with _lock:
+        em_cache = _vencimentos.get((excel_path, sheet_name))
+        if em_cache and em_cache[0] == chave:
+            return em_cache[1]
+
+    totais = vencimentos_aba(carregar(), is_receber)
+    with _lock:
+        _vencimentos[(excel_path, sheet_name)] = (chave, totais)
+    return totais
+
+
+def descartar(excel_path: str, sheet_name: str) -> None:
+    # Chamada pelas rotinas de gravação após alterar uma aba
+    with _lock:
+        _vencimentos.pop((excel_path, sheet_name), None)
+
+
+def _por_dia(partes: list[pd.DataFrame], inicio: pd.Timestamp, dias: int) -> np.ndarray:
+    # Soma de cada dia do calendário; vencidos entram no primeiro dia
+    partes = [p for p in partes if not p.empty]
+    if not partes:
+        return np.zeros(dias)
+    venc = pd.DatetimeIndex(pd.concat([p["vencimento"] for p in partes], ignore_index=True))
+    total = np.concatenate([p["total"].to_numpy(dtype=float) for p in partes])
+    dia = np.maximum((venc - inicio).days.to_numpy(), 0)
+    dentro = dia < dias
+    return np.bincount(dia[dentro], weights=total[dentro], minlength=dias)
+
+
+def projetar(
+    saidas: list[pd.DataFrame], entradas: list[pd.DataFrame],
+    hoje: date | None = None, dias: int = HORIZONTE, saldo_inicial: float = 0.0
+) -> pd.DataFrame:
+    # Uma linha por dia de hoje até hoje + dias - 1, com o saldo acumulado
+    inicio = pd.Timestamp(hoje or date.today()).normalize()
+    entra = _por_dia(entradas, inicio, dias)
+    sai = _por_dia(saidas, inicio, dias)
+    liquido = entra - sai
+    return pd.DataFrame({
+        "data": pd.date_range(inicio, periods=dias, freq="D"),
+        "entradas": entra,
+        "saidas": sai,
+        "liquido": liquido,
+        "saldo": saldo_inicial + np.cumsum(liquido),
+    }, columns=COLUNAS)
+
+
+def semanal(projecao: pd.DataFrame) -> pd.DataFrame:
+    # Blocos de 7 dias a partir do primeiro dia; saldo = saldo no fim da semana
+    semana = np.arange(len(projecao)) // 7
+    return (
+        projecao.groupby(semana)
+        .agg(data=("data", "first"), entradas=("entradas", "sum"), saidas=("saidas", "sum"),
+             liquido=("liquido", "sum"), saldo=("saldo", "last"))
+        .reset_index(drop=True)
+    )
@@ -0,0 +1,123 @@
+import threading
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+# Formatação pt-BR para exibição (R$ 1.234,56 e 31/12/2025) feita por coluna
+# inteira com operações de array: nada de f-string por célula. As visões
+# formatadas de cada versão dos dados ficam em memória (LRU).
+MAX_VISOES = 32
+SEPARADORES_PLOTLY = ",."  # decimal "," e milhar "." nos gráficos
+
+_visoes: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+_ALGARISMOS = np.array(list("0123456789"), dtype="U1")
+
+
+def _digitos(numeros: np.ndarray, largura: int) -> np.ndarray:
+    # Matriz (n, largura) de caracteres com os números completados com zeros
+    # à esquerda (algarismos calculados por divisão, sem converter para str)
+    potencias = 10 ** np.arange(largura - 1, -1, -1, dtype=np.int64)
+    return _ALGARISMOS[(np.asarray(numeros, dtype=np.int64)[:, None] // potencias) % 10]
+
+
+def _juntar(matriz: np.ndarray) -> np.ndarray:
+    # Matriz de caracteres -> vetor de strings
+    return np.ascontiguousarray(matriz).view(f"U{matriz.shape[1]}").ravel()
+
+
+def moeda(valores) -> np.ndarray:
+    # "R$ 1.234,56" / "-R$ 12,00"; vazio para valores ausentes
+    v = pd.to_numeric(pd.Series(valores), errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+    n = len(v)
+    if n == 0:
+        return np.array([], dtype=str)
+    vazio = np.isnan(v)
+    centavos = np.rint(np.abs(np.where(vazio, 0.0, v)) * 100).astype(np.int64)
+    inteiro, cent = np.divmod(centavos, 100)
+
+    # Todos os grupos de milhar completados com zeros, separados por "." e
+    # depois sem os zeros/pontos à esquerda: 000.001.234 -> 1.234
+    grupos = max(1, -(-len(str(int(inteiro.max()))) // 3))
+    digitos = _digitos(inteiro, 3 * grupos)
+    com_pontos = np.full((n, 4 * grupos - 1), ".", dtype="U1")
+    for g in range(grupos):
+        com_pontos[:, 4 * g:4 * g + 3] = digitos[:, 3 * g:3 * g + 3]
+    parte_inteira = np.char.lstrip(_juntar(com_pontos), "0.")
+    parte_inteira = np.where(parte_inteira == "", "0", parte_inteira)
+
+    prefixo = np.where(v < 0, "-R$ ", "R$ ")
+    texto = np.char.add(np.char.add(prefixo, parte_inteira), ",")
+    texto = np.char.add(texto, _juntar(_digitos(cent, 2)))
+    return np.where(vazio, "", texto)
+
+
+def moeda_texto(valor) -> str:
+    return str(moeda([valor])[0])
+
+
+def data(valores) -> np.ndarray:
+    # "31/12/2025"; vazio para datas ausentes ou inválidas
+    serie = pd.Series(valores)
+    if not pd.api.types.is_datetime64_any_dtype(serie):
+        # Abas antigas guardam algumas datas como texto
+        serie = pd.to_datetime(serie, errors="coerce", format="mixed")
+    datas = pd.DatetimeIndex(serie)
+    n = len(datas)
+    if n == 0:
+        return np.array([], dtype=str)
+    vazio = datas.isna()
+    dia = np.where(vazio, 1, datas.day)
+    mes = np.where(vazio, 1, datas.month)
+    ano = np.where(vazio, 1, datas.year)
+    matriz = np.full((n, 10), "/", dtype="U1")
+    matriz[:, 0:2] = _digitos(dia, 2)
+    matriz[:, 3:5] = _digitos(mes, 2)
+    matriz[:, 6:10] = _digitos(ano, 4)
+    return np.where(vazio, "", _juntar(matriz))
+
+
+MESES = np.array(["jan", "fev", "mar", "abr", "mai", "jun", "jul", "ago", "set", "out", "nov", "dez"])
+
+
+def mes_ano(periodos) -> np.ndarray:
+    # Períodos mensais como "jan/2025"
+    periodos = pd.PeriodIndex(periodos, freq="M")
+    return np.char.add(np.char.add(MESES[periodos.month - 1], "/"), _juntar(_digitos(periodos.year, 4)))
+
+
+def formatar(df: pd.DataFrame, moedas=("valor",), datas=("vencimento", "data_nf"), textos=()) -> pd.DataFrame:
+    # Cópia do DataFrame com as colunas de moeda e data já como texto
+    # (só para exibição: sem os attrs de versão dos dados)
+    df = df.copy()
+    df.attrs = {}
+    for col in moedas:
+        if col in df:
+            df[col] = moeda(df[col])
+    for col in datas:
+        if col in df:
+            df[col] = data(df[col])
+    # Colunas com tipos misturados (ex.: OS numérica ou texto) viram texto
+    for col in textos:
+        if col in df:
+            df[col] = df[col].astype(object).where(df[col].notna(), "").astype(str)
+    return df
+
+
+def visao(chave, df: pd.DataFrame, colunas: list[str]) -> pd.DataFrame:
+    # Visão formatada das colunas, calculada uma vez por chave (versão dos dados)
+    chave = (chave, tuple(colunas))
+    with _lock:
+        if chave in _visoes:
+            _visoes.move_to_end(chave)
+            return _visoes[chave]
+
+    formatada = formatar(df[colunas])
+    with _lock:
+        _visoes[chave] = formatada
+        while len(_visoes) > MAX_VISOES:
+            _visoes.popitem(last=False)
+    return formatada
@@ -0,0 +1,193 @@
+import threading
+from collections import OrderedDict
+
+import pandas as pd
+
+import formatacao
+
+# Gráficos do Dashboard. O plotly só é importado quando um gráfico é montado
+# (a tela de login e as páginas de lançamentos não desenham gráficos), e as
+# figuras montadas ficam em memória por versão dos dados (LRU): um rerun sem
+# mudança nos dados não monta a figura de novo.
+MAX_FIGURAS = 32
+
+_figuras: OrderedDict = OrderedDict()
+_lock = threading.Lock()
+
+
+def figura(livros: tuple, chave, montar):
+    # Figura dos livros para a chave (versão dos dados + gráfico), montada uma
+    # vez por chave
+    chave = (livros, chave)
+    with _lock:
+        if chave in _figuras:
+            _figuras.move_to_end(chave)
+            return _figuras[chave]
+
+    fig = montar()
+    with _lock:
+        _figuras[chave] = fig
+        while len(_figuras) > MAX_FIGURAS:
+            _figuras.popitem(last=False)
+    return fig
+
+
+def descartar(excel_path: str) -> None:
+    # Chamada pelas rotinas de gravação: figuras de painéis que usam o livro
+    with _lock:
+        for chave in [k for k in _figuras if excel_path in k[0]]:
+            _figuras.pop(chave, None)
+
+
+def status(status_counts: pd.DataFrame):
+    import plotly.express as px
+
+    fig_status = px.pie(
+        status_counts,
+        values="contagem",
+        names="status",
+        hole=0.4,
+        color_discrete_sequence=px.colors.qualitative.Pastel
+    )
+    fig_status.update_traces(
+        textposition="inside",
+        textinfo="percent+label",
+        hovertemplate="<b>%{label}</b><br>%{value} contas (%{percent})"
+    )
+    fig_status.update_layout(
+        separators=formatacao.SEPARADORES_PLOTLY,
+        showlegend=False,
+        margin=dict(l=20, r=20, t=30, b=20),
+        height=350
+    )
+    return fig_status
+
+
+def evolucao(monthly_group: pd.DataFrame, rotulo_quitados: str):
+    import plotly.graph_objects as go
+
+    fig_evolucao = go.Figure()
+    fig_evolucao.add_trace(go.Scatter(
+        x=monthly_group["mes_ano_str"],
+        y=monthly_group["total_mes"],
+        name="Total",
+        line=dict(color="#6e8efb", width=3),
+        mode="lines+markers",
+        hovertemplate="<b>%{x}</b><br>Total: R$ %{y:,.2f}<extra></extra>"
+    ))
+    fig_evolucao.add_trace(go.Scatter(
+        x=monthly_group["mes_ano_str"],
+        y=monthly_group["quitados_mes"],
+        name=rotulo_quitados,
+        line=dict(color="#00CC96", width=2),
+        mode="lines+markers",
+        hovertemplate=f"<b>%{{x}}</b><br>{rotulo_quitados}: R$ %{{y:,.2f}}<extra></extra>"
+    ))
+    fig_evolucao.add_trace(go.Scatter(
+        x=monthly_group["mes_ano_str"],
+        y=monthly_group["pendentes_mes"],
+        name="Pendentes",
+        line=dict(color="#EF553B", width=2),
+        mode="lines+markers",
+        hovertemplate="<b>%{x}</b><br>Pendentes: R$ %{y:,.2f}<extra></extra>"
+    ))
+
+    fig_evolucao.update_layout(
+        separators=formatacao.SEPARADORES_PLOTLY,
+        hovermode="x unified",
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        margin=dict(l=20, r=20, t=30, b=20),
+        height=400,
+        xaxis_title="Mês/Ano",
+        yaxis_title="Valor (R$)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig_evolucao
+
+
+def atrasos(por_faixa: pd.DataFrame):
+    import plotly.express as px
+
+    fig_atrasos = px.bar(
+        por_faixa,
+        x="faixa",
+        y="total",
+        color="faixa",
+        text=formatacao.moeda(por_faixa["total"]),
+        color_discrete_sequence=["#F9E79F", "#F5B041", "#EB984E", "#E74C3C"],
+        labels={"faixa": "Dias em atraso", "total": "Valor (R$)", "contagem": "Nº Contas"},
+        hover_data={"contagem": True, "faixa": False}
+    )
+    fig_atrasos.update_layout(
+        separators=formatacao.SEPARADORES_PLOTLY,
+        showlegend=False,
+        margin=dict(l=20, r=20, t=30, b=20),
+        height=350,
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig_atrasos
+
+
+def top(top_10: pd.DataFrame):
+    import plotly.express as px
+
+    fig_top = px.bar(
+        top_10,
+        x="total",
+        y="fornecedor",
+        orientation="h",
+        color="contagem",
+        color_continuous_scale="Blues",
+        labels={"total": "Valor Total (R$)", "fornecedor": "", "contagem": "Nº Contas"},
+        hover_data={"contagem": True}
+    )
+    fig_top.update_layout(
+        separators=formatacao.SEPARADORES_PLOTLY,
+        height=500,
+        xaxis_title="Valor Total (R$)",
+        yaxis_title="",
+        yaxis={"categoryorder": "total ascending"},
+        margin=dict(l=20, r=20, t=30, b=20),
+        coloraxis_colorbar=dict(title="Nº Contas")
+    )
+    return fig_top
+
+
+def fluxo(projecao: pd.DataFrame, semanal: bool):
+    import plotly.graph_objects as go
+
+    datas = formatacao.data(projecao["data"])
+    fig_fluxo = go.Figure()
+    fig_fluxo.add_trace(go.Bar(
+        x=datas, y=projecao["entradas"], name="Entradas", marker_color="#00CC96",
+        hovertemplate="<b>%{x}</b><br>Entradas: R$ %{y:,.2f}<extra></extra>"
+    ))
+    fig_fluxo.add_trace(go.Bar(
+        x=datas, y=-projecao["saidas"], name="Saídas", marker_color="#EF553B",
+        hovertemplate="<b>%{x}</b><br>Saídas: R$ %{y:,.2f}<extra></extra>"
+    ))
+    fig_fluxo.add_trace(go.Scatter(
+        x=datas, y=projecao["saldo"], name="Saldo", line=dict(color="#6e8efb", width=3), mode="lines",
+        hovertemplate="<b>%{x}</b><br>Saldo: R$ %{y:,.2f}<extra></extra>"
+    ))
+    fig_fluxo.update_layout(
+        separators=formatacao.SEPARADORES_PLOTLY,
+        barmode="relative",
+        hovermode="x unified",
+        legend=dict(orientation="h", yanchor="bottom", y=1.02, xanchor="right", x=1),
+        margin=dict(l=20, r=20, t=30, b=20),
+        height=400,
+        xaxis_title="Semana a partir de" if semanal else "Dia",
+        yaxis_title="Valor (R$)",
+        plot_bgcolor="rgba(0,0,0,0)",
+        paper_bgcolor="rgba(0,0,0,0)"
+    )
+    return fig_fluxo
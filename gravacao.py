@@ -0,0 +1,248 @@
+import os
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+
+import pandas as pd
+from openpyxl import load_workbook
+
+import esquema
+from planilhas import (
+    HEADER_ROW, assinatura_arquivo, diferencas, invalidar_abas, proxima_linha, versao_aba
+)
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Coordenador de escritas nas planilhas: serializa as gravações de cada
+# workbook (entre sessões e entre processos) com um arquivo de lock, rejeita
+# edições feitas sobre uma versão antiga da aba e salva de forma atômica.
+ESPERA_LOCK = 30  # segundos
+
+# Campos que identificam um lançamento ao localizar a linha de uma edição/remoção
+IDENTIFICACAO = ["fornecedor", "os", "vencimento", "valor"]
+
+# Valor de célula que não deve ser gravado (ex.: data inválida)
+IGNORAR = object()
+
+_locks: dict[str, threading.Lock] = {}
+_locks_lock = threading.Lock()
+
+
+class VersaoDesatualizada(Exception):
+    pass
+
+
+def caminho_lock(excel_path: str) -> str:
+    return f"{excel_path}.lock"
+
+
+def _lock_local(excel_path: str) -> threading.Lock:
+    with _locks_lock:
+        return _locks.setdefault(os.path.abspath(excel_path), threading.Lock())
+
+
+def _travar(fd: int) -> bool:
+    try:
+        if fcntl:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except OSError:
+        return False
+
+
+def _destravar(fd: int) -> None:
+    if fcntl:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def bloqueio(excel_path: str, espera: float = ESPERA_LOCK):
+    # Lock exclusivo do workbook: threading.Lock para as sessões deste processo
+    # e lock de arquivo (<planilha>.lock) para outros processos
+    local = _lock_local(excel_path)
+    if not local.acquire(timeout=espera):
+        raise TimeoutError(f"A planilha '{excel_path}' está sendo gravada por outro usuário.")
+    try:
+        fd = os.open(caminho_lock(excel_path), os.O_RDWR | os.O_CREAT, 0o666)
+        try:
+            limite = time.monotonic() + espera
+            while not _travar(fd):
+                if time.monotonic() > limite:
+                    raise TimeoutError(f"A planilha '{excel_path}' está sendo gravada por outro usuário.")
+                time.sleep(0.05)
+            try:
+                yield
+            finally:
+                _destravar(fd)
+        finally:
+            os.close(fd)
+    finally:
+        local.release()
+
+
+def salvar_atomico(wb, excel_path: str) -> None:
+    # Grava num temporário da mesma pasta e troca pelo original com os.replace:
+    # uma queda no meio do salvamento nunca deixa o .xlsx pela metade
+    pasta = os.path.dirname(os.path.abspath(excel_path))
+    fd, temporario = tempfile.mkstemp(prefix=".~", suffix=".xlsx", dir=pasta)
+    try:
+        with os.fdopen(fd, "wb") as f:
+            wb.save(f)
+            f.flush()
+            os.fsync(f.fileno())
+        if os.path.exists(excel_path):
+            os.chmod(temporario, os.stat(excel_path).st_mode)
+        os.replace(temporario, excel_path)
+    except BaseException:
+        if os.path.exists(temporario):
+            os.remove(temporario)
+        raise
+
+
+@contextmanager
+def editar_planilha(
+    excel_path: str, abas: list[str], versao: tuple[int, int] | None = None,
+    ao_salvar=None, alteracoes: dict | None = None
+):
+    # Abre o workbook sob o lock e, ao final do bloco, salva e invalida o cache
+    # das abas alteradas ainda com o lock (nenhuma gravação alheia se intercala).
+    # Com `versao` (a versão da aba quando os dados foram carregados), recusa a
+    # gravação se a aba mudou desde então: outro usuário salvou ou o arquivo
+    # foi editado fora do app. ao_salvar() é chamado logo após o arquivo ser
+    # substituído. Com `alteracoes` ({aba: [...]}, preenchido pelo bloco via
+    # gravar_campos/remover_linha/incluir_registros) o cache das abas é
+    # atualizado no lugar em vez de relido. ao_salvar() vem antes: os comandos
+    # da fila deixam de ser aplicados sobre um cache que ainda não os contém
+    # (quem ler nesse intervalo relê o arquivo novo), e invalidar_abas, que
+    # recebe a assinatura anterior ao salvamento, não reaplica as alterações
+    # a um cache que já foi relido.
+    with bloqueio(excel_path):
+        if versao is not None and versao_aba(excel_path, abas[0]) != versao:
+            raise VersaoDesatualizada(
+                f"A aba '{abas[0]}' foi alterada por outro usuário. Recarregue a página e refaça a alteração."
+            )
+        antes = assinatura_arquivo(excel_path)
+        wb = load_workbook(excel_path)
+        existentes = set(wb.sheetnames)
+        yield wb
+        salvar_atomico(wb, excel_path)
+        if ao_salvar:
+            ao_salvar()
+        invalidar_abas(
+            excel_path, abas, novas={s for s in abas if s not in existentes},
+            alteracoes=alteracoes, antes=antes,
+        )
+
+
+def posicoes_colunas(ws, header_row: int = HEADER_ROW) -> dict:
+    # {campo: coluna} a partir da coluna B; campos sem coluna ficam com None
+    titulos = next(ws.iter_rows(min_row=header_row, max_row=header_row, min_col=2, values_only=True), ())
+    mapa = esquema.compilar(titulos)
+    return {key: (mapa[key] + 2 if key in mapa else None) for key in esquema.FIELD_MAP}
+
+
+def valor_celula(key: str, val):
+    if key in ("data_nf", "vencimento"):
+        try:
+            dt = pd.to_datetime(val, errors="coerce")
+            return dt.to_pydatetime() if pd.notna(dt) else IGNORAR
+        except Exception:
+            return IGNORAR
+    elif key == "valor":
+        try:
+            return float(val)
+        except Exception:
+            return None
+    return val
+
+
+def gravar_campos(ws, excel_row: int, campos: dict, col_pos: dict) -> dict:
+    # Devolve as células gravadas ({coluna: valor}) para o registro de alterações
+    celulas = {}
+    for key, val in campos.items():
+        col = col_pos.get(key)
+        # "Situação" é fórmula na planilha e não é gravada
+        if not col or key == "situacao":
+            continue
+        val = valor_celula(key, val)
+        if val is not IGNORAR:
+            ws.cell(row=excel_row, column=col, value=val)
+            celulas[col] = val
+    return celulas
+
+
+def registrar_alteracao(alteracoes: dict | None, aba: str, tipo: str, linha: int, celulas=None, id_=None) -> None:
+    if alteracoes is not None:
+        alteracoes.setdefault(aba, []).append((tipo, linha, celulas or {}, id_))
+
+
+def _confere(ws, excel_row: int, col_pos: dict, original: dict) -> bool:
+    atual = {
+        c: ws.cell(row=excel_row, column=col_pos[c]).value
+        for c in IDENTIFICACAO if col_pos.get(c) and c in original
+    }
+    return bool(atual) and not diferencas(atual, {c: original[c] for c in atual})
+
+
+def localizar_linha(ws, esperada: int | None, original: dict, col_pos: dict) -> int | None:
+    # Linha do lançamento na planilha: a linha esperada (do índice de linhas da
+    # aba) se ainda contiver o mesmo registro; senão, a única linha que o
+    # contenha. None quando o registro foi alterado ou removido por outro usuário.
+    if esperada and _confere(ws, esperada, col_pos, original):
+        return esperada
+    candidatas = [
+        linha for linha in range(HEADER_ROW + 1, ws.max_row + 1)
+        if _confere(ws, linha, col_pos, original)
+    ]
+    return candidatas[0] if len(candidatas) == 1 else None
+
+
+def incluir_registros(
+    wb, excel_path: str, entries: list[tuple[str, dict]],
+    proximas: dict | None = None, alteracoes: dict | None = None
+) -> dict:
+    # Escreve os lançamentos (aba, registro) nas próximas linhas livres; retorna
+    # a próxima linha livre de cada aba para registrar_proxima_linha. O "id" do
+    # registro, se houver, passa a identificar a nova linha no cache.
+    proximas = {} if proximas is None else proximas
+    col_pos_abas = {}
+    novas_abas = set()
+
+    for sheet_name, record in entries:
+        if sheet_name not in wb.sheetnames:
+            numeric = [s for s in wb.sheetnames if s.isdigit()]
+            template_ws = wb[numeric[0]] if numeric else wb[wb.sheetnames[0]]
+            ws = wb.copy_worksheet(template_ws)
+            ws.title = sheet_name
+            novas_abas.add(sheet_name)
+        ws = wb[sheet_name]
+
+        if sheet_name not in col_pos_abas:
+            col_pos_abas[sheet_name] = posicoes_colunas(ws)
+        col_pos = col_pos_abas[sheet_name]
+        col_forn = col_pos.get("fornecedor") or 2
+
+        # próxima linha vazia com base no fornecedor/cliente: usa a posição
+        # registrada na última gravação e só confere as linhas seguintes
+        next_row = proximas.get(sheet_name)
+        if next_row is None and sheet_name not in novas_abas:
+            next_row = proxima_linha(excel_path, sheet_name)
+        next_row = next_row or HEADER_ROW + 1
+        while ws.cell(row=next_row, column=col_forn).value:
+            next_row += 1
+
+        celulas = gravar_campos(ws, next_row, {key: record.get(key, "") for key in col_pos}, col_pos)
+        registrar_alteracao(alteracoes, sheet_name, "incluir", next_row, celulas, record.get("id"))
+        proximas[sheet_name] = next_row + 1
+
+    return proximas
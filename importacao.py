@@ -0,0 +1,210 @@
+import codecs
+import csv
+import io
+import re
+from datetime import date
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+import esquema
+from formatacao import moeda_texto
+
+# Importação em massa de lançamentos a partir de extratos (CSV, OFX ou XLSX).
+# As colunas são reconhecidas como nas planilhas do app (esquema.compilar).
+
+FORMATOS = ["csv", "ofx", "xlsx"]
+CHUNK_CSV = 5000
+# Quantas linhas do início de um XLSX são examinadas em busca do cabeçalho
+_LINHAS_CABECALHO = 20
+
+_OFX_TRANSACAO = re.compile(r"<STMTTRN>(.*?)</STMTTRN>", re.S | re.I)
+_OFX_TAG = re.compile(r"<(\w+)>([^<\r\n]*)")
+# Sem vírgula, pontos seguidos de exatamente três dígitos separam milhares: 1.234 e 12.345.678
+_MILHARES = re.compile(r"[-+]?[1-9]\d{0,2}(\.\d{3})+")
+
+
+def _campos(titulos) -> list[str | None]:
+    # Campo de cada coluna do cabeçalho; None nas que não são lidas
+    posicoes = {pos: campo for campo, pos in esquema.compilar(titulos).items()}
+    return [posicoes.get(pos) for pos in range(len(titulos))]
+
+
+def _texto(val) -> str:
+    if val is None or (isinstance(val, float) and pd.isna(val)):
+        return ""
+    if isinstance(val, float) and val.is_integer():
+        val = int(val)
+    return str(val).strip()
+
+
+def _valor(val) -> float | None:
+    if isinstance(val, (int, float, np.number)) and not isinstance(val, bool):
+        return None if pd.isna(val) else abs(float(val))
+    texto = _texto(val).replace("R$", "").replace(" ", "")
+    if not texto:
+        return None
+    if "," in texto:  # formato brasileiro: 1.234,56
+        texto = texto.replace(".", "").replace(",", ".")
+    elif _MILHARES.fullmatch(texto):
+        texto = texto.replace(".", "")
+    try:
+        return abs(float(texto))
+    except ValueError:
+        return None
+
+
+def _data(val) -> pd.Timestamp | None:
+    if isinstance(val, (date, np.datetime64)):
+        dt = pd.Timestamp(val)
+    else:
+        texto = _texto(val)
+        if not texto:
+            return None
+        dt = pd.to_datetime(texto, errors="coerce", dayfirst=not re.match(r"\d{4}-", texto))
+    return None if pd.isna(dt) else dt.normalize()
+
+
+def _chave(registro: dict) -> tuple:
+    # Identifica lançamentos repetidos: mesmo fornecedor, vencimento, valor e documento
+    venc = _data(registro.get("vencimento"))
+    valor = _valor(registro.get("valor"))
+    return (
+        _texto(registro.get("fornecedor")).lower(),
+        venc.date() if venc is not None else None,
+        round(valor, 2) if valor is not None else None,
+        _texto(registro.get("os")).lower(),
+    )
+
+
+def _linhas_csv(arquivo):
+    # Lê em blocos de CHUNK_CSV linhas, sem carregar o arquivo inteiro num DataFrame
+    amostra = arquivo.read(8192)
+    try:
+        texto = codecs.getincrementaldecoder("utf-8-sig")().decode(amostra, final=False)
+        encoding = "utf-8-sig"
+    except UnicodeDecodeError:
+        texto = amostra.decode("latin-1")  # extratos de bancos brasileiros
+        encoding = "latin-1"
+    try:
+        sep = csv.Sniffer().sniff(texto, delimiters=";,\t|").delimiter
+    except csv.Error:
+        sep = ";"
+
+    arquivo.seek(0)
+    leitor = io.TextIOWrapper(arquivo, encoding=encoding, newline="")
+    try:
+        for chunk in pd.read_csv(leitor, sep=sep, dtype=str, chunksize=CHUNK_CSV):
+            mapa = _campos(tuple(chunk.columns))
+            for linha in chunk.itertuples(index=False, name=None):
+                yield {campo: val for campo, val in zip(mapa, linha) if campo}
+    finally:
+        leitor.detach()
+
+
+def _linhas_xlsx(arquivo):
+    wb = load_workbook(arquivo, read_only=True, data_only=True)
+    try:
+        for ws in wb.worksheets:
+            mapa = None
+            for i, linha in enumerate(ws.iter_rows(values_only=True)):
+                if mapa is None:
+                    # Cabeçalho: primeira linha com ao menos dois títulos conhecidos
+                    if sum(isinstance(v, str) and esquema.campo_da_coluna(v) is not None for v in linha) >= 2:
+                        mapa = _campos(linha)
+                    elif i >= _LINHAS_CABECALHO:
+                        break
+                    continue
+                yield {campo: val for campo, val in zip(mapa, linha) if campo}
+    finally:
+        wb.close()
+
+
+def _linhas_ofx(arquivo, is_receber: bool):
+    # Cada <STMTTRN> vira um lançamento: débitos vão para Contas a Pagar e
+    # créditos para Contas a Receber; o que está no extrato já foi liquidado.
+    texto = arquivo.read()
+    if isinstance(texto, bytes):
+        texto = texto.decode("latin-1")
+
+    for bloco in _OFX_TRANSACAO.findall(texto):
+        campos = {tag.upper(): val.strip() for tag, val in _OFX_TAG.findall(bloco)}
+        try:
+            montante = float(campos.get("TRNAMT", "").replace(",", "."))
+        except ValueError:
+            yield {"fornecedor": campos.get("NAME") or campos.get("MEMO")}  # rejeitado adiante
+            continue
+        if (montante > 0) != is_receber:
+            continue
+
+        data = campos.get("DTPOSTED", "")[:8]
+        yield {
+            "vencimento": f"{data[:4]}-{data[4:6]}-{data[6:8]}" if len(data) == 8 else None,
+            "valor": abs(montante),
+            "fornecedor": campos.get("NAME") or campos.get("MEMO"),
+            "forma_pagamento": campos.get("MEMO") if campos.get("NAME") else campos.get("TRNTYPE"),
+            "os": campos.get("CHECKNUM") or campos.get("FITID"),
+            "estado": "Recebido" if is_receber else "Pago",
+        }
+
+
+def preparar_importacao(
+    nome_arquivo: str, arquivo, is_receber: bool, existentes: pd.DataFrame, aba_padrao: str,
+    ano: int | None = None,
+) -> tuple[list[tuple[str, dict]], list[str]]:
+    # Valida e deduplica as linhas do arquivo. Retorna as entradas (aba, registro)
+    # prontas para gravação e as mensagens das linhas descartadas. Com `ano`, o
+    # livro de destino, lançamentos que vencem em outro ano são rejeitados: a aba
+    # do mês só existe dentro do livro do próprio ano.
+    extensao = nome_arquivo.rsplit(".", 1)[-1].lower()
+    if extensao == "csv":
+        linhas = _linhas_csv(arquivo)
+    elif extensao == "ofx":
+        linhas = _linhas_ofx(arquivo, is_receber)
+    elif extensao == "xlsx":
+        linhas = _linhas_xlsx(arquivo)
+    else:
+        raise ValueError(f"Formato não suportado: .{extensao}")
+
+    vistos = {_chave(r) for r in existentes.to_dict("records")}
+    estado_padrao = "A Receber" if is_receber else "Em Aberto"
+    entradas, rejeitados = [], []
+
+    for n, bruto in enumerate(linhas, start=1):
+        if not any(_texto(v) for v in bruto.values()):
+            continue
+
+        registro = {
+            "data_nf":         _data(bruto.get("data_nf")),
+            "forma_pagamento": _texto(bruto.get("forma_pagamento")),
+            "fornecedor":      _texto(bruto.get("fornecedor")),
+            "os":              _texto(bruto.get("os")),
+            "vencimento":      _data(bruto.get("vencimento")),
+            "valor":           _valor(bruto.get("valor")),
+            "estado":          _texto(bruto.get("estado")) or estado_padrao,
+            "boleto":          _texto(bruto.get("boleto")),
+            "comprovante":     _texto(bruto.get("comprovante")),
+        }
+
+        if not registro["fornecedor"]:
+            rejeitados.append(f"Linha {n}: fornecedor/cliente em branco.")
+            continue
+        if not registro["valor"]:
+            rejeitados.append(f"Linha {n}: valor ausente ou inválido.")
+            continue
+        venc = registro["vencimento"]
+        if ano is not None and venc is not None and venc.year != ano:
+            rejeitados.append(f"Linha {n}: vencimento em {venc:%d/%m/%Y}, fora do livro de {ano}.")
+            continue
+
+        chave = _chave(registro)
+        if chave in vistos:
+            rejeitados.append(f"Linha {n}: lançamento duplicado ({registro['fornecedor']}, {moeda_texto(registro['valor'])}).")
+            continue
+        vistos.add(chave)
+
+        aba = f"{venc.month:02d}" if venc is not None else aba_padrao
+        entradas.append((aba, registro))
+
+    return entradas, rejeitados
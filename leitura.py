@@ -0,0 +1,90 @@
+import xml.etree.ElementTree as ET
+import zipfile
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+from openpyxl.cell.cell import TYPE_ERROR, TYPE_NUMERIC
+from pandas.io.parsers import TextParser
+
+# Leitura de planilhas sem carregar o workbook inteiro: os nomes das abas vêm
+# só do xl/workbook.xml e cada aba é percorrida linha a linha pelo openpyxl em
+# modo somente leitura (o XML da aba é lido em fluxo, sem estilos). A memória
+# usada fica limitada a uma aba por vez.
+
+
+def nomes_abas(excel_path: str) -> list[str]:
+    # Abas na ordem do workbook, sem abrir nenhuma delas
+    with zipfile.ZipFile(excel_path) as pacote, pacote.open("xl/workbook.xml") as xml:
+        return [el.get("name") for _, el in ET.iterparse(xml) if el.tag.rsplit("}", 1)[-1] == "sheet"]
+
+
+def _valor(cell):
+    # Mesma conversão do pandas (read_excel com openpyxl): vazio -> "",
+    # erro -> NaN, número inteiro -> int
+    if cell.value is None:
+        return ""
+    if cell.data_type == TYPE_ERROR:
+        return np.nan
+    if cell.data_type == TYPE_NUMERIC:
+        inteiro = int(cell.value)
+        return inteiro if inteiro == cell.value else float(cell.value)
+    return cell.value
+
+
+@contextmanager
+def abrir(excel_path: str):
+    # Workbook em modo somente leitura: as abas são lidas sob demanda
+    wb = load_workbook(excel_path, read_only=True, data_only=True, keep_links=False)
+    try:
+        yield wb
+    finally:
+        wb.close()
+
+
+def linhas(ws, inicio: int = 1):
+    # Gera (número da linha, valores) da linha `inicio` em diante, com as
+    # células já convertidas e sem as vazias do fim de cada linha
+    ws.reset_dimensions()  # dimensões gravadas por outros programas podem estar erradas
+    for numero, row in enumerate(ws.iter_rows(min_row=inicio), start=inicio):
+        valores = [_valor(cell) for cell in row]
+        while valores and valores[-1] == "":
+            valores.pop()
+        yield numero, valores
+
+
+def tabela(ws, cabecalho: int = 1) -> pd.DataFrame:
+    # DataFrame da aba com o cabeçalho na linha `cabecalho`, igual ao de
+    # pd.read_excel(..., skiprows=cabecalho - 1, header=0)
+    largura_acima = 0
+    dados = []
+    ultima = -1
+    for numero, valores in linhas(ws):
+        if numero < cabecalho:
+            # Linhas acima do cabeçalho só contam para a largura da tabela
+            largura_acima = max(largura_acima, len(valores))
+            continue
+        if valores:
+            ultima = len(dados)
+        dados.append(valores)
+    dados = dados[:ultima + 1]
+    if not dados:
+        return pd.DataFrame()
+
+    largura = max(largura_acima, max(len(v) for v in dados))
+    dados = [v + [""] * (largura - len(v)) for v in dados]
+    return TextParser(dados, header=0, skip_blank_lines=False).read()
+
+
+def ler_aba(excel_path: str, sheet_name: str, cabecalho: int = 1) -> pd.DataFrame:
+    # Lê só a aba pedida
+    with abrir(excel_path) as wb:
+        return tabela(wb[sheet_name], cabecalho)
+
+
+def ler_abas(excel_path: str, sheet_names: list[str], cabecalho: int = 1):
+    # Gera (aba, DataFrame) uma aba por vez, abrindo o arquivo uma única vez
+    with abrir(excel_path) as wb:
+        for sheet_name in sheet_names:
+            yield sheet_name, tabela(wb[sheet_name], cabecalho)
@@ -0,0 +1,337 @@
+import os
+import threading
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+import esquema
+import leitura
+
+# Layout das planilhas: cabeçalho na linha 8, dados a partir da linha 9
+HEADER_ROW = 8
+
+# Colunas normalizadas de um lançamento (mesmo esquema para Pagar e Receber)
+DATA_COLS = [
+    "data_nf", "forma_pagamento", "fornecedor", "os",
+    "vencimento", "valor", "estado", "situacao", "boleto", "comprovante"
+]
+
+# Cache em nível de processo (sobrevive aos reruns do Streamlit, que reexecutam
+# apenas o script principal): caminho -> (assinatura do arquivo, abas lidas)
+_cache_planilhas: dict[str, tuple[tuple[int, int], dict[str, pd.DataFrame]]] = {}
+_cache_lock = threading.Lock()
+
+# Versões usadas como chave dos caches do app. A geração do arquivo muda quando
+# ele é alterado fora do app (ou ganha uma aba nova); a versão da aba muda a
+# cada escrita feita pelo próprio app naquela aba.
+_geracoes: dict[str, int] = {}
+_assinaturas_conhecidas: dict[str, tuple[int, int]] = {}
+_versoes_aba: dict[tuple[str, str], int] = {}
+
+# Identificadores estáveis dos lançamentos: cada linha lida recebe um id que é
+# o índice do DataFrame bruto em cache. Como as gravações do app atualizam esse
+# DataFrame no lugar (ver invalidar_abas), o id acompanha a linha mesmo quando
+# linhas acima são removidas; a posição no DataFrame é a linha do Excel.
+_proximo_id = 1
+_ids_lock = threading.Lock()
+
+# Próxima linha livre de cada aba, válida enquanto o arquivo não mudar
+# (evita varrer a coluna do fornecedor a partir da linha 9 a cada inclusão)
+_proximas_linhas: dict[tuple[str, str], tuple[tuple[int, int], int]] = {}
+
+
+def assinatura_arquivo(excel_path: str) -> tuple[int, int]:
+    info = os.stat(excel_path)
+    return (info.st_mtime_ns, info.st_size)
+
+
+def mapear_abas(sheet_names: list[str]) -> dict[str, str]:
+    # Mapeia abas numéricas ("4" → "04"), ignorando o Tutorial
+    sheet_lookup = {}
+    for s in sheet_names:
+        nome = s.strip()
+        if nome.lower() != "tutorial" and nome.isdigit():
+            sheet_lookup[f"{int(nome):02d}"] = s
+    return sheet_lookup
+
+
+def chave_aba(sheet_name: str) -> str:
+    nome = sheet_name.strip()
+    return f"{int(nome):02d}" if nome.isdigit() else nome
+
+
+def novos_ids(n: int) -> range:
+    global _proximo_id
+    with _ids_lock:
+        inicio = _proximo_id
+        _proximo_id += n
+    return range(inicio, inicio + n)
+
+
+def _com_ids(bruto: pd.DataFrame) -> pd.DataFrame:
+    bruto.index = pd.Index(novos_ids(len(bruto)), name="id")
+    return bruto
+
+
+def listar_abas(excel_path: str) -> list[str]:
+    # Abas numéricas do arquivo, lidas só do xl/workbook.xml
+    return sorted(mapear_abas(leitura.nomes_abas(excel_path)))
+
+
+def ler_aba(excel_path: str, sheet_name: str, junto: tuple = ()) -> pd.DataFrame | None:
+    # Aba bruta (como lida do Excel) em cache. Só a aba pedida é lida do
+    # arquivo, em fluxo; as abas já lidas valem enquanto mtime/tamanho do
+    # arquivo não mudam. None se o arquivo não tem a aba. `junto` são as abas
+    # que quem chama vai pedir em seguida (Dashboard, busca, fluxo de caixa):
+    # se o arquivo precisar ser aberto, as que faltam são lidas na mesma abertura.
+    chave = chave_aba(sheet_name)
+    assinatura = assinatura_arquivo(excel_path)
+    with _cache_lock:
+        em_cache = _cache_planilhas.get(excel_path)
+        abas = em_cache[1] if em_cache and em_cache[0] == assinatura else {}
+        if chave in abas:
+            return abas[chave]
+
+        sheet_lookup = mapear_abas(leitura.nomes_abas(excel_path))
+        if chave not in sheet_lookup:
+            return None
+        faltam = [chave] + [
+            k for k in dict.fromkeys(chave_aba(s) for s in junto)
+            if k != chave and k in sheet_lookup and k not in abas
+        ]
+        lidas = {
+            k: _com_ids(bruto)
+            for k, (_, bruto) in zip(faltam, leitura.ler_abas(excel_path, [sheet_lookup[k] for k in faltam], HEADER_ROW))
+        }
+        _cache_planilhas[excel_path] = (assinatura, {**abas, **lidas})
+        return lidas[chave]
+
+
+def versao_arquivo(excel_path: str) -> int:
+    assinatura = assinatura_arquivo(excel_path)
+    with _cache_lock:
+        if _assinaturas_conhecidas.get(excel_path) != assinatura:
+            _geracoes[excel_path] = _geracoes.get(excel_path, 0) + 1
+            _assinaturas_conhecidas[excel_path] = assinatura
+        return _geracoes[excel_path]
+
+
+def versao_aba(excel_path: str, sheet_name: str) -> tuple[int, int]:
+    geracao = versao_arquivo(excel_path)
+    return (geracao, _versoes_aba.get((excel_path, chave_aba(sheet_name)), 0))
+
+
+def carregado(excel_path: str) -> bool:
+    with _cache_lock:
+        return excel_path in _cache_planilhas
+
+
+def geracao_arquivo(excel_path: str) -> int:
+    # Geração conhecida do arquivo, sem consultar o disco
+    with _cache_lock:
+        return _geracoes.get(excel_path, 0)
+
+
+def memoria_arquivo(excel_path: str) -> int:
+    # Bytes ocupados pelas abas do arquivo em cache (0 se não foi lido)
+    with _cache_lock:
+        em_cache = _cache_planilhas.get(excel_path)
+    if not em_cache:
+        return 0
+    return int(sum(bruto.memory_usage(deep=True).sum() for bruto in em_cache[1].values()))
+
+
+def descartar_arquivo(excel_path: str) -> None:
+    # Tira o arquivo da memória (ver catalogo.usar); a próxima leitura relê o
+    # arquivo. As versões não mudam: os dados continuam os mesmos.
+    with _cache_lock:
+        _cache_planilhas.pop(excel_path, None)
+
+
+def invalidar_abas(
+    excel_path: str, abas: list[str], novas: set[str] = frozenset(), alteracoes: dict | None = None,
+    antes: tuple[int, int] | None = None
+) -> None:
+    # Chamada logo após o app salvar o arquivo: só as abas alteradas são
+    # atualizadas, as demais continuam servidas da memória. Com `alteracoes`
+    # ({aba: o que foi gravado, célula a célula}) os DataFrames em cache são
+    # atualizados no lugar, sem reler as abas; sem elas, as abas são relidas do
+    # arquivo. `antes` é a assinatura do arquivo de que partiu a gravação: as
+    # alterações só são aplicadas a um cache com exatamente essa assinatura.
+    # `novas` são as abas criadas pela gravação.
+    assinatura = assinatura_arquivo(excel_path)
+    with _cache_lock:
+        em_cache = _cache_planilhas.pop(excel_path, None)
+        conhecida = _assinaturas_conhecidas.get(excel_path)
+        if antes is None:
+            antes = conhecida
+        for sheet_name in abas:
+            chave = chave_aba(sheet_name)
+            _versoes_aba[(excel_path, chave)] = _versoes_aba.get((excel_path, chave), 0) + 1
+        _assinaturas_conhecidas[excel_path] = assinatura
+        if conhecida not in (antes, assinatura):
+            # o arquivo mudou fora do app antes desta gravação
+            _geracoes[excel_path] = _geracoes.get(excel_path, 0) + 1
+
+        if not novas and em_cache is not None and em_cache[0] == assinatura:
+            # Uma leitura entre a substituição do arquivo e esta chamada já
+            # trouxe o arquivo novo: aplicar as alterações de novo as duplicaria
+            _cache_planilhas[excel_path] = em_cache
+            return
+        if novas or em_cache is None or em_cache[0] != antes:
+            # Estrutura mudou ou o cache não é do arquivo gravado: releitura completa
+            _geracoes[excel_path] = _geracoes.get(excel_path, 0) + 1
+            return
+
+        # Abas ainda não lidas serão lidas do arquivo novo quando pedidas
+        lidas = dict(em_cache[1])
+        sheet_lookup = None
+        for sheet_name in abas:
+            chave = chave_aba(sheet_name)
+            if chave not in lidas:
+                continue
+            if alteracoes is not None:
+                lidas[chave] = _aplicar_alteracoes(lidas[chave], alteracoes.get(sheet_name, []))
+                continue
+            if sheet_lookup is None:
+                sheet_lookup = mapear_abas(leitura.nomes_abas(excel_path))
+            lidas.pop(chave)
+            if chave in sheet_lookup:
+                lidas[chave] = _com_ids(leitura.ler_aba(excel_path, sheet_lookup[chave], HEADER_ROW))
+        _cache_planilhas[excel_path] = (assinatura, lidas)
+
+
+def _aplicar_alteracoes(bruto: pd.DataFrame, alteracoes: list) -> pd.DataFrame:
+    # alteracoes: (tipo, linha do Excel, {coluna do Excel: valor}, id) na ordem
+    # em que foram gravadas. A coluna N do Excel é a posição N-1 do DataFrame.
+    bruto = bruto.copy()
+    for tipo, linha, celulas, id_ in alteracoes:
+        pos = linha - HEADER_ROW - 1
+        if tipo == "remover":
+            if 0 <= pos < len(bruto):
+                bruto = bruto.drop(index=bruto.index[pos])
+            continue
+
+        if pos >= len(bruto):
+            faltam = pos - len(bruto) + 1
+            ids = list(novos_ids(faltam - 1)) + [id_ if id_ is not None else novos_ids(1)[0]]
+            vazias = pd.DataFrame(index=pd.Index(ids, name="id"), columns=bruto.columns)
+            bruto = pd.concat([bruto, vazias]) if len(bruto) else vazias
+        elif tipo == "incluir" and id_ is not None:
+            # a inclusão pode cair numa linha já lida (ex.: só com fórmulas)
+            ids = bruto.index.to_numpy(copy=True)
+            ids[pos] = id_
+            bruto.index = pd.Index(ids, name="id")
+        for col, val in celulas.items():
+            j = col - 1
+            if j >= len(bruto.columns):
+                continue
+            if val is None or (isinstance(val, str) and not val):
+                val = np.nan  # célula vazia, como o pandas lê
+            try:
+                bruto.iat[pos, j] = val
+            except (TypeError, ValueError):
+                bruto.isetitem(j, bruto.iloc[:, j].astype(object))
+                bruto.iat[pos, j] = val
+    return bruto
+
+
+def linha_do_id(excel_path: str, sheet_name: str, id_) -> int | None:
+    # Linha atual do lançamento no Excel, pelo índice da aba em cache (O(1))
+    with _cache_lock:
+        em_cache = _cache_planilhas.get(excel_path)
+    if not em_cache or em_cache[0] != assinatura_arquivo(excel_path):
+        return None
+    bruto = em_cache[1].get(chave_aba(sheet_name))
+    if bruto is None:
+        return None
+    try:
+        pos = bruto.index.get_loc(id_)
+    except KeyError:
+        return None
+    return HEADER_ROW + 1 + pos if isinstance(pos, int) else None
+
+
+def normalizar_aba(df: pd.DataFrame) -> pd.DataFrame:
+    # Renomeia colunas, descarta linhas vazias e converte tipos.
+    # Cada lançamento leva o id e a linha do Excel de onde veio.
+    ids = np.asarray(df.index)
+    linhas = HEADER_ROW + 1 + np.arange(len(df))
+    mapa = esquema.compilar(df.columns)
+    df = df.iloc[:, list(mapa.values())].set_axis(list(mapa), axis=1)
+    df.insert(0, "id", ids)
+    df.insert(1, "linha", linhas)
+
+    # Garante colunas mínimas
+    for obrig in ["fornecedor", "valor"]:
+        if obrig not in df.columns:
+            df[obrig] = pd.NA
+
+    df = df.dropna(subset=["fornecedor", "valor"], how="all").reset_index(drop=True)
+
+    # Converte tipos
+    df["vencimento"] = pd.to_datetime(df["vencimento"], errors="coerce")
+    df["valor"] = pd.to_numeric(df["valor"], errors="coerce")
+    return df
+
+
+def classificar_status(df: pd.DataFrame, is_receber: bool, hoje: date | None = None) -> pd.Series:
+    # Classificação coluna a coluna: Pago/Recebido, Em Atraso, Em Aberto/A Receber ou Sem Data
+    hoje = pd.Timestamp(hoje or date.today())
+
+    if "estado" in df.columns:
+        estado = df["estado"].astype(str).str.strip().str.lower()
+    else:
+        estado = pd.Series("", index=df.index)
+    quitado = estado.eq("recebido" if is_receber else "pago").to_numpy(dtype=bool)
+
+    vencimento = pd.to_datetime(df["vencimento"], errors="coerce").dt.normalize()
+    sem_data = vencimento.isna().to_numpy()
+    atrasado = (vencimento < hoje).to_numpy(dtype=bool)
+
+    status = np.select(
+        [quitado, sem_data, atrasado],
+        ["Recebido" if is_receber else "Pago", "Sem Data", "Em Atraso"],
+        default="A Receber" if is_receber else "Em Aberto",
+    )
+    return pd.Series(status, index=df.index, dtype=object)
+
+
+def proxima_linha(excel_path: str, sheet_name: str) -> int | None:
+    registro = _proximas_linhas.get((excel_path, chave_aba(sheet_name)))
+    if registro and registro[0] == assinatura_arquivo(excel_path):
+        return registro[1]
+    return None
+
+
+def registrar_proxima_linha(excel_path: str, sheet_name: str, linha: int) -> None:
+    # Chamada logo após salvar o arquivo, para valer com a nova assinatura
+    _proximas_linhas[(excel_path, chave_aba(sheet_name))] = (assinatura_arquivo(excel_path), linha)
+
+
+def _vazio(val) -> bool:
+    if val is None or (isinstance(val, str) and not val.strip()):
+        return True
+    try:
+        return bool(pd.isna(val))
+    except (TypeError, ValueError):
+        return False
+
+
+def _mesmo_valor(atual, novo) -> bool:
+    if _vazio(atual) or _vazio(novo):
+        return _vazio(atual) and _vazio(novo)
+    if isinstance(atual, (date, np.datetime64)) or isinstance(novo, (date, np.datetime64)):
+        return pd.to_datetime(atual, errors="coerce") == pd.to_datetime(novo, errors="coerce")
+    if isinstance(atual, (int, float, np.number)) and isinstance(novo, (int, float, np.number)):
+        return abs(float(atual) - float(novo)) < 1e-9
+    return str(atual).strip() == str(novo).strip()
+
+
+def diferencas(atual, novo: dict) -> dict:
+    # Campos de `novo` cujo valor difere do registro carregado
+    return {
+        campo: val for campo, val in novo.items()
+        if not _mesmo_valor(atual.get(campo), val)
+    }
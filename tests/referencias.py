@@ -0,0 +1,55 @@
+# Implementações antigas (linha a linha e com lambda por grupo) que as versões
+# vetorizadas substituíram, e a aba sintética usada para compará-las. Os testes
+# conferem que o resultado é o mesmo; benchmarks/suite.py mede o ganho.
+from datetime import date
+
+import numpy as np
+import pandas as pd
+
+
+def status_iterrows(df: pd.DataFrame, is_receber: bool, hoje: date) -> list[str]:
+    # Montagem de status_pagamento do load_data antigo
+    status_list = []
+    for _, row in df.iterrows():
+        estado_atual = str(row.get("estado", "")).strip().lower()
+        if estado_atual == ("recebido" if is_receber else "pago"):
+            status_list.append("Recebido" if is_receber else "Pago")
+        else:
+            data_venc = row["vencimento"].date() if pd.notna(row["vencimento"]) else None
+            if data_venc:
+                if data_venc < hoje:
+                    status_list.append("Em Atraso")
+                else:
+                    status_list.append("A Receber" if is_receber else "Em Aberto")
+            else:
+                status_list.append("Sem Data")
+    return status_list
+
+
+def evolucao_lambda(df_all: pd.DataFrame, quitado: str, coluna: str) -> pd.DataFrame:
+    # "Evolução Mensal" do Dashboard antigo
+    return (
+        df_all
+        .groupby("mes_ano")
+        .agg(**{
+            "total_mes": ("valor", "sum"),
+            coluna: ("valor", lambda x: x[df_all.loc[x.index, "status_pagamento"] == quitado].sum()),
+            "pendentes_mes": ("valor", lambda x: x[df_all.loc[x.index, "status_pagamento"] != quitado].sum()),
+        })
+        .reset_index()
+    )
+
+
+def aba_sintetica(linhas: int, is_receber: bool, hoje: date, seed: int = 42) -> pd.DataFrame:
+    # Vencimentos antes e depois de `hoje` (~5% sem data) e estados com
+    # maiúsculas, espaços e vazios, como nas planilhas
+    rng = np.random.default_rng(seed)
+    vencimento = pd.Timestamp(hoje) + pd.to_timedelta(rng.integers(-200, 200, linhas), unit="D")
+    vencimento = vencimento.where(rng.random(linhas) > 0.05)
+    estados = ["A Receber", "Recebido", " recebido ", None] if is_receber else ["Em Aberto", "Pago", " PAGO", None]
+    return pd.DataFrame({
+        "fornecedor": rng.choice(["ACME", "Beta", "Gama"], linhas),
+        "vencimento": vencimento,
+        "valor": rng.uniform(10, 5000, linhas).round(2),
+        "estado": rng.choice(np.array(estados, dtype=object), linhas),
+    })
@@ -0,0 +1,32 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from agregados import agregar_aba, evolucao_mensal
+from planilhas import classificar_status
+from referencias import aba_sintetica, evolucao_lambda
+
+HOJE = date(2025, 7, 15)
+
+
+@pytest.mark.parametrize(
+    "is_receber, quitado, coluna",
+    [(False, "Pago", "pagos_mes"), (True, "Recebido", "recebidos_mes")],
+    ids=["pagar", "receber"],
+)
+def test_evolucao_mensal_igual_a_lambda(is_receber, quitado, coluna):
+    df = aba_sintetica(20_000, is_receber, HOJE)
+    # Vencimentos espalhados por vários anos e valores vazios
+    df["vencimento"] -= pd.to_timedelta((df.index % 6) * 365, unit="D")
+    df.loc[df.index % 50 == 0, "valor"] = None
+    df["status_pagamento"] = classificar_status(df, is_receber, HOJE)
+    df["mes_ano"] = df["vencimento"].dt.to_period("M")
+    esperado = evolucao_lambda(df, quitado, coluna)
+
+    brutos = evolucao_mensal(df, quitado, coluna, valor="valor", status="status_pagamento")
+    via_resumo = evolucao_mensal(agregar_aba(df), quitado, coluna)
+
+    assert len(esperado) > 60
+    pd.testing.assert_frame_equal(brutos, esperado, check_dtype=False)
+    pd.testing.assert_frame_equal(via_resumo, esperado, check_dtype=False)
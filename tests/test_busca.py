@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import busca
+
+NOMES = [
+    "Andrade & Filhos", "Luma Elétrica", "E+H Automação", "RBME Peças", "Fundição Rio", "ACME", "Brandão",
+    "luminárias ndr", "Ótica 134.5", "",
+]
+FORMAS = ["Boleto", "PIX", "Transferência", None]
+
+
+def aba(linhas: int, seed: int) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "fornecedor": rng.choice(np.array(NOMES, dtype=object), linhas),
+        "os": rng.choice(np.array([None, 134, 1345, "OS-77"], dtype=object), linhas),
+        "forma_pagamento": rng.choice(np.array(FORMAS, dtype=object), linhas),
+        "valor": rng.uniform(10, 5000, linhas).round(2),
+        "vencimento": pd.Timestamp(2025, 1, 1) + pd.to_timedelta(rng.integers(0, 365, linhas), unit="D"),
+        "estado": rng.choice(["Pago", "Em Aberto"], linhas),
+    })
+
+
+@pytest.fixture(scope="module")
+def abas() -> list[pd.DataFrame]:
+    # Abas vazias (sem nenhum valor distinto) entre as demais
+    vazia = aba(0, 0)
+    return [aba(40, 1), vazia, aba(25, 2), vazia, aba(1, 3), aba(60, 4), vazia]
+
+
+def contem_forca_bruta(df: pd.DataFrame, termo: str) -> np.ndarray:
+    termo = busca.normalizar(termo.strip())
+    mascara = np.zeros(len(df), dtype=bool)
+    for campo in busca.CAMPOS_TEXTO:
+        texto = df[campo].astype(object).where(df[campo].notna(), "").astype(str).map(busca.normalizar)
+        mascara |= texto.str.contains(termo, regex=False).to_numpy(dtype=bool)
+    return np.flatnonzero(mascara)
+
+
+@pytest.mark.parametrize("termo", ["ndr", "e+h", "134.", "luma", "rbme", "a", "ção", "pix", "zzz", "s fi"])
+def test_contem_igual_a_forca_bruta(abas, termo):
+    indices = [("pagar", f"{mes:02d}", busca.IndiceAba(df)) for mes, df in enumerate(abas, start=1)]
+    resultado = busca.buscar(indices, busca.Consulta(texto=termo))
+    achados = {aba: posicoes for _, aba, _, posicoes in resultado.achados}
+    for (_, nome, indice), df in zip(indices, abas):
+        esperado = contem_forca_bruta(df, termo)
+        np.testing.assert_array_equal(achados.get(nome, np.array([], dtype=int)), esperado, err_msg=f"aba {nome}")
+        # Sem as outras abas (IndiceAba.buscar resolve o "contém" sozinho)
+        np.testing.assert_array_equal(indice.buscar(busca.Consulta(texto=termo)), esperado, err_msg=f"aba {nome}")
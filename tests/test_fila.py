@@ -0,0 +1,74 @@
+import os
+from datetime import date
+
+import pandas as pd
+import pytest
+from openpyxl import Workbook
+
+import fila
+import planilhas
+from planilhas import HEADER_ROW
+
+CABECALHOS = [
+    "Data da Nota Fiscal", "Forma de Pagamento", "Fornecedor", "OS Interna", "Vencimento", "Valor", "Estado",
+]
+
+
+@pytest.fixture
+def planilha(tmp_path, monkeypatch):
+    monkeypatch.setattr(fila, "AGRUPAR", 0)
+    caminho = str(tmp_path / "Contas a pagar 2025.xlsx")
+    wb = Workbook()
+    ws = wb.active
+    ws.title = "06"
+    for col, titulo in enumerate(CABECALHOS, start=2):
+        ws.cell(row=HEADER_ROW, column=col, value=titulo)
+    ws.append([None, date(2025, 6, 1), "Boleto", "ACME", 10, date(2025, 6, 30), 100.0, "Em Aberto"])
+    wb.save(caminho)
+    return caminho
+
+
+def registro(fornecedor: str) -> dict:
+    return {
+        "data_nf": date(2025, 6, 2), "forma_pagamento": "PIX", "fornecedor": fornecedor, "os": 11,
+        "vencimento": date(2025, 7, 1), "valor": 12.5, "estado": "Em Aberto",
+    }
+
+
+def fornecedores(caminho: str) -> list[str]:
+    planilhas.descartar_arquivo(caminho)
+    return planilhas.normalizar_aba(planilhas.ler_aba(caminho, "06").copy())["fornecedor"].tolist()
+
+
+def test_diario_apagado_depois_de_gravar(planilha):
+    fila.enfileirar(planilha, fila.Comando("incluir", "06", id=planilhas.novos_ids(1)[0], campos=registro("BETA")))
+    assert fila.esperar(planilha, 30)
+    assert fornecedores(planilha) == ["ACME", "BETA"]
+    assert not os.path.exists(fila.caminho_diario(planilha))
+
+
+def test_comandos_do_diario_sao_retomados(planilha):
+    # Diário deixado por um processo que caiu antes de gravar: uma inclusão,
+    # uma edição dela (pelo id) e a remoção de uma linha já gravada
+    antigo = 10**9
+    comandos = [
+        fila.Comando("incluir", "06", id=antigo, campos=registro("BETA")),
+        fila.Comando("editar", "06", id=antigo, original={"fornecedor": "BETA"}, campos={"fornecedor": "GAMA"}),
+        fila.Comando(
+            "remover", "06", id=antigo + 1, linha=HEADER_ROW + 1,
+            original={"fornecedor": "ACME", "os": 10, "valor": 100.0}, dono="ana"
+        ),
+    ]
+    with open(fila.caminho_diario(planilha), "w", encoding="utf-8") as f:
+        f.writelines(fila._linha_diario(c) for c in comandos)
+        f.write('{"tipo": "incluir", "aba"')  # linha truncada pela queda
+
+    retomados = fila.pendentes(planilha, "06")
+    assert [c.tipo for c in retomados] == ["incluir", "editar", "remover"]
+    assert retomados[0].campos["vencimento"] == pd.Timestamp(2025, 7, 1)
+    assert retomados[0].id != antigo and retomados[1].id == retomados[0].id and retomados[2].id is None
+
+    assert fila.esperar(planilha, 30)
+    assert fornecedores(planilha) == ["GAMA"]
+    assert not os.path.exists(fila.caminho_diario(planilha))
+    assert fila.situacao(planilha, "ana")[2] == []
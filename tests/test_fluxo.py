@@ -0,0 +1,28 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+import fluxo
+from planilhas import classificar_status
+from referencias import aba_sintetica
+
+HOJE = date(2025, 7, 15)
+
+
+@pytest.mark.parametrize("is_receber", [False, True], ids=["pagar", "receber"])
+def test_vencidos_entram_na_projecao(is_receber):
+    df = aba_sintetica(2_000, is_receber, HOJE)
+    df["status_pagamento"] = classificar_status(df, is_receber, HOJE)
+    em_atraso = df["status_pagamento"] == "Em Atraso"
+    abertos = df["status_pagamento"].isin(["A Receber" if is_receber else "Em Aberto", "Em Atraso"])
+    assert em_atraso.any()
+
+    totais = fluxo.vencimentos_aba(df, is_receber)
+    assert totais["total"].sum() == pytest.approx(df.loc[abertos & df["vencimento"].notna(), "valor"].sum())
+
+    # Os vencidos somam-se no dia de hoje, do lado das entradas ou das saídas
+    projecao = fluxo.projetar([] if is_receber else [totais], [totais] if is_receber else [], HOJE, dias=1)
+    vencidos = df.loc[abertos & (df["vencimento"] <= pd.Timestamp(HOJE)), "valor"].sum()
+    coluna = "entradas" if is_receber else "saidas"
+    assert projecao[coluna].iloc[0] == pytest.approx(vencidos)
@@ -0,0 +1,24 @@
+from datetime import date
+
+import pandas as pd
+import pytest
+
+from planilhas import classificar_status
+from referencias import aba_sintetica, status_iterrows
+
+HOJE = date(2025, 7, 15)
+
+
+@pytest.mark.parametrize("is_receber", [False, True], ids=["pagar", "receber"])
+def test_classificar_status_igual_ao_iterrows(is_receber):
+    df = aba_sintetica(5_000, is_receber, HOJE)
+    # vencendo hoje não está em atraso
+    df.loc[0, "vencimento"] = pd.Timestamp(HOJE)
+    df.loc[0, "estado"] = None
+
+    status = classificar_status(df, is_receber, HOJE)
+
+    assert status.tolist() == status_iterrows(df, is_receber, HOJE)
+    esperados = {"Recebido", "A Receber"} if is_receber else {"Pago", "Em Aberto"}
+    assert set(status) == esperados | {"Em Atraso", "Sem Data"}
+    assert status[0] == ("A Receber" if is_receber else "Em Aberto")